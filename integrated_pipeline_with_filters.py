@@ -40,7 +40,9 @@ from pathlib import Path
 # 导入原有组件
 from src.logger_config import LogLevel, init_logger, get_logger, cleanup_logger
 from src.data_snapshot import create_snapshot_manager
-from src.enhanced_pipeline_fixed import EnhancedNotionJobPipelineWithLogging
+from src.enhanced_pipeline_fixed import (
+    EnhancedNotionJobPipelineWithLogging, add_common_args, apply_cli_config, check_arg_conflicts
+)
 
 # 导入统一筛选系统
 from src.unified_filter_system import (
@@ -59,8 +61,9 @@ try:
             break
     
     from src.crawler_registry import crawler_registry
-    from src.enhanced_extractor import EnhancedNotionExtractor
+    from src.enhanced_extractor import EnhancedNotionExtractor, close_llm_clients
     from src.optimized_notion_writer import OptimizedNotionJobWriter
+    from src.lazy_job_record import close_lazy_sources, has_html
     DEPENDENCIES_OK = True
 except ImportError as e:
     print(f"❌ 依赖导入失败: {e}")
@@ -393,6 +396,10 @@ class FilteredJobPipeline(EnhancedNotionJobPipelineWithLogging):
         except Exception as e:
             self.logger.error("流水线执行失败", {"error": str(e)}, e)
             return False
+        
+        finally:
+            # 关闭共享的LLM连接
+            await close_llm_clients()
     
     def _get_final_stats(self) -> Dict[str, Any]:
         """获取最终统计信息"""
@@ -431,48 +438,51 @@ class FilteredJobPipeline(EnhancedNotionJobPipelineWithLogging):
         try:
             self.logger.info(f"开始提取 {len(self.deduplicated_jobs)} 个岗位的详细信息")
             
-            extractor = EnhancedNotionExtractor()
+            extractor = EnhancedNotionExtractor(config=self.config)
             extracted_jobs = []
             failed_count = 0
             
-            for i, job in enumerate(self.deduplicated_jobs, 1):
-                try:
-                    self.logger.debug(f"提取第 {i}/{len(self.deduplicated_jobs)} 个岗位", {
-                        "job_title": job.get("岗位名称", "N/A"),
-                        "company": job.get("公司名称", "N/A")
-                    })
-
-                    # ✅ 提取必需的参数
-                    html = job.get('html', '')
-                    url = job.get('岗位链接', '')
-                
-                    if not html:
-                        self.logger.warning(f"岗位 {i} 没有HTML内容", {
-                            "job_title": job.get('岗位名称', 'N/A'),
-                            "company": job.get('公司名称', 'N/A')
+            # HTML解析和正则提取在进程池中提前进行，LLM调用按 llm.max_in_flight 并发并受RPM/TPM限流，结果按岗位顺序返回
+            jobs = self.deduplicated_jobs
+            try:
+                async for index, extracted_job in extractor.iter_extract_batch(jobs):
+                    i = index + 1
+                    job = jobs[index]
+                    try:
+                        self.logger.debug(f"提取第 {i}/{len(jobs)} 个岗位", {
+                            "job_title": job.get("岗位名称", "N/A"),
+                            "company": job.get("公司名称", "N/A")
                         })
-                        failed_count += 1
-                        continue
                 
-                    # ✅ 使用正确的方法调用
-                    extracted_job = await extractor.extract_for_notion_enhanced(html, url, job)
+                        if extracted_job is None and not has_html(job):
+                            self.logger.warning(f"岗位 {i} 没有HTML内容", {
+                                "job_title": job.get('岗位名称', 'N/A'),
+                                "company": job.get('公司名称', 'N/A')
+                            })
+                            failed_count += 1
+                            continue
                     
-                    if extracted_job:
-                        extracted_jobs.append(extracted_job)
-                        self.logger.debug(f"✅ 第 {i} 个岗位提取成功")
-                    else:
-                        failed_count += 1
-                        self.logger.warning(f"❌ 第 {i} 个岗位提取失败")
+                        if extracted_job:
+                            extracted_jobs.append(extracted_job)
+                            self.logger.debug(f"✅ 第 {i} 个岗位提取成功")
+                        else:
+                            failed_count += 1
+                            self.logger.warning(f"❌ 第 {i} 个岗位提取失败")
                         
-                except Exception as e:
-                    self.logger.warning(f"第 {i} 个岗位提取异常", {
-                        "job_title": job.get("岗位名称", "N/A"),
-                        "error": str(e)
-                    }, e)
-                    failed_count += 1
-                
-                # API调用间隔
-                await asyncio.sleep(1.5)
+                    except Exception as e:
+                        self.logger.warning(f"第 {i} 个岗位提取异常", {
+                            "job_title": job.get("岗位名称", "N/A"),
+                            "error": str(e)
+                        }, e)
+                        failed_count += 1
+            finally:
+                # 延迟加载的HTML已全部读取完毕（提取中途出错时同样关闭源文件和缓存）
+                close_lazy_sources()
+                self.logger.info("LLM请求并发与限流统计", extractor.extraction_stats())
+                self.logger.info("LLM响应缓存统计", extractor.response_cache.stats())
+                extractor.response_cache.close()
+                self.logger.info("提取结果缓存统计", extractor.result_cache.stats())
+                extractor.result_cache.close()
             
             self.extracted_jobs = extracted_jobs
             self.stats["extracted"] = len(extracted_jobs)
@@ -668,47 +678,12 @@ def parse_args():
         """
     )
     
-    parser.add_argument('--log-level', 
-                      choices=['production', 'normal', 'debug', 'trace'],
-                      default='normal',
-                      help='日志详细程度 (默认: normal)')
-    
-    parser.add_argument('--no-debug-data', 
-                      action='store_true',
-                      help='不保存调试数据文件（节省磁盘空间）')
-    
-    parser.add_argument('--test-mode',
-                      action='store_true', 
-                      help='测试模式（限制处理数量，降低API成本）')
-    
-    parser.add_argument('--skip-crawl',
-                      action='store_true',
-                      help='跳过爬虫，使用已有数据文件')
-    
-    parser.add_argument('--data-file',
-                      type=str,
-                      help='指定要使用的数据文件路径（与--skip-crawl一起使用）')
-    
-    parser.add_argument('--skip-notion-load',
-                      action='store_true',
-                      help='跳过Notion加载，使用缓存文件（大幅提速）')
-    
-    parser.add_argument('--notion-cache-file',
-                      type=str,
-                      help='指定要使用的Notion缓存文件路径')
+    add_common_args(parser)
     
     parser.add_argument('--no-filters',
                       action='store_true',
                       help='禁用筛选功能（仅用于测试对比）')
     
-    parser.add_argument('--list-notion-cache',
-                      action='store_true',
-                      help='列出可用的Notion缓存文件')
-    
-    parser.add_argument('--list-data-files',
-                      action='store_true',
-                      help='列出可用的数据文件')
-    
     return parser.parse_args()
 
 
@@ -732,6 +707,12 @@ async def main():
         list_available_notion_cache()
         return
     
+    # 验证参数组合
+    arg_error = check_arg_conflicts(args)
+    if arg_error:
+        print(f"❌ {arg_error}")
+        return
+    
     # 初始化日志系统
     log_level_map = {
         'production': LogLevel.PRODUCTION,
@@ -814,6 +795,7 @@ async def main():
             notion_cache_file=args.notion_cache_file,
             enable_filters=not args.no_filters  # 筛选开关
         )
+        apply_cli_config(pipeline.config, args)
         
         success = await pipeline.run_filtered_pipeline()
         
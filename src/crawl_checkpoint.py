@@ -0,0 +1,112 @@
+"""
+断点续爬检查点
+记录已完成的 (关键词, 城市, 页码) 和已抓取详情页的岗位ID，保存在原始JSONL旁边
+（<原始数据文件>.checkpoint.json）。爬虫中断后重启时跳过已完成的搜索页和详情页。
+"""
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Optional, Set, Tuple
+
+from src.job_identity import extract_job_id
+from src.raw_jsonl_writer import open_raw_jsonl
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+class CrawlCheckpoint:
+    """单个原始数据文件对应的爬取检查点"""
+
+    def __init__(self, raw_file: str, keyword: str, city: str):
+        self.raw_file = raw_file
+        self.path = raw_file + CHECKPOINT_SUFFIX
+        self.keyword = keyword
+        self.city = city
+        self.completed_pages: Set[Tuple[str, str, int]] = set()
+        self.fetched_job_ids: Set[str] = set()
+        self.finished = False
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CrawlCheckpoint"]:
+        """从检查点文件加载，文件损坏时返回None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            checkpoint = cls(data["raw_file"], data["keyword"], data["city"])
+            checkpoint.completed_pages = {
+                (keyword, city, int(page_num)) for keyword, city, page_num in data.get("completed_pages", [])
+            }
+            checkpoint.fetched_job_ids = set(data.get("fetched_job_ids", []))
+            checkpoint.finished = data.get("finished", False)
+            return checkpoint
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  检查点文件无法读取 {path}: {e}")
+            return None
+
+    @classmethod
+    def find_resumable(cls, keyword: str, city: str, backend: str,
+                       data_dir: str = "data") -> Optional["CrawlCheckpoint"]:
+        """查找同一后端（playwright/http）、关键词和城市下最近一次未完成的爬取
+
+        按原始数据文件名前缀 raw_boss_<backend>_ 区分后端，不会续写另一个后端的文件。
+        """
+        candidates = sorted(
+            glob.glob(os.path.join(data_dir, f"raw_boss_{backend}_*" + CHECKPOINT_SUFFIX)),
+            key=os.path.getmtime,
+            reverse=True
+        )
+        for path in candidates:
+            checkpoint = cls.load(path)
+            if (checkpoint and not checkpoint.finished
+                    and checkpoint.keyword == keyword and checkpoint.city == city
+                    and os.path.exists(checkpoint.raw_file)):
+                return checkpoint
+        return None
+
+    def is_page_done(self, keyword: str, city: str, page_num: int) -> bool:
+        return (keyword, city, page_num) in self.completed_pages
+
+    def mark_page_done(self, keyword: str, city: str, page_num: int) -> None:
+        self.completed_pages.add((keyword, city, page_num))
+
+    def is_job_fetched(self, url: str) -> bool:
+        job_id = extract_job_id(url)
+        return bool(job_id) and job_id in self.fetched_job_ids
+
+    def mark_job_fetched(self, url: str) -> None:
+        job_id = extract_job_id(url)
+        if job_id:
+            self.fetched_job_ids.add(job_id)
+
+    def load_fetched_from_raw_file(self) -> int:
+        """从原始数据文件补齐已抓取的岗位ID（覆盖最后一次保存检查点之后写入的记录）"""
+        added = 0
+        with open_raw_jsonl(self.raw_file) as f:
+            for line in f:
+                try:
+                    url = json.loads(line).get("url", "")
+                except json.JSONDecodeError:
+                    continue
+                if url and not self.is_job_fetched(url):
+                    self.mark_job_fetched(url)
+                    added += 1
+        return added
+
+    def save(self) -> None:
+        """原子写入检查点文件"""
+        data = {
+            "raw_file": self.raw_file,
+            "keyword": self.keyword,
+            "city": self.city,
+            "completed_pages": sorted(list(page) for page in self.completed_pages),
+            "fetched_job_ids": sorted(self.fetched_job_ids),
+            "finished": self.finished,
+            "updated_at": datetime.now().isoformat()
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,104 @@
+"""
+反爬虫熔断器
+按会话统计连续遇到的验证/异常页面。连续次数达到阈值时熔断（open）：
+暂停该会话的所有请求，冷却时间按熔断次数指数增长；冷却结束后由会话轮换到新的浏览器上下文，
+进入半开（half_open）状态试探，下一次正常响应后恢复（closed），再次遇到验证页面则立即重新熔断。
+熔断次数超过上限时抛出 CircuitOpenError，由调用方放弃本次爬取。
+"""
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """熔断次数超过上限，会话被判定为已被封锁"""
+
+class CrawlCircuitBreaker:
+    """单个爬虫会话的熔断器"""
+
+    def __init__(self, failure_threshold: int = 3, base_cooldown: float = 60.0,
+                 max_cooldown: float = 900.0, max_trips: int = 4):
+        """
+        Args:
+            failure_threshold: 连续多少次验证页面后熔断
+            base_cooldown: 第一次熔断的冷却时间（秒），之后每次翻倍
+            max_cooldown: 冷却时间上限（秒）
+            max_trips: 最多熔断多少次，超过后抛出 CircuitOpenError
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.max_trips = max_trips
+
+        self.state = CLOSED
+        self.consecutive_challenges = 0
+        self.total_challenges = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+        self.cooldown = 0.0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "CrawlCircuitBreaker":
+        """按 crawler.circuit_breaker 配置创建"""
+        return cls(**(config or {}))
+
+    @property
+    def exhausted(self) -> bool:
+        """熔断次数已超过上限"""
+        return self.trips > self.max_trips
+
+    def record_challenge(self) -> bool:
+        """记录一次验证页面，返回本次是否触发熔断"""
+        self.total_challenges += 1
+        self.consecutive_challenges += 1
+
+        if self.state == OPEN:
+            return False
+        if self.state == HALF_OPEN or self.consecutive_challenges >= self.failure_threshold:
+            self._open()
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """记录一次正常响应"""
+        self.consecutive_challenges = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            print("✅ 熔断器恢复: 会话请求恢复正常")
+
+    def _open(self) -> None:
+        self.trips += 1
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.cooldown = min(self.base_cooldown * (2 ** (self.trips - 1)), self.max_cooldown)
+        print(f"🔌 熔断器打开: 连续 {self.consecutive_challenges} 次验证页面，"
+              f"第 {self.trips} 次熔断，冷却 {self.cooldown:.0f}s")
+
+    def cooldown_remaining(self) -> float:
+        """剩余冷却时间（秒），未熔断时为0"""
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def half_open(self) -> None:
+        """冷却结束（会话已轮换上下文），进入试探状态"""
+        if self.state == OPEN:
+            self.state = HALF_OPEN
+            self.consecutive_challenges = 0
+
+    def check(self) -> None:
+        """熔断次数超过上限时抛出 CircuitOpenError"""
+        if self.exhausted:
+            raise CircuitOpenError(f"连续熔断 {self.trips} 次，会话可能已被封锁")
+
+    def stats(self) -> Dict[str, Any]:
+        """当前熔断状态"""
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "total_challenges": self.total_challenges,
+            "consecutive_challenges": self.consecutive_challenges,
+            "cooldown_remaining": round(self.cooldown_remaining(), 1)
+        }
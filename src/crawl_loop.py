@@ -0,0 +1,194 @@
+"""
+爬取主循环
+Playwright和HTTP后端共用：断点续爬、逐页获取搜索结果、跳过已抓取和已知岗位、并发抓取详情页，
+每个岗位写入原始JSONL后立即产出（带HTML在原始文件中的位置，见 LazyJobRecord），
+完整结束的爬取按配置转换为紧凑存储。
+后端只需提供"获取一页搜索结果"和"按顺序抓取一组详情页"两个函数。
+"""
+import asyncio
+import functools
+import json
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.raw_jsonl_writer import RawJsonlWriter, new_raw_file_path, open_raw_jsonl
+from src.raw_crawl_store import compact_raw_jsonl
+from src.crawl_checkpoint import CrawlCheckpoint
+from src.known_job_index import KnownJobIndex
+from src.lazy_job_record import HtmlRef, LazyJobRecord
+
+# 获取一页搜索结果：页码 -> (岗位信息列表, 是否还有下一页)；本页失败时返回空列表，留待续爬
+JobListFetcher = Callable[[int], Awaitable[Tuple[List[Dict[str, str]], bool]]]
+# 并发抓取一组详情页：URL列表 -> 按输入顺序产出 (序号, HTML)，抓取失败为None
+DetailFetcher = Callable[[List[str]], AsyncIterator[Tuple[int, Optional[str]]]]
+
+async def iter_crawl_jobs(backend: str, source: str, keyword: str, city: str,
+                          fetch_job_list: JobListFetcher, fetch_details_in_order: DetailFetcher,
+                          max_pages: int = 2, max_jobs_test: Optional[int] = None,
+                          raw_output: Optional[Dict[str, Any]] = None,
+                          raw_store: Optional[Dict[str, Any]] = None,
+                          resume: bool = False,
+                          known_jobs: Optional[KnownJobIndex] = None,
+                          stop_on_known_page: bool = False,
+                          data_dir: str = "data") -> AsyncIterator[Dict[str, Any]]:
+    """按页爬取一次搜索（关键词×城市），逐个产出岗位记录
+
+    Args:
+        backend: 后端名称（playwright/http），决定原始数据文件名，续爬只查找同一后端的断点
+        source: 写入记录 source 字段的来源名称
+        fetch_job_list / fetch_details_in_order: 后端提供的搜索页和详情页抓取函数
+        raw_output: 原始数据写入配置，透传给 RawJsonlWriter
+        raw_store: 紧凑存储配置，enabled 为True时完整结束的爬取转换为紧凑存储
+        其余参数含义同 iter_boss_jobs_playwright
+
+    产出的记录为 LazyJobRecord：字典中带有HTML，同时记录其在原始JSONL中的位置，
+    调用方可以只保留位置（derive），之后再从磁盘读取HTML。紧凑存储会删除原始JSONL时产出普通dict。
+    """
+    raw_output = raw_output or {}
+    raw_store = raw_store or {}
+    os.makedirs(data_dir, exist_ok=True)
+    # 转换紧凑存储后删除原始JSONL时，位置会失效
+    keep_refs = not (raw_store.get("enabled") and raw_store.get("remove_source"))
+
+    def with_ref(job_record: Dict[str, Any], offset: int, length: int) -> Dict[str, Any]:
+        return LazyJobRecord(job_record, HtmlRef(raw_writer.path, offset, length)) if keep_refs else job_record
+
+    # 断点续爬：沿用同一后端上次未完成的原始数据文件
+    checkpoint = CrawlCheckpoint.find_resumable(keyword, city, backend, data_dir) if resume else None
+    if checkpoint:
+        raw_file = checkpoint.raw_file
+        writer_options = {**raw_output, "compress": raw_file.endswith('.gz'), "resume": True}
+        print(f"♻️  断点续爬: {raw_file} (已完成 {len(checkpoint.completed_pages)} 页)")
+    else:
+        raw_file = new_raw_file_path(backend, keyword, city, data_dir)
+        writer_options = raw_output
+
+    saved_count = 0
+    known_skipped = 0
+
+    raw_writer = RawJsonlWriter(raw_file, **writer_options).open()
+    if checkpoint:
+        checkpoint.load_fetched_from_raw_file()
+    else:
+        checkpoint = CrawlCheckpoint(raw_writer.path, keyword, city)
+        checkpoint.save()
+
+    try:
+        # 续爬时先重新产出已保存的记录，调用方拿到的结果与未中断时一致
+        if resume and raw_writer.records_written:
+            offset = 0
+            with open_raw_jsonl(raw_writer.path, 'rb') as f:
+                for line in f:
+                    offset += len(line)
+                    try:
+                        job_record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    saved_count += 1
+                    yield with_ref(job_record, offset - len(line), len(line))
+            print(f"♻️  已重新产出 {saved_count} 条已保存的岗位记录")
+
+        for page_num in range(1, max_pages + 1):
+            if checkpoint.is_page_done(keyword, city, page_num):
+                print(f"\n⏭️  第 {page_num} 页已在上次爬取中完成，跳过")
+                continue
+
+            print(f"\n🔍 正在获取第 {page_num} 页...")
+            page_jobs, has_more = await fetch_job_list(page_num)
+
+            if not page_jobs:
+                print(f"⚠️  第 {page_num} 页没有找到岗位信息")
+                if not has_more:
+                    break
+                continue
+
+            # 应用测试模式限制
+            if max_jobs_test and len(page_jobs) > max_jobs_test:
+                page_jobs = page_jobs[:max_jobs_test]
+                print(f"🧪 测试模式: 限制为前 {max_jobs_test} 个岗位")
+
+            print(f"✅ 第 {page_num} 页获取到 {len(page_jobs)} 个岗位")
+
+            # 跳过上次已抓取过详情页的岗位
+            fetched_count = len(page_jobs)
+            page_jobs = [job_info for job_info in page_jobs if not checkpoint.is_job_fetched(job_info.get("url", ""))]
+            fetched_count -= len(page_jobs)
+            if fetched_count:
+                print(f"⏭️  跳过 {fetched_count} 个已抓取的岗位")
+
+            # 跳过Notion或历史爬取中已存在的岗位，不再请求详情页
+            if known_jobs is not None:
+                new_jobs = [job_info for job_info in page_jobs if not known_jobs.contains(job_info.get("url", ""))]
+                if len(new_jobs) < len(page_jobs):
+                    print(f"⏭️  跳过 {len(page_jobs) - len(new_jobs)} 个已知岗位")
+                    known_skipped += len(page_jobs) - len(new_jobs)
+                page_jobs = new_jobs
+
+            # 最后一页，或整页都是已知岗位：记录断点后停止翻页
+            all_known = stop_on_known_page and known_jobs is not None and not page_jobs
+
+            # 并发获取详情页HTML，按列表顺序处理每个岗位
+            detail_urls = [job_info.get("url", "") for job_info in page_jobs]
+            async for i, job_html in fetch_details_in_order(detail_urls):
+                job_info = page_jobs[i]
+                print(f"处理岗位 {i+1}/{len(page_jobs)}: {job_info['job_name']}")
+
+                if not job_html:
+                    # 没有URL、详情获取失败或被反爬虫拦截：不保存、不记断点，续爬或下次运行时重试
+                    print(f"⚠️  跳过无法获取详情的岗位: {job_info['job_name']}")
+                    continue
+
+                job_record = {
+                    "url": job_info.get("url", ""),
+                    "html": job_html,
+                    "api_data": job_info,
+                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "source": source
+                }
+
+                # 实时保存（缓冲写入，按批落盘）
+                raw_writer.write(job_record)
+                checkpoint.mark_job_fetched(job_record["url"])
+                saved_count += 1
+
+                print(f"✅ 保存: {job_info['job_name']} - {job_info['company_name']}")
+                yield with_ref(job_record, *raw_writer.last_location)
+
+            # 每页结束时落盘并fsync，然后记录断点
+            raw_writer.checkpoint()
+            checkpoint.mark_page_done(keyword, city, page_num)
+            checkpoint.save()
+
+            if not has_more:
+                print(f"⏹️  第 {page_num} 页是最后一页，停止翻页")
+                break
+            if all_known:
+                print(f"⏹️  第 {page_num} 页全部为已知岗位，停止翻页")
+                break
+
+        checkpoint.finished = True
+
+    finally:
+        # 先关闭写入器（落盘全部记录），再保存断点，保证断点不超前于数据
+        raw_writer.close()
+        checkpoint.save()
+
+    # 完整结束的爬取可转换为紧凑存储（HTML分块压缩，元数据单独成行）
+    if checkpoint.finished and raw_store.get("enabled"):
+        store_options = {key: value for key, value in raw_store.items() if key != "enabled"}
+        try:
+            # 压缩整个文件是CPU/IO密集操作，放到线程中执行，不阻塞同一事件循环上的其他爬取任务
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(compact_raw_jsonl, raw_writer.path, **store_options)
+            )
+            print(f"🗜️  已转换为紧凑存储: {result['meta_path']} "
+                  f"({result['source_bytes'] / 1024:.0f}KB -> {result['store_bytes'] / 1024:.0f}KB)")
+        except (OSError, ValueError, ImportError) as e:
+            print(f"⚠️  紧凑存储转换失败，保留原始JSONL: {e}")
+
+    print(f"\n🎉 爬取完成！")
+    print(f"💾 数据已保存到: {raw_writer.path}")
+    print(f"📊 总共获取 {saved_count} 个岗位")
+    if known_skipped:
+        print(f"⏭️  已知岗位跳过详情抓取: {known_skipped} 个")
@@ -0,0 +1,111 @@
+"""
+自适应爬取节奏控制（AIMD）
+AdaptivePacer 为每个host维护下一次允许请求的时间，两次请求之间至少间隔当前 interval 秒（附加抖动）。
+interval 按AIMD调整：请求正常且平滑后的响应时间低于 latency_target 时按固定步长减小（速率加性增加），
+响应偏慢时按步长增大；遇到反爬虫页面或请求失败时按倍数放大（速率乘性减小），并限制在上下限之间。
+页面内的停顿（human_like_delay / scroll_page）也由 pause() 提供，时长随当前间隔缩放。
+"""
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+class AdaptivePacer:
+    """AIMD请求节奏控制器
+
+    acquire(url) 在同一host两次请求之间至少间隔当前 interval 秒（附加抖动），不同host互不影响。
+    调用方在每次请求后通过 record_success / record_challenge / record_error 反馈结果。
+    """
+
+    def __init__(self, initial_interval: float = 1.5, min_interval: float = 0.5, max_interval: float = 30.0,
+                 step: float = 0.1, backoff: float = 2.0, error_backoff: float = 1.5,
+                 latency_target: float = 3.0, jitter: float = 0.3, smoothing: float = 0.2):
+        """
+        Args:
+            initial_interval: 初始请求间隔（秒）
+            min_interval / max_interval: 间隔上下限
+            step: 每次正常请求后间隔减小的步长（秒）
+            backoff: 遇到反爬虫页面时间隔放大的倍数
+            error_backoff: 请求失败（超时、网络错误）时间隔放大的倍数
+            latency_target: 平滑后的响应时间超过该值（秒）时不再提速，改为按步长放慢
+            jitter: 抖动比例，实际间隔为 interval * (1 + uniform(0, jitter))
+            smoothing: 响应时间指数平滑系数
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(initial_interval, min_interval), max_interval)
+        self.step = step
+        self.backoff = backoff
+        self.error_backoff = error_backoff
+        self.latency_target = latency_target
+        self.jitter = jitter
+        self.smoothing = smoothing
+
+        self.latency_ema: Optional[float] = None
+        self.successes = 0
+        self.challenges = 0
+        self.errors = 0
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], **defaults) -> "AdaptivePacer":
+        """按 crawler.pacing 配置创建，defaults 为调用方的默认参数（配置优先）"""
+        return cls(**{**defaults, **(config or {})})
+
+    async def acquire(self, url: str) -> None:
+        """等待直到允许向该URL所在host发起请求"""
+        host = urlparse(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, 0.0))
+            self._next_allowed[host] = start + self.interval * (1 + random.uniform(0, self.jitter))
+
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def pause(self, scale: float = 1.0) -> None:
+        """页面内停顿（加载后、滚动间），时长随当前间隔缩放"""
+        await asyncio.sleep(self.interval * scale * random.uniform(0.5, 1.0))
+
+    def _set_interval(self, interval: float) -> None:
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        """请求成功：响应时间正常时加性提速，偏慢时加性降速"""
+        self.successes += 1
+        if latency is not None:
+            self.latency_ema = latency if self.latency_ema is None else (
+                self.latency_ema + self.smoothing * (latency - self.latency_ema))
+
+        if self.latency_ema is not None and self.latency_ema > self.latency_target:
+            self._set_interval(self.interval + self.step)
+        else:
+            self._set_interval(self.interval - self.step)
+
+    def record_challenge(self) -> None:
+        """遇到反爬虫页面：乘性降速"""
+        self.challenges += 1
+        self._set_interval(self.interval * self.backoff)
+
+    def record_error(self) -> None:
+        """请求失败：乘性降速（幅度小于反爬虫页面）"""
+        self.errors += 1
+        self._set_interval(self.interval * self.error_backoff)
+
+    @property
+    def rate_per_minute(self) -> float:
+        """当前允许的单host请求速率（次/分钟）"""
+        return 60.0 / self.interval
+
+    def stats(self) -> Dict[str, Any]:
+        """当前节奏指标"""
+        return {
+            "interval": round(self.interval, 2),
+            "rate_per_minute": round(self.rate_per_minute, 1),
+            "latency_ema": round(self.latency_ema, 2) if self.latency_ema is not None else None,
+            "successes": self.successes,
+            "challenges": self.challenges,
+            "errors": self.errors
+        }
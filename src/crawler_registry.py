@@ -24,7 +24,22 @@ class CrawlerRegistry:
             function_name="fetch_boss_jobs_playwright",
             description="使用Playwright的Boss直聘爬虫，稳定性较好",
             supports_city=True,
-            supports_keyword=True
+            supports_keyword=True,
+            session_class_name="BossCrawlerSession",
+            stream_function_name="iter_boss_jobs_playwright"
+        )
+        
+        # Boss直聘 HTTP版本（遇到验证页面时回退到Playwright）
+        self.register_crawler(
+            name="boss_http",
+            display_name="Boss直聘HTTP",
+            module_name="src.http_boss",
+            function_name="fetch_boss_jobs_http",
+            description="直接请求搜索接口和详情页的Boss直聘爬虫，不渲染页面，遇到验证时回退到浏览器",
+            supports_city=True,
+            supports_keyword=True,
+            session_class_name="BossHttpSession",
+            stream_function_name="iter_boss_jobs_http"
         )
         
         # 可以在这里添加更多爬虫
@@ -46,9 +61,17 @@ class CrawlerRegistry:
         function_name: str,
         description: str = "",
         supports_city: bool = True,
-        supports_keyword: bool = True
+        supports_keyword: bool = True,
+        session_class_name: Optional[str] = None,
+        stream_function_name: Optional[str] = None
     ):
-        """注册一个新的爬虫"""
+        """注册一个新的爬虫
+        
+        session_class_name: 可选，模块中可复用会话类的名称。会话实现异步上下文管理器，
+        通过 session= 参数传给爬虫函数，使多次爬取共享同一个浏览器。
+        stream_function_name: 可选，参数与爬虫函数相同、返回异步生成器的流式版本，
+        流水线可以边爬取边处理记录。
+        """
         self.crawlers[name] = {
             "display_name": display_name,
             "module_name": module_name,
@@ -56,8 +79,11 @@ class CrawlerRegistry:
             "description": description,
             "supports_city": supports_city,
             "supports_keyword": supports_keyword,
+            "session_class_name": session_class_name,
+            "stream_function_name": stream_function_name,
             "loaded": False,
             "crawler_func": None,
+            "stream_func": None,
             "error": None
         }
     
@@ -76,6 +102,8 @@ class CrawlerRegistry:
             # 动态导入模块
             module = importlib.import_module(crawler_info["module_name"])
             crawler_func = getattr(module, crawler_info["function_name"])
+            if crawler_info["stream_function_name"]:
+                crawler_info["stream_func"] = getattr(module, crawler_info["stream_function_name"])
             
             crawler_info["crawler_func"] = crawler_func
             crawler_info["loaded"] = True
@@ -129,6 +157,44 @@ class CrawlerRegistry:
         
         return loaded_crawlers
     
+    def resolve_name(self, name: str) -> Optional[str]:
+        """按注册名或显示名查找爬虫注册名"""
+        if name in self.crawlers:
+            return name
+        for crawler_name, info in self.crawlers.items():
+            if info["display_name"] == name:
+                return crawler_name
+        return None
+    
+    def get_stream_crawler(self, name: str) -> Optional[Callable]:
+        """获取已加载爬虫的流式版本（异步生成器函数），不支持时返回None"""
+        crawler_name = self.resolve_name(name)
+        if not crawler_name or not self.load_crawler(crawler_name):
+            return None
+        return self.crawlers[crawler_name]["stream_func"]
+    
+    def create_session(self, name: str, **kwargs):
+        """为指定爬虫创建可复用会话（未启动），不支持会话时返回None
+        
+        name 可以是注册名或显示名，kwargs 透传给会话类构造函数。
+        """
+        crawler_name = self.resolve_name(name)
+        if not crawler_name:
+            return None
+        
+        crawler_info = self.crawlers[crawler_name]
+        session_class_name = crawler_info.get("session_class_name")
+        if not session_class_name:
+            return None
+        
+        try:
+            module = importlib.import_module(crawler_info["module_name"])
+            session_class = getattr(module, session_class_name)
+            return session_class(**kwargs)
+        except (ImportError, AttributeError) as e:
+            print(f"⚠️  创建爬虫会话失败 {crawler_info['display_name']}: {e}")
+            return None
+    
     def get_crawler_info(self, name: str) -> Optional[Dict]:
         """获取爬虫信息"""
         return self.crawlers.get(name)
@@ -12,11 +12,18 @@ import json
 import os
 import re
 import asyncio
+import importlib.util
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Iterator, List, Tuple, Union
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+from src.llm_rate_limiter import LLMRateLimiter, estimate_tokens
+from src.llm_response_cache import LLMResponseCache
+from src.extraction_result_cache import ExtractionResultCache
+
 # 尝试加载不同路径的.env文件
 for env_path in [".env", "../.env", "../../.env"]:
     if os.path.exists(env_path):
@@ -24,7 +31,476 @@ for env_path in [".env", "../.env", "../../.env"]:
         print(f"[OK] Loading environment variables: {env_path}")
         break
 
-class EnhancedNotionExtractor:
+# 默认使用与原先相同的标准库解析器，正则提取的输入文本不变；
+# lxml 快数倍，但对不规范的HTML可能生成不同的文档树，需通过 llm.html_parser 显式启用
+DEFAULT_HTML_PARSER = "html.parser"
+
+# 送给LLM前移除的噪声标签
+NOISE_TAGS = ['script', 'style', 'nav', 'footer', 'header']
+
+# 岗位描述区域选择器，按优先级排列
+JOB_CONTENT_SELECTORS = [
+    '[class*="job-detail"]',
+    '[class*="job-description"]',
+    '[class*="position-detail"]',
+    '[class*="job-content"]',
+    '[class*="desc"]'
+]
+
+# LLM输入压缩时用于给文本块打分的岗位相关关键词
+JOB_RELEVANCE_KEYWORDS = [
+    '职责', '要求', '任职', '岗位', '工作内容', '负责', '参与', '技能', '熟悉', '掌握', '精通', '经验',
+    '优先', '学历', '本科', '硕士', '博士', '毕业', '届', '方向', '算法', '模型', '开发', '研究',
+    '公司', '有限公司', '发布', '截止', '招聘', '实习'
+]
+
+# 压缩时超过该长度的文本块按句子切分，避免单个长段落超出预算被整体丢弃
+MAX_BLOCK_CHARS = 200
+
+# 各提供商默认模型单次请求允许的最大输出token数，可用 llm.max_output_tokens 覆盖
+PROVIDER_MAX_OUTPUT_TOKENS = {
+    "deepseek": 8192,
+    "zhipu": 4095,
+    "siliconflow": 4096,
+    "01ai": 4096,
+    "openai": 16384,
+}
+
+# 提取器版本，计入提取结果缓存键；修改提示词、正则或结果字段后递增，使旧缓存失效
+EXTRACTION_VERSION = 1
+
+class ParsedJobDocument:
+    """单个岗位页面的解析结果，每个岗位只解析一次，结构化提取和LLM预处理共用
+
+    全文和标题在移除噪声标签之前计算并缓存；岗位描述区域和页面正文在第一次访问时
+    移除噪声标签后计算，之后不再修改文档树。
+    """
+
+    def __init__(self, html: str, parser: str = DEFAULT_HTML_PARSER):
+        self.html = html
+        self.parser = parser
+        self.soup = BeautifulSoup(html, parser)
+        self._text: Optional[str] = None
+        self._title: Optional[str] = None
+        self._job_region: Optional[str] = None
+        self._page_text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """页面全文（结构化提取的正则输入）"""
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+
+    @property
+    def title(self) -> str:
+        """<title> 文本，没有则为空字符串"""
+        if self._title is None:
+            title = self.soup.find('title')
+            self._title = title.get_text() if title else ""
+        return self._title
+
+    def _strip_noise(self) -> None:
+        """移除噪声标签，并计算岗位描述区域和页面正文（只执行一次）"""
+        if self._page_text is not None:
+            return
+        # 先缓存依赖完整文档树的结果，再移除噪声
+        self.text
+        self.title
+        for elem in self.soup(NOISE_TAGS):
+            elem.decompose()
+
+        self._job_region = ""
+        for selector in JOB_CONTENT_SELECTORS:
+            elements = self.soup.select(selector)
+            if elements:
+                self._job_region = "\n".join([elem.get_text(separator='\n') for elem in elements])
+                break
+
+        self._page_text = self.soup.get_text(separator='\n')
+
+    @property
+    def job_region(self) -> str:
+        """岗位描述区域文本（已移除噪声标签），找不到描述区域时为空字符串"""
+        self._strip_noise()
+        return self._job_region
+
+    @property
+    def page_text(self) -> str:
+        """移除噪声标签后的页面正文"""
+        self._strip_noise()
+        return self._page_text
+
+# 安装了h2时LLM请求使用HTTP/2（单连接多路复用）
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 每个提供商一个长连接客户端，同一进程内的所有提取器共用（关键词提取、语义去重也经由 _call_llm_api）
+_llm_clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+
+def get_llm_client(provider: str, base_url: str, http_config: Optional[Dict[str, Any]] = None) -> httpx.AsyncClient:
+    """获取（必要时创建）提供商的共享客户端，http_config 对应 llm.http 配置"""
+    key = (provider, base_url)
+    client = _llm_clients.get(key)
+    if client is None or client.is_closed:
+        http_config = http_config or {}
+        client = httpx.AsyncClient(
+            timeout=http_config.get("timeout", 60.0),
+            http2=http_config.get("http2", True) and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=http_config.get("max_connections", 20),
+                max_keepalive_connections=http_config.get("max_keepalive_connections", 10),
+                keepalive_expiry=http_config.get("keepalive_expiry", 60.0)
+            )
+        )
+        _llm_clients[key] = client
+    return client
+
+async def close_llm_clients() -> None:
+    """关闭所有共享的LLM客户端（流水线结束时调用）"""
+    clients = list(_llm_clients.values())
+    _llm_clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            print(f"⚠️  关闭LLM客户端失败: {e}")
+
+# LLM提取的字段说明，单岗位和多岗位提示词共用
+LLM_FIELD_INSTRUCTIONS = """1. **岗位描述**：详细的工作职责和技能要求，包括：
+   - 具体的工作内容和职责
+   - 技能要求和技术栈
+   - 任职要求和条件
+   注意：只要核心岗位内容，去除公司介绍、福利待遇、联系方式等
+   
+2. **公司名称**：招聘公司的准确名称
+
+3. **发布日期**：如果页面中明确显示岗位发布时间，提取格式为YYYY-MM-DD，没有则为空字符串
+   重要提醒：
+   - 只要真正的岗位发布日期，不要公司成立日期
+   - 不要HR注册时间、公司创建时间、更新时间
+   - 不要任何非岗位相关的日期
+   - 如果不确定是否为岗位发布日期，请设为空字符串
+   
+4. **发布日期来源**：说明你从页面的哪个部分提取到发布日期，必须明确是岗位发布相关，如果没有找到真正的岗位发布日期则为空字符串
+
+5. **招募方向**：如果页面中提到具体的技术方向或招募方向，请提取出来。如预训练方向、大数据方向、创新方向、多模态方向等。没有则为空字符串。
+
+要求：
+- 专注于招聘岗位的核心信息
+- 岗位描述要完整但简洁，突出关键职责和技能
+- 对发布日期要特别谨慎，宁可为空也不要错误的日期
+- 如果字段不存在则设为空字符串
+- 只返回JSON格式，不要其他文字
+
+"""
+
+class PatternFamily:
+    """一组按优先级排列的正则（同一字段的多种写法），导入时编译一次
+
+    按优先级逐个 search，遇到第一个有匹配的模式即停止；只有需要全部匹配的字段（薪资取最长）才用 findall。
+    结果与逐个模式调用 re.findall 取第一条一致。
+    """
+
+    def __init__(self, name: str, patterns: List[str], flags: int = re.IGNORECASE):
+        self.name = name
+        self.patterns = [re.compile(pattern, flags) for pattern in patterns]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """按优先级依次返回有匹配的模式：(模式序号, 第一处匹配的分组1)"""
+        for i, pattern in enumerate(self.patterns):
+            match = pattern.search(text)
+            if match:
+                yield i, match.group(1)
+
+    def first(self, text: str) -> Tuple[Optional[int], Optional[str]]:
+        """优先级最高的有匹配模式，没有匹配时返回 (None, None)"""
+        return next(self.iter_matches(text), (None, None))
+
+    def first_all(self, text: str) -> Tuple[Optional[int], List[str]]:
+        """优先级最高的有匹配模式及其全部匹配，没有匹配时返回 (None, [])"""
+        for i, pattern in enumerate(self.patterns):
+            matches = pattern.findall(text)
+            if matches:
+                return i, matches
+        return None, []
+
+# 主要城市，后面可跟"市"或区名，但不能紧跟经验年限
+MAJOR_CITIES = ['北京', '上海', '深圳', '杭州', '广州', '成都', '武汉', '西安', '南京', '苏州', '天津', '重庆']
+
+ACTIVITY_PATTERNS = PatternFamily("activity", [
+    r'(\d+日?内活跃)', r'(刚刚活跃)', r'(今日活跃)',
+    r'(本周活跃)', r'(\d+分钟前活跃)', r'(\d+小时前活跃)'
+], flags=0)
+
+SALARY_PATTERNS = PatternFamily("salary", [
+    r'(\d+[-~到]\d+[kK万](?:·\d+薪)?)',
+    r'(\d+[kK][-~到]\d+[kK](?:·\d+薪)?)',
+    r'(\d+万[-~到]\d+万(?:·\d+薪)?)',
+    r'(\d+[kK]\+(?:·\d+薪)?)',
+    r'(\d+万\+(?:·\d+薪)?)',
+    r'(\d+[-~到]\d+万/年)',
+    r'(\d+[-~到]\d+元/天)',
+    r'(\d+[kK万]·\d+薪)',
+    r'(面议)',
+    r'(\d+万(?:·\d+薪)?)',
+    r'(\d+[kK](?:·\d+薪)?)'
+])
+
+LOCATION_PATTERNS = PatternFamily("location", [
+    rf'({city})(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)' for city in MAJOR_CITIES
+] + [r'(远程办公)', r'(在家办公)', r'(全远程)', r'(Remote)'])
+
+EXPERIENCE_PATTERNS = PatternFamily("experience", [
+    r'(\d+[-~]\d+年工作经验)', r'(\d+[-~]\d+年经验)', r'(\d+年以上工作经验)',
+    r'(\d+年以上经验)', r'(\d+\+年经验)', r'(\d+年工作经验)', r'(\d+年经验)',
+    r'(应届毕业生)', r'(应届生)', r'(实习生)', r'(经验不限)',
+    r'(在校/应届)', r'(校招)', r'(无经验要求)', r'(不限经验)',
+    r'(面向\d+届)', r'(不限)'
+])
+
+GRADUATION_PATTERNS = PatternFamily("graduation", [
+    r'面向(\d{4})届',
+    r'(\d{4})届毕业生',
+    r'毕业时间[：:]\s*(\d{4}年?\s*[-~到至]\s*\d{4}年?)',
+    r'(\d{4}年\d{1,2}月?\s*[-~到至]\s*\d{4}年\d{1,2}月?)',
+    r'(\d{4}[./年]\d{1,2}[./月]?\s*[-~到至]\s*\d{4}[./年]\d{1,2}[./月]?)',
+    r'面向.*?(\d{4}年\d{1,2}月[-~到至]\d{4}年\d{1,2}月).*?毕业',
+])
+
+DEADLINE_PATTERNS = PatternFamily("deadline", [
+    r'截止日期[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
+    r'报名截止[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
+    r'申请截止[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
+    r'招聘截止[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
+    r'截止时间[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
+])
+
+DIRECTION_PATTERNS = PatternFamily("direction", [
+    r'招募方向[：:]\s*([^。\n]+)',
+    r'方向[：:]\s*([^。\n]*方向[^。\n]*)',
+    r'技术方向[：:]\s*([^。\n]+)',
+    r'([^。\n]*方向[、，,][^。\n]*方向[^。\n]*)',
+])
+
+class JobPageParser:
+    """岗位页面的本地（CPU）阶段：HTML解析、结构化提取、LLM输入压缩和提取结果缓存查询
+
+    不涉及LLM提供商、限流和HTTP客户端；批量提取时进程池子进程只创建这一部分。
+    """
+
+    def __init__(self, html_parser: str = DEFAULT_HTML_PARSER, input_token_budget: int = 3000,
+                 result_cache: Optional[ExtractionResultCache] = None, result_cache_scope: str = ""):
+        """
+        Args:
+            html_parser: BeautifulSoup解析器
+            input_token_budget: 每个岗位送给LLM的页面内容的token上限（估算值）
+            result_cache: 提取结果缓存，None为不使用缓存
+            result_cache_scope: 计入缓存键的提取器版本、提供商和模型
+        """
+        self.html_parser = html_parser
+        self.input_token_budget = input_token_budget
+        self.result_cache = result_cache or ExtractionResultCache(enabled=False)
+        self.result_cache_scope = result_cache_scope
+    
+    def parse_html(self, html: str) -> ParsedJobDocument:
+        """解析岗位页面，解析失败（如lxml不可用）时回退到html.parser"""
+        try:
+            return ParsedJobDocument(html, self.html_parser)
+        except Exception as e:
+            if self.html_parser == "html.parser":
+                raise
+            print(f"⚠️  {self.html_parser} 解析失败，回退到html.parser: {e}")
+            return ParsedJobDocument(html, "html.parser")
+
+    def _get_crawl_date(self, job_data: Optional[Dict]) -> str:
+        """从原始数据的时间戳字段获取页面抓取日期（YYYY-MM-DD），没有则为空字符串"""
+        if not job_data:
+            return ""
+        
+        timestamp_fields = ['timestamp', '原始时间戳', 'crawl_time', 'created_at']
+        for field in timestamp_fields:
+            if field in job_data and job_data[field]:
+                try:
+                    if isinstance(job_data[field], str):
+                        crawl_time = datetime.strptime(job_data[field], "%Y-%m-%d %H:%M:%S")
+                        crawl_date = crawl_time.strftime("%Y-%m-%d")
+                        print(f"📅 获取抓取时间: {crawl_date} (来源: {field})")
+                        return crawl_date
+                except (ValueError, TypeError) as e:
+                    print(f"⚠️  时间解析失败 {field}: {job_data[field]}, 错误: {e}")
+                    continue
+        return ""
+    
+    def _extract_structured_info(self, html: Union[str, ParsedJobDocument], url: str,
+                                 job_data: Optional[Dict] = None) -> Dict[str, str]:
+        """结构化提取：增强版本（html 可以是已解析的 ParsedJobDocument）"""
+        info = {
+            "岗位名称": "",
+            "薪资": "", 
+            "工作地点": "",
+            "经验要求": "",
+            "发布平台": "",
+            "HR活跃度": "",
+            "页面抓取时间": "",
+            # 新增字段
+            "毕业时间要求": "",
+            "招聘截止日期": "",
+            "招募方向": ""
+        }
+        
+        try:
+            doc = html if isinstance(html, ParsedJobDocument) else self.parse_html(html)
+            text = doc.text
+            
+            # 1. 页面抓取时间 - 从原始数据获取
+            info["页面抓取时间"] = self._get_crawl_date(job_data)
+            
+            # 2. 从URL和标题提取岗位名称
+            title_text = doc.title
+            if title_text:
+                title_match = re.search(r'「([^」]+?)(?:招聘|岗位)?」', title_text)
+                if title_match:
+                    info["岗位名称"] = title_match.group(1)
+                    print(f"📋 从标题提取岗位名称: {info['岗位名称']}")
+            
+            # 3. 判断发布平台
+            if 'zhipin.com' in url:
+                info["发布平台"] = "Boss直聘"
+                
+                # HR活跃度
+                _, activity = ACTIVITY_PATTERNS.first(text)
+                if activity:
+                    info["HR活跃度"] = activity
+            
+            # 4. 薪资提取
+            i, matches = SALARY_PATTERNS.first_all(text)
+            if matches:
+                salary = max(matches, key=len)
+                info["薪资"] = salary
+                print(f"💰 提取薪资: {salary} (模式{i+1})")
+                if len(matches) > 1:
+                    print(f"   🔍 所有匹配: {matches}")
+            
+            # 5. 工作地点提取（只保留城市）
+            i, location = LOCATION_PATTERNS.first(text)
+            if location:
+                location = re.sub(r'\s*\d+[-~]\d*年.*$', '', location).strip()
+                info["工作地点"] = location
+                print(f"🌍 提取地点: {location} (模式{i+1})")
+            
+            # 6. 经验要求提取
+            _, exp = EXPERIENCE_PATTERNS.first(text)
+            if exp:
+                if exp in ["不限", "经验不限", "无经验要求", "不限经验"]:
+                    info["经验要求"] = "经验不限"
+                else:
+                    info["经验要求"] = exp
+                print(f"📅 提取经验: {info['经验要求']}")
+            
+            # 7. 新增：毕业时间要求提取
+            i, graduation_req = GRADUATION_PATTERNS.first(text)
+            if graduation_req:
+                if i in (0, 1):  # 面向XXXX届 / XXXX届毕业生
+                    graduation_req = f"{graduation_req}届"
+                info["毕业时间要求"] = graduation_req
+                print(f"🎓 提取毕业时间要求: {graduation_req} (模式{i+1})")
+            
+            # 8. 新增：招聘截止日期提取
+            i, deadline = DEADLINE_PATTERNS.first(text)
+            if deadline:
+                info["招聘截止日期"] = deadline
+                print(f"⏰ 提取截止日期: {deadline} (模式{i+1})")
+            
+            # 9. 新增：招募方向提取（简单正则），第一条有意义的匹配才采用
+            for i, direction in DIRECTION_PATTERNS.iter_matches(text):
+                direction = direction.strip()
+                if len(direction) > 10 and '方向' in direction:  # 确保是有意义的方向描述
+                    info["招募方向"] = direction
+                    print(f"🎯 提取招募方向: {direction} (模式{i+1})")
+                    break
+            
+        except Exception as e:
+            print(f"⚠️  结构化提取失败: {e}")
+        
+        return info
+    
+    def _prepare_html_for_llm(self, html: Union[str, ParsedJobDocument]) -> str:
+        """为LLM准备HTML，重点保留岗位描述相关内容（html 可以是已解析的 ParsedJobDocument）
+        
+        页面正文切分成文本块，去掉噪声和重复块后按相关度打分（位于岗位描述区域、岗位关键词密度），
+        丢弃不相关的块，其余按分数从高到低填满 input_token_budget，再按页面原顺序输出。
+        """
+        raw_html = html.html if isinstance(html, ParsedJobDocument) else html
+        try:
+            doc = html if isinstance(html, ParsedJobDocument) else self.parse_html(html)
+            region_blocks = set(_split_blocks(doc.job_region))
+            
+            blocks = []
+            seen = set()
+            for block in _split_blocks(doc.page_text):
+                if block in seen:
+                    continue
+                seen.add(block)
+                blocks.append((block, _relevance_score(block, block in region_blocks)))
+            
+            # 没有任何相关块时（无描述区域、无关键词）退化为按页面顺序填充
+            candidates = [i for i, (_, score) in enumerate(blocks) if score > 0] or list(range(len(blocks)))
+            
+            selected = set()
+            used_tokens = 0
+            for index in sorted(candidates, key=lambda i: -blocks[i][1]):
+                tokens = estimate_tokens(blocks[index][0])
+                if used_tokens + tokens <= self.input_token_budget:
+                    selected.add(index)
+                    used_tokens += tokens
+            
+            return '\n'.join(block for index, (block, _) in enumerate(blocks) if index in selected)
+            
+        except Exception as e:
+            print(f"⚠️  HTML预处理失败: {e}")
+            return re.sub(r'<[^>]+>', ' ', raw_html)[:6000]
+    
+    def prepare_extraction(self, html: str, url: str, job_data: Optional[Dict] = None) -> Tuple[Dict[str, str], str]:
+        """本地（CPU）阶段：解析HTML一次，返回 (结构化提取结果, 送给LLM的页面内容)"""
+        # 每个岗位只解析一次，两个阶段共用
+        try:
+            doc = self.parse_html(html)
+        except Exception as e:
+            print(f"⚠️  HTML解析失败: {e}")
+            doc = html
+        
+        # 1. 结构化提取
+        structured_info = self._extract_structured_info(doc, url, job_data)
+        
+        # 2. LLM提取岗位描述和公司名称，以及补充招募方向
+        processed_html = self._prepare_html_for_llm(doc)
+        
+        return structured_info, processed_html
+    
+    def result_cache_key(self, url: str, html: str) -> Optional[Tuple[str, str]]:
+        """提取结果缓存键，未启用缓存时为None"""
+        if not self.result_cache.enabled:
+            return None
+        return ExtractionResultCache.make_key(url, html, self.result_cache_scope)
+    
+    def prepare_job(self, job: Dict[str, Any]) -> Optional[Tuple[Optional[Tuple[str, str]], Union[Dict[str, Any], Tuple[Dict[str, str], str]]]]:
+        """对一条岗位记录执行本地阶段：HTML只读取一次，先查提取结果缓存，未命中再解析
+        
+        返回 (cache_key, 缓存的结果dict) 或 (cache_key, (结构化提取结果, 页面内容))，没有HTML时返回None。
+        缓存的结果还需经 refresh_cached_result 更新与当前时间相关的字段。
+        """
+        html = job.get('html', '')
+        if not html or not html.strip():
+            return None
+        url = job_url(job)
+        cache_key = self.result_cache_key(url, html)
+        if cache_key is not None:
+            cached = self.result_cache.get(cache_key)
+            if cached:
+                return cache_key, cached
+        return cache_key, self.prepare_extraction(html, url, job)
+
+class EnhancedNotionExtractor(JobPageParser):
     def __init__(self, provider=None, config=None):
         """增强版Notion提取器"""
         self.provider = provider or os.getenv("LLM_PROVIDER", "deepseek")
@@ -38,8 +514,25 @@ class EnhancedNotionExtractor:
         
         self.temperature = self._get_config_value("temperature", 0)
         self.max_tokens = self._get_config_value("max_tokens", 1000)
+        # 单次请求的输出上限（提供商限制），批量请求的 max_tokens 不超过该值
+        self.max_output_tokens = self._get_config_value("max_output_tokens",
+                                                        PROVIDER_MAX_OUTPUT_TOKENS.get(self.provider, 4096))
+        # 批量提取时本地解析/正则阶段的进程数，1为不使用进程池；实际进程数不超过待提取的岗位数
+        self.extraction_workers = self._get_config_value("extraction_workers", min(4, os.cpu_count() or 1))
+        # 批量提取时同时进行的LLM请求数
+        self.max_in_flight = self._get_config_value("max_in_flight", 4)
+        # 每次LLM请求合并提取的岗位数，1为逐个提取
+        self.batch_size = self._get_config_value("batch_size", 1)
         
         self._setup_provider()
+        super().__init__(
+            html_parser=self._get_config_value("html_parser", DEFAULT_HTML_PARSER),
+            input_token_budget=self._get_config_value("input_token_budget", 3000),
+            result_cache=ExtractionResultCache.from_config(self.config.get("llm", {}).get("result_cache")),
+            result_cache_scope=f"v{EXTRACTION_VERSION}|{self.provider}|{self.model}"
+        )
+        self.rate_limiter = LLMRateLimiter.from_config(self.provider, self.config.get("llm", {}))
+        self.response_cache = LLMResponseCache.from_config(self.config.get("llm", {}).get("cache"))
     
     def _get_config_value(self, key: str, default_value):
         """获取配置值"""
@@ -203,245 +696,19 @@ class EnhancedNotionExtractor:
         except:
             return "❌ 日期解析失败"
     
-    def _extract_structured_info(self, html: str, url: str, job_data: Optional[Dict] = None) -> Dict[str, str]:
-        """结构化提取：增强版本"""
-        info = {
-            "岗位名称": "",
-            "薪资": "", 
-            "工作地点": "",
-            "经验要求": "",
-            "发布平台": "",
-            "HR活跃度": "",
-            "页面抓取时间": "",
-            # 新增字段
-            "毕业时间要求": "",
-            "招聘截止日期": "",
-            "招募方向": ""
-        }
+    async def _call_llm_api(self, messages: list, max_retries: int = 3, max_tokens: Optional[int] = None,
+                            cache_check: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """调用LLM API（相同请求优先读取响应缓存），max_tokens 默认为配置值，不超过 max_output_tokens
         
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            text = soup.get_text()
-            
-            # 1. 页面抓取时间 - 从原始数据获取
-            if job_data:
-                timestamp_fields = ['timestamp', '原始时间戳', 'crawl_time', 'created_at']
-                for field in timestamp_fields:
-                    if field in job_data and job_data[field]:
-                        try:
-                            if isinstance(job_data[field], str):
-                                crawl_time = datetime.strptime(job_data[field], "%Y-%m-%d %H:%M:%S")
-                                info["页面抓取时间"] = crawl_time.strftime("%Y-%m-%d")
-                                print(f"📅 获取抓取时间: {info['页面抓取时间']} (来源: {field})")
-                                break
-                        except (ValueError, TypeError) as e:
-                            print(f"⚠️  时间解析失败 {field}: {job_data[field]}, 错误: {e}")
-                            continue
-            
-            # 2. 从URL和标题提取岗位名称
-            title = soup.find('title')
-            if title:
-                title_text = title.get_text()
-                title_match = re.search(r'「([^」]+?)(?:招聘|岗位)?」', title_text)
-                if title_match:
-                    info["岗位名称"] = title_match.group(1)
-                    print(f"📋 从标题提取岗位名称: {info['岗位名称']}")
-            
-            # 3. 判断发布平台
-            if 'zhipin.com' in url:
-                info["发布平台"] = "Boss直聘"
-                
-                # HR活跃度
-                activity_patterns = [
-                    r'(\d+日?内活跃)', r'(刚刚活跃)', r'(今日活跃)', 
-                    r'(本周活跃)', r'(\d+分钟前活跃)', r'(\d+小时前活跃)'
-                ]
-                for pattern in activity_patterns:
-                    match = re.search(pattern, text)
-                    if match:
-                        info["HR活跃度"] = match.group(1)
-                        break
-            
-            # 4. 薪资提取
-            salary_patterns = [
-                r'(\d+[-~到]\d+[kK万](?:·\d+薪)?)',
-                r'(\d+[kK][-~到]\d+[kK](?:·\d+薪)?)',
-                r'(\d+万[-~到]\d+万(?:·\d+薪)?)',
-                r'(\d+[kK]\+(?:·\d+薪)?)',
-                r'(\d+万\+(?:·\d+薪)?)',
-                r'(\d+[-~到]\d+万/年)',
-                r'(\d+[-~到]\d+元/天)',
-                r'(\d+[kK万]·\d+薪)',
-                r'(面议)',
-                r'(\d+万(?:·\d+薪)?)',
-                r'(\d+[kK](?:·\d+薪)?)'
-            ]
-            
-            for i, pattern in enumerate(salary_patterns):
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    salary = max(matches, key=len)
-                    info["薪资"] = salary
-                    print(f"💰 提取薪资: {salary} (模式{i+1})")
-                    if len(matches) > 1:
-                        print(f"   🔍 所有匹配: {matches}")
-                    break
-            
-            # 5. 工作地点提取（只保留城市）
-            location_patterns = [
-                r'(北京)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(上海)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(深圳)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(杭州)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(广州)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(成都)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(武汉)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(西安)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(南京)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(苏州)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(天津)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(重庆)(?:市|[·\s]*[^，。\s\d]*区)?(?![·\s]*\d+[-~]\d*年)',
-                r'(远程办公)', r'(在家办公)', r'(全远程)', r'(Remote)'
-            ]
-            
-            for i, pattern in enumerate(location_patterns):
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    location = matches[0]
-                    location = re.sub(r'\s*\d+[-~]\d*年.*$', '', location).strip()
-                    info["工作地点"] = location
-                    print(f"🌍 提取地点: {location} (模式{i+1})")
-                    break
-            
-            # 6. 经验要求提取
-            exp_patterns = [
-                r'(\d+[-~]\d+年工作经验)', r'(\d+[-~]\d+年经验)', r'(\d+年以上工作经验)',
-                r'(\d+年以上经验)', r'(\d+\+年经验)', r'(\d+年工作经验)', r'(\d+年经验)',
-                r'(应届毕业生)', r'(应届生)', r'(实习生)', r'(经验不限)',
-                r'(在校/应届)', r'(校招)', r'(无经验要求)', r'(不限经验)',
-                r'(面向\d+届)', r'(不限)'
-            ]
-            
-            for pattern in exp_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    exp = matches[0]
-                    if exp in ["不限", "经验不限", "无经验要求", "不限经验"]:
-                        info["经验要求"] = "经验不限"
-                    else:
-                        info["经验要求"] = exp
-                    print(f"📅 提取经验: {info['经验要求']}")
-                    break
-            
-            # 7. 新增：毕业时间要求提取
-            graduation_patterns = [
-                r'面向(\d{4})届',
-                r'(\d{4})届毕业生',
-                r'毕业时间[：:]\s*(\d{4}年?\s*[-~到至]\s*\d{4}年?)',
-                r'(\d{4}年\d{1,2}月?\s*[-~到至]\s*\d{4}年\d{1,2}月?)',
-                r'(\d{4}[./年]\d{1,2}[./月]?\s*[-~到至]\s*\d{4}[./年]\d{1,2}[./月]?)',
-                r'面向.*?(\d{4}年\d{1,2}月[-~到至]\d{4}年\d{1,2}月).*?毕业',
-            ]
-            
-            for i, pattern in enumerate(graduation_patterns):
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    graduation_req = matches[0]
-                    if pattern == graduation_patterns[0] or pattern == graduation_patterns[1]:
-                        graduation_req = f"{graduation_req}届"
-                    info["毕业时间要求"] = graduation_req
-                    print(f"🎓 提取毕业时间要求: {graduation_req} (模式{i+1})")
-                    break
-            
-            # 8. 新增：招聘截止日期提取
-            deadline_patterns = [
-                r'截止日期[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
-                r'报名截止[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
-                r'申请截止[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
-                r'招聘截止[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
-                r'截止时间[：:]\s*(\d{4}[./年]\d{1,2}[./月]\d{1,2}[日]?)',
-            ]
-            
-            for i, pattern in enumerate(deadline_patterns):
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    deadline = matches[0]
-                    info["招聘截止日期"] = deadline
-                    print(f"⏰ 提取截止日期: {deadline} (模式{i+1})")
-                    break
-            
-            # 9. 新增：招募方向提取（简单正则）
-            direction_patterns = [
-                r'招募方向[：:]\s*([^。\n]+)',
-                r'方向[：:]\s*([^。\n]*方向[^。\n]*)',
-                r'技术方向[：:]\s*([^。\n]+)',
-                r'([^。\n]*方向[、，,][^。\n]*方向[^。\n]*)',
-            ]
-            
-            for i, pattern in enumerate(direction_patterns):
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                if matches:
-                    direction = matches[0].strip()
-                    if len(direction) > 10 and '方向' in direction:  # 确保是有意义的方向描述
-                        info["招募方向"] = direction
-                        print(f"🎯 提取招募方向: {direction} (模式{i+1})")
-                        break
-            
-        except Exception as e:
-            print(f"⚠️  结构化提取失败: {e}")
+        只有调用方提供 cache_check 且返回内容通过校验（能正确解析）时才写入响应缓存；
+        因 max_tokens 被截断（finish_reason == "length"）的返回一律不缓存。
+        """
+        max_tokens = min(max_tokens or self.max_tokens, self.max_output_tokens)
+        cache_key = LLMResponseCache.make_key(self.provider, self.model, self.temperature, max_tokens, messages)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        return info
-    
-    def _prepare_html_for_llm(self, html: str) -> str:
-        """为LLM准备HTML，重点保留岗位描述相关内容"""
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # 移除明显噪声
-            for elem in soup(['script', 'style', 'nav', 'footer', 'header']):
-                elem.decompose()
-            
-            # 查找主要岗位描述区域
-            job_content_selectors = [
-                '[class*="job-detail"]',
-                '[class*="job-description"]', 
-                '[class*="position-detail"]',
-                '[class*="job-content"]',
-                '[class*="desc"]'
-            ]
-            
-            main_content = ""
-            for selector in job_content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    main_content = "\n".join([elem.get_text(separator='\n') for elem in elements])
-                    break
-            
-            if not main_content:
-                main_content = soup.get_text(separator='\n')
-            
-            # 清理和过滤
-            lines = main_content.split('\n')
-            cleaned_lines = []
-            
-            for line in lines:
-                line = line.strip()
-                if (len(line) > 5 and 
-                    line not in cleaned_lines[-3:] and
-                    not re.match(r'^[>\s•·\-\*\.]+$', line) and
-                    '举报' not in line and '客服' not in line and 
-                    '扫码' not in line and '微信' not in line):
-                    cleaned_lines.append(line)
-            
-            content = '\n'.join(cleaned_lines)
-            return content[:6000]
-            
-        except Exception as e:
-            print(f"⚠️  HTML预处理失败: {e}")
-            return re.sub(r'<[^>]+>', ' ', html)[:6000]
-    
-    async def _call_llm_api(self, messages: list, max_retries: int = 3) -> Optional[str]:
-        """调用LLM API"""
         if not self.api_key:
             print(f"[ERROR] {self.provider} API key not configured")
             return None
@@ -455,27 +722,38 @@ class EnhancedNotionExtractor:
             "model": self.model,
             "messages": messages,
             "temperature": self.temperature,
-            "max_tokens": self.max_tokens
+            "max_tokens": max_tokens
         }
         
         if self.provider == "zhipu":
             data["stream"] = False
         
+        request_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages) + max_tokens
+        
         for attempt in range(max_retries):
             try:
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    response = await client.post(
-                        f"{self.base_url}/chat/completions",
-                        headers=headers,
-                        json=data
-                    )
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        content = result["choices"][0]["message"]["content"]
-                        return content
-                    else:
-                        print(f"⚠️  API错误: {response.status_code}")
+                await self.rate_limiter.acquire(request_tokens)
+                client = get_llm_client(self.provider, self.base_url, self.config.get("llm", {}).get("http"))
+                response = await client.post(
+                    f"{self.base_url}/chat/completions",
+                    headers=headers,
+                    json=data
+                )
+                
+                if response.status_code == 200:
+                    result = response.json()
+                    choice = result["choices"][0]
+                    content = choice["message"]["content"]
+                    if choice.get("finish_reason") == "length":
+                        print(f"⚠️  LLM返回被截断 (max_tokens={max_tokens})，不写入缓存")
+                    elif content and cache_check is not None and cache_check(content):
+                        self.response_cache.put(cache_key, content)
+                    return content
+                elif response.status_code == 429:
+                    print(f"⚠️  API限流: {response.status_code}")
+                    self.rate_limiter.pause(_retry_after(response, default=10.0 * (2 ** attempt)))
+                else:
+                    print(f"⚠️  API错误: {response.status_code}")
                         
             except Exception as e:
                 print(f"⚠️  API调用异常 (尝试 {attempt + 1}/{max_retries}): {e}")
@@ -485,19 +763,166 @@ class EnhancedNotionExtractor:
         
         return None
     
+    @property
+    def max_batch_size(self) -> int:
+        """一次请求最多合并的岗位数：每个岗位预留 max_tokens 输出，合计不超过 max_output_tokens"""
+        return max(1, self.max_output_tokens // max(1, self.max_tokens))
+    
+    def extraction_stats(self) -> Dict[str, Any]:
+        """批量提取的并发配置和LLM请求限流统计"""
+        return {
+            "extraction_workers": self.extraction_workers,
+            "max_in_flight": self.max_in_flight,
+            "batch_size": self.batch_size,
+            "max_batch_size": self.max_batch_size,
+            **self.rate_limiter.stats()
+        }
+    
+    async def aclose(self) -> None:
+        """关闭缓存和本提取器所用提供商的共享客户端"""
+        self.response_cache.close()
+        self.result_cache.close()
+        client = _llm_clients.pop((self.provider, self.base_url), None)
+        if client is not None:
+            await client.aclose()
+    
     async def extract_for_notion_enhanced(self, html: str, url: str, job_data: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
         """增强版Notion提取方法"""
         if not html or not html.strip():
             return None
         
+        cache_key = self.result_cache_key(url, html)
+        cached = self.result_cache.get(cache_key) if cache_key is not None else None
+        if cached:
+            return self.refresh_cached_result(cached, url, job_data)
+        
         print(f"🔄 开始增强提取: {url}")
+        structured_info, processed_html = self.prepare_extraction(html, url, job_data)
+        return await self.complete_extraction(url, structured_info, processed_html, cache_key)
+    
+    def refresh_cached_result(self, cached: Dict[str, Any], url: str,
+                              job_data: Optional[Dict] = None) -> Dict[str, Any]:
+        """重新计算缓存结果中与当前岗位、当前时间相关的字段"""
+        print(f"♻️  复用提取结果: {url}")
+        cached["岗位链接"] = url
+        cached["页面抓取时间"] = self._get_crawl_date(job_data) or cached.get("页面抓取时间", "")
+        cached["招聘截止日期_状态"] = self.check_deadline_status(cached.get("招聘截止日期_标准化", ""))
+        cached["提取时间"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return cached
+    
+    async def iter_extract_batch(self, jobs: List[Dict[str, Any]],
+                                 max_workers: Optional[int] = None,
+                                 max_in_flight: Optional[int] = None,
+                                 batch_size: Optional[int] = None) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """批量提取，按输入顺序逐个返回 (序号, 提取结果)，没有HTML或提取失败时结果为None
         
-        # 1. 结构化提取
-        structured_info = self._extract_structured_info(html, url, job_data)
+        提取结果缓存查询、HTML解析和正则提取在进程池中执行（子进程自行读取延迟加载的HTML，每个岗位只读取一次），
+        LLM调用在事件循环上并发进行，同时最多 max_in_flight 个，并受提供商RPM/TPM限流。
+        batch_size 大于1时每 batch_size 个岗位合并为一次LLM请求（见 complete_extraction_batch），
+        超过 max_batch_size 时缩小到 max_batch_size。
+        max_workers 为1或只有一个岗位时本地阶段在当前进程内执行。
+        """
+        max_workers = self.extraction_workers if max_workers is None else max_workers
+        max_in_flight = max(1, self.max_in_flight if max_in_flight is None else max_in_flight)
+        batch_size = max(1, self.batch_size if batch_size is None else batch_size)
+        if batch_size > self.max_batch_size:
+            print(f"⚠️  batch_size={batch_size} 的输出超过单次请求上限 {self.max_output_tokens} tokens，"
+                  f"缩小为 {self.max_batch_size}")
+            batch_size = self.max_batch_size
+        executor = None
+        if max_workers > 1 and len(jobs) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)),
+                                           initializer=_init_extraction_worker,
+                                           initargs=(self.html_parser, self.input_token_budget,
+                                                     self.config.get("llm", {}).get("result_cache"),
+                                                     self.result_cache_scope))
         
-        # 2. LLM提取岗位描述和公司名称，以及补充招募方向
-        processed_html = self._prepare_html_for_llm(html)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_in_flight)
+        # 最多提前处理的批次数，限制内存中等待返回的结果
+        lookahead = max(1, -(-max(max_workers * 4, max_in_flight * 2 * batch_size) // batch_size))
         
+        async def prepare(job: Dict[str, Any]):
+            """本地阶段：返回缓存结果（dict）、待LLM提取的 (url, 结构化结果, 页面内容, cache_key) 或None"""
+            try:
+                url = job_url(job)
+                run_locally = executor is None
+                if executor:
+                    try:
+                        prepared = await loop.run_in_executor(executor, _prepare_job_in_worker, job)
+                        if prepared is not None and prepared[0] is not None:
+                            # 子进程中的缓存查询计入主进程的统计
+                            self.result_cache.record_lookup(isinstance(prepared[1], dict))
+                    except Exception as e:
+                        print(f"⚠️  进程池提取失败，改为本地执行: {e}")
+                        run_locally = True
+                if run_locally:
+                    prepared = self.prepare_job(job)
+                
+                if prepared is None:
+                    return None
+                cache_key, outcome = prepared
+                if isinstance(outcome, dict):
+                    return self.refresh_cached_result(outcome, url, job)
+                return (url, *outcome, cache_key)
+            except Exception as e:
+                print(f"⚠️  岗位提取异常: {e}")
+                return None
+        
+        async def extract_chunk(chunk: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+            prepared = await asyncio.gather(*(prepare(job) for job in chunk))
+            results = [item if isinstance(item, dict) else None for item in prepared]
+            todo = [i for i, item in enumerate(prepared) if isinstance(item, tuple)]
+            if not todo:
+                return results
+            
+            try:
+                async with semaphore:
+                    for i in todo:
+                        print(f"🔄 开始增强提取: {prepared[i][0]}")
+                    if len(todo) == 1:
+                        extracted = [await self.complete_extraction(*prepared[todo[0]])]
+                    else:
+                        extracted = await self.complete_extraction_batch([prepared[i] for i in todo])
+                for i, result in zip(todo, extracted):
+                    results[i] = result
+            except Exception as e:
+                print(f"⚠️  岗位提取异常: {e}")
+            return results
+        
+        pending = deque()
+        submitted = 0
+        
+        try:
+            while submitted < len(jobs) or pending:
+                while submitted < len(jobs) and len(pending) < lookahead:
+                    chunk = jobs[submitted:submitted + batch_size]
+                    pending.append((submitted, asyncio.ensure_future(extract_chunk(chunk))))
+                    submitted += len(chunk)
+                start, task = pending.popleft()
+                for offset, result in enumerate(await task):
+                    yield start + offset, result
+        finally:
+            for _, task in pending:
+                task.cancel()
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def extract_batch(self, jobs: List[Dict[str, Any]], max_workers: Optional[int] = None,
+                            max_in_flight: Optional[int] = None,
+                            batch_size: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+        """批量提取，结果与输入一一对应"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        async for i, result in self.iter_extract_batch(jobs, max_workers, max_in_flight, batch_size):
+            results[i] = result
+        return results
+    
+    async def complete_extraction(self, url: str, structured_info: Dict[str, str], processed_html: str,
+                                  cache_key: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+        """LLM阶段：提取岗位描述等字段并与结构化提取结果合并，LLM失败时只返回结构化结果
+        
+        LLM提取成功时按 cache_key 保存结果；只有结构化结果时不缓存，下次重新调用LLM。
+        """
         prompt = f"""
 请从以下招聘页面内容中提取信息。注意：只提取招聘岗位的信息，不要提取HR的个人信息。
 
@@ -506,33 +931,7 @@ class EnhancedNotionExtractor:
 
 请提取以下信息，以JSON格式返回：
 
-1. **岗位描述**：详细的工作职责和技能要求，包括：
-   - 具体的工作内容和职责
-   - 技能要求和技术栈
-   - 任职要求和条件
-   注意：只要核心岗位内容，去除公司介绍、福利待遇、联系方式等
-   
-2. **公司名称**：招聘公司的准确名称
-
-3. **发布日期**：如果页面中明确显示岗位发布时间，提取格式为YYYY-MM-DD，没有则为空字符串
-   重要提醒：
-   - 只要真正的岗位发布日期，不要公司成立日期
-   - 不要HR注册时间、公司创建时间、更新时间
-   - 不要任何非岗位相关的日期
-   - 如果不确定是否为岗位发布日期，请设为空字符串
-   
-4. **发布日期来源**：说明你从页面的哪个部分提取到发布日期，必须明确是岗位发布相关，如果没有找到真正的岗位发布日期则为空字符串
-
-5. **招募方向**：如果页面中提到具体的技术方向或招募方向，请提取出来。如预训练方向、大数据方向、创新方向、多模态方向等。没有则为空字符串。
-
-要求：
-- 专注于招聘岗位的核心信息
-- 岗位描述要完整但简洁，突出关键职责和技能
-- 对发布日期要特别谨慎，宁可为空也不要错误的日期
-- 如果字段不存在则设为空字符串
-- 只返回JSON格式，不要其他文字
-
-返回格式：
+{LLM_FIELD_INSTRUCTIONS}返回格式：
 {{
   "岗位描述": "详细的岗位职责和技能要求...",
   "公司名称": "公司名称", 
@@ -545,69 +944,163 @@ class EnhancedNotionExtractor:
         messages = [{"role": "user", "content": prompt}]
         
         try:
-            content = await self._call_llm_api(messages)
+            content = await self._call_llm_api(
+                messages, cache_check=lambda reply: _parse_single_response(reply) is not None
+            )
             
+            llm_data = _parse_single_response(content) if content else None
+            if llm_data is not None:
+                return self._merge_llm_result(url, structured_info, llm_data, cache_key)
             if content:
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group()
-                    llm_data = json.loads(json_str)
-                    
-                    # 合并结构化提取和LLM提取的结果
-                    raw_graduation_req = structured_info.get("毕业时间要求", "")
-                    raw_deadline = structured_info.get("招聘截止日期", "")
-                    
-                    # 日期标准化
-                    standardized_graduation = self.standardize_date_format(raw_graduation_req) if raw_graduation_req else ""
-                    standardized_deadline = self.standardize_date_format(raw_deadline) if raw_deadline else ""
-                    
-                    # 招募方向合并（优先使用LLM提取的，如果为空则使用正则提取的）
-                    recruitment_direction = llm_data.get("招募方向", "") or structured_info.get("招募方向", "")
-                    
-                    final_result = {
-                        "岗位名称": structured_info.get("岗位名称", ""),
-                        "岗位描述": llm_data.get("岗位描述", ""),
-                        "发布日期": llm_data.get("发布日期", ""),
-                        "发布日期来源": llm_data.get("发布日期来源", ""),
-                        "发布平台": structured_info.get("发布平台", ""),
-                        "HR活跃度": structured_info.get("HR活跃度", ""),
-                        "公司名称": llm_data.get("公司名称", ""),
-                        "薪资": structured_info.get("薪资", ""),
-                        "经验要求": structured_info.get("经验要求", ""),
-                        "工作地点": structured_info.get("工作地点", ""),
-                        "岗位链接": url,
-                        "页面抓取时间": structured_info.get("页面抓取时间", ""),
-                        
-                        # 新增字段
-                        "毕业时间要求": raw_graduation_req,
-                        "毕业时间要求_标准化": standardized_graduation,
-                        "毕业时间_匹配状态": self.check_graduation_eligibility(raw_graduation_req),
-                        "招聘截止日期": raw_deadline,
-                        "招聘截止日期_标准化": standardized_deadline,
-                        "招聘截止日期_状态": self.check_deadline_status(standardized_deadline),
-                        "招募方向": recruitment_direction,
-                        
-                        "提取时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    
-                    # 调试信息
-                    print(f"[OK] Enhanced extraction completed:")
-                    print(f"   岗位名称: {final_result.get('岗位名称', 'N/A')}")
-                    print(f"   薪资: {final_result.get('薪资', 'N/A')}")
-                    print(f"   地点: {final_result.get('工作地点', 'N/A')}")
-                    print(f"   经验: {final_result.get('经验要求', 'N/A')}")
-                    print(f"   🎓 毕业时间要求: {final_result.get('毕业时间要求', 'N/A')}")
-                    print(f"   📊 匹配状态: {final_result.get('毕业时间_匹配状态', 'N/A')}")
-                    print(f"   ⏰ 招聘截止日期: {final_result.get('招聘截止日期', 'N/A')} -> {final_result.get('招聘截止日期_标准化', 'N/A')}")
-                    print(f"   📈 截止状态: {final_result.get('招聘截止日期_状态', 'N/A')}")
-                    print(f"   🎯 招募方向: {final_result.get('招募方向', 'N/A')}")
-                    
-                    return final_result
-                    
+                print(f"⚠️  LLM返回无法解析为JSON: {content[:100]}")
+            
         except Exception as e:
             print(f"⚠️  LLM提取失败: {e}")
         
         # 如果LLM失败，返回结构化提取的结果
+        return self._fallback_result(url, structured_info)
+    
+    async def complete_extraction_batch(self, items: List[Tuple[str, Dict[str, str], str, Optional[Tuple[str, str]]]],
+                                        max_retries: int = 1) -> List[Dict[str, Any]]:
+        """多个岗位合并为一次LLM请求，items 为 (url, 结构化提取结果, 页面内容, cache_key)，结果与 items 一一对应
+        
+        LLM返回的JSON数组按"编号"对应岗位；部分岗位缺失时只把缺失的岗位合并重试 max_retries 次，
+        整批都无法解析或重试后仍失败的岗位逐个单独提取（提示词不同，不会命中同一条缓存）。
+        整个请求失败（API不可用）时直接返回结构化结果，与单岗位提取一致。
+        一次请求的 max_tokens 为 max_tokens × 岗位数，items 超过 max_batch_size 时拆成多个批次依次请求。
+        """
+        if len(items) > self.max_batch_size:
+            chunked: List[Dict[str, Any]] = []
+            for start in range(0, len(items), self.max_batch_size):
+                chunked.extend(await self.complete_extraction_batch(items[start:start + self.max_batch_size],
+                                                                    max_retries))
+            return chunked
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending = list(range(len(items)))
+        
+        for attempt in range(max_retries + 1):
+            if len(pending) <= 1:
+                break
+            
+            batch = [items[i] for i in pending]
+            content = await self._call_llm_api(
+                [{"role": "user", "content": self._build_batch_prompt([item[2] for item in batch])}],
+                max_tokens=min(self.max_tokens * len(batch), self.max_output_tokens),
+                cache_check=lambda reply: len(_parse_batch_response(reply, len(batch))) == len(batch)
+            )
+            if not content:
+                print(f"⚠️  批量LLM提取失败: {len(batch)} 个岗位使用结构化结果")
+                for i in pending:
+                    url, structured_info = items[i][:2]
+                    results[i] = self._fallback_result(url, structured_info)
+                return results
+            
+            parsed = _parse_batch_response(content, len(batch))
+            failed = []
+            for batch_index, i in enumerate(pending):
+                llm_data = parsed.get(batch_index)
+                if llm_data is None:
+                    failed.append(i)
+                    continue
+                url, structured_info, _, cache_key = items[i]
+                results[i] = self._merge_llm_result(url, structured_info, llm_data, cache_key)
+            
+            if len(failed) == len(pending):
+                # 整批都无法解析时再发同样的批次只会得到同样的结果，直接改为逐个提取
+                print(f"⚠️  批量提取返回无法解析，{len(failed)} 个岗位改为逐个提取")
+                pending = failed
+                break
+            if failed:
+                print(f"⚠️  批量提取中 {len(failed)}/{len(pending)} 个岗位结果缺失，重试 (第 {attempt + 1} 次)")
+            pending = failed
+        
+        for i in pending:
+            results[i] = await self.complete_extraction(*items[i])
+        return results
+    
+    def _build_batch_prompt(self, contents: List[str]) -> str:
+        """多岗位提取提示词：说明只出现一次，岗位按编号排列"""
+        pages = "\n\n".join(f"### 岗位 {index}\n{content}" for index, content in enumerate(contents))
+        return f"""
+以下是 {len(contents)} 个招聘页面的内容，按"### 岗位 编号"分隔。请分别从每个页面中提取信息。注意：只提取招聘岗位的信息，不要提取HR的个人信息。
+
+{pages}
+
+对每个岗位提取以下信息：
+
+{LLM_FIELD_INSTRUCTIONS}- 每个岗位一个JSON对象，"编号"与页面编号一致，所有岗位放在一个JSON数组中
+
+返回格式：
+[
+  {{
+    "编号": 0,
+    "岗位描述": "详细的岗位职责和技能要求...",
+    "公司名称": "公司名称",
+    "发布日期": "YYYY-MM-DD或空字符串",
+    "发布日期来源": "明确说明从页面哪里提取到岗位发布日期，没有则为空",
+    "招募方向": "具体的技术方向或招募方向，没有则为空"
+  }}
+]
+"""
+    
+    def _merge_llm_result(self, url: str, structured_info: Dict[str, str], llm_data: Dict[str, Any],
+                          cache_key: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+        """合并结构化提取和LLM提取的结果，按 cache_key 保存"""
+        raw_graduation_req = structured_info.get("毕业时间要求", "")
+        raw_deadline = structured_info.get("招聘截止日期", "")
+        
+        # 日期标准化
+        standardized_graduation = self.standardize_date_format(raw_graduation_req) if raw_graduation_req else ""
+        standardized_deadline = self.standardize_date_format(raw_deadline) if raw_deadline else ""
+        
+        # 招募方向合并（优先使用LLM提取的，如果为空则使用正则提取的）
+        recruitment_direction = llm_data.get("招募方向", "") or structured_info.get("招募方向", "")
+        
+        final_result = {
+            "岗位名称": structured_info.get("岗位名称", ""),
+            "岗位描述": llm_data.get("岗位描述", ""),
+            "发布日期": llm_data.get("发布日期", ""),
+            "发布日期来源": llm_data.get("发布日期来源", ""),
+            "发布平台": structured_info.get("发布平台", ""),
+            "HR活跃度": structured_info.get("HR活跃度", ""),
+            "公司名称": llm_data.get("公司名称", ""),
+            "薪资": structured_info.get("薪资", ""),
+            "经验要求": structured_info.get("经验要求", ""),
+            "工作地点": structured_info.get("工作地点", ""),
+            "岗位链接": url,
+            "页面抓取时间": structured_info.get("页面抓取时间", ""),
+            
+            # 新增字段
+            "毕业时间要求": raw_graduation_req,
+            "毕业时间要求_标准化": standardized_graduation,
+            "毕业时间_匹配状态": self.check_graduation_eligibility(raw_graduation_req),
+            "招聘截止日期": raw_deadline,
+            "招聘截止日期_标准化": standardized_deadline,
+            "招聘截止日期_状态": self.check_deadline_status(standardized_deadline),
+            "招募方向": recruitment_direction,
+            
+            "提取时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        
+        # 调试信息
+        print(f"[OK] Enhanced extraction completed:")
+        print(f"   岗位名称: {final_result.get('岗位名称', 'N/A')}")
+        print(f"   薪资: {final_result.get('薪资', 'N/A')}")
+        print(f"   地点: {final_result.get('工作地点', 'N/A')}")
+        print(f"   经验: {final_result.get('经验要求', 'N/A')}")
+        print(f"   🎓 毕业时间要求: {final_result.get('毕业时间要求', 'N/A')}")
+        print(f"   📊 匹配状态: {final_result.get('毕业时间_匹配状态', 'N/A')}")
+        print(f"   ⏰ 招聘截止日期: {final_result.get('招聘截止日期', 'N/A')} -> {final_result.get('招聘截止日期_标准化', 'N/A')}")
+        print(f"   📈 截止状态: {final_result.get('招聘截止日期_状态', 'N/A')}")
+        print(f"   🎯 招募方向: {final_result.get('招募方向', 'N/A')}")
+        
+        if cache_key is not None:
+            self.result_cache.put(cache_key, final_result)
+        return final_result
+    
+    def _fallback_result(self, url: str, structured_info: Dict[str, str]) -> Dict[str, Any]:
+        """LLM失败时只用结构化提取的结果"""
         raw_graduation_req = structured_info.get("毕业时间要求", "")
         raw_deadline = structured_info.get("招聘截止日期", "")
         standardized_graduation = self.standardize_date_format(raw_graduation_req) if raw_graduation_req else ""
@@ -641,6 +1134,87 @@ class EnhancedNotionExtractor:
         
         return fallback_result
 
+def _split_blocks(text: str) -> List[str]:
+    """把页面文本切分成文本块：按行切分，过长的行再按句子切分，并过滤噪声行"""
+    blocks = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if (len(line) <= 5 or
+            re.match(r'^[>\s•·\-\*\.]+$', line) or
+            '举报' in line or '客服' in line or
+            '扫码' in line or '微信' in line):
+            continue
+        if len(line) <= MAX_BLOCK_CHARS:
+            blocks.append(line)
+            continue
+        for sentence in re.findall(r'[^。；;！!？?]+[。；;！!？?]?', line):
+            sentence = sentence.strip()
+            if len(sentence) > 5:
+                blocks.append(sentence)
+    return blocks
+
+def _relevance_score(block: str, in_job_region: bool) -> float:
+    """文本块相关度：位于岗位描述区域加分，再加上岗位关键词密度（每20个字符的命中数）"""
+    hits = sum(block.count(keyword) for keyword in JOB_RELEVANCE_KEYWORDS)
+    density = hits / max(1.0, len(block) / 20)
+    return (3.0 if in_job_region else 0.0) + min(density, 3.0)
+
+def _parse_single_response(content: str) -> Optional[Dict[str, Any]]:
+    """解析单岗位提取返回的JSON对象，无法解析时返回None"""
+    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+    if not json_match:
+        return None
+    try:
+        llm_data = json.loads(json_match.group())
+    except json.JSONDecodeError:
+        return None
+    return llm_data if isinstance(llm_data, dict) else None
+
+def _parse_batch_response(content: str, size: int) -> Dict[int, Dict[str, Any]]:
+    """解析多岗位提取返回的JSON数组，返回 {编号: 字段}；编号越界、重复或格式不对的条目忽略"""
+    json_match = re.search(r'\[.*\]', content, re.DOTALL)
+    if not json_match:
+        return {}
+    try:
+        entries = json.loads(json_match.group())
+    except json.JSONDecodeError:
+        return {}
+    
+    parsed: Dict[int, Dict[str, Any]] = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("编号"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < size and index not in parsed:
+            parsed[index] = entry
+    return parsed
+
+def _retry_after(response, default: float) -> float:
+    """429响应的 Retry-After（秒），没有或无法解析时用 default"""
+    try:
+        return max(1.0, float(response.headers.get("retry-after", "")))
+    except (TypeError, ValueError):
+        return default
+
+def job_url(job: Dict[str, Any]) -> str:
+    """岗位链接：标准化后的记录为 '岗位链接'，原始记录为 'url'"""
+    return job.get('岗位链接') or job.get('url', '')
+
+# 进程池子进程中的本地阶段处理器，由 _init_extraction_worker 创建（不创建LLM客户端、限流器和响应缓存）
+_worker_parser: Optional[JobPageParser] = None
+
+def _init_extraction_worker(html_parser: str, input_token_budget: int,
+                            result_cache_config: Optional[Dict[str, Any]], result_cache_scope: str) -> None:
+    global _worker_parser
+    _worker_parser = JobPageParser(html_parser, input_token_budget,
+                                   ExtractionResultCache.from_config(result_cache_config), result_cache_scope)
+
+def _prepare_job_in_worker(job: Dict[str, Any]):
+    return _worker_parser.prepare_job(job)
+
 # 测试增强版提取器
 async def test_enhanced_extractor():
     """测试增强版提取器"""
@@ -712,6 +1286,8 @@ async def test_enhanced_extractor():
         print(f"\n🎯 毕业时间匹配状态分布:")
         for status, count in match_statuses.items():
             print(f"   {status}: {count}个")
+    
+    await extractor.aclose()
 
 if __name__ == "__main__":
     asyncio.run(test_enhanced_extractor())
\ No newline at end of file
@@ -36,11 +36,13 @@ from typing import Optional, Dict, Any, List, Set, Tuple
 import hashlib
 import re
 import asyncio
+import functools
 import time
 
 # 导入日志系统
 from src.logger_config import get_logger, log_function_call
 from src.data_snapshot import create_snapshot_manager
+from src.job_identity import extract_job_id
 
 try:
     from notion_client import Client
@@ -222,19 +224,7 @@ class EnhancedJobDeduplicator:
     
     def _extract_job_id(self, url: str) -> str:
         """从URL中提取岗位ID"""
-        if not url:
-            return ""
-        
-        # 处理不同招聘网站的URL格式
-        base_url = url.split('?')[0]
-        
-        # Boss直聘
-        if 'zhipin.com' in url:
-            match = re.search(r'/job_detail/([^/.]+)', base_url)
-            return match.group(1) if match else base_url.split('/')[-1] if '/' in base_url else base_url
-        
-        # 其他网站的通用处理
-        return base_url.split('/')[-1] if '/' in base_url else base_url
+        return extract_job_id(url)
     
     def _create_smart_fingerprint(self, job: Dict[str, Any]) -> str:
         """智能指纹生成"""
@@ -434,7 +424,9 @@ class EnhancedLLMJobDeduplicator:
             
             # 调用LLM
             messages = [{"role": "user", "content": prompt}]
-            response = await self.llm_client._call_llm_api(messages)
+            response = await self.llm_client._call_llm_api(
+                messages, cache_check=lambda reply: "是" in reply or "否" in reply
+            )
             
             # 解析结果
             if response:
@@ -745,7 +737,10 @@ class NotionJobDeduplicator:
                 if next_cursor:
                     query_params["start_cursor"] = next_cursor
                 
-                response = self.notion.databases.query(**query_params)
+                # notion-client 的同步调用放到线程中执行，后台预加载期间不阻塞爬虫所在的事件循环
+                response = await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(self.notion.databases.query, **query_params)
+                )
                 
                 all_results.extend(response["results"])
                 has_more = response["has_more"]
@@ -847,19 +842,7 @@ class NotionJobDeduplicator:
     
     def _extract_job_id(self, url: str) -> str:
         """从URL中提取岗位ID"""
-        if not url:
-            return ""
-        
-        # 处理不同招聘网站的URL格式
-        base_url = url.split('?')[0]
-        
-        # Boss直聘
-        if 'zhipin.com' in url:
-            match = re.search(r'/job_detail/([^/.]+)', base_url)
-            return match.group(1) if match else base_url.split('/')[-1] if '/' in base_url else base_url
-        
-        # 其他网站的通用处理
-        return base_url.split('/')[-1] if '/' in base_url else base_url
+        return extract_job_id(url)
     
     async def load_existing_jobs(self):
         return await self._load_existing_jobs()
@@ -12,6 +12,7 @@ import json
 import os
 import glob
 import argparse
+import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
@@ -30,9 +31,17 @@ try:
             break
     
     from src.crawler_registry import crawler_registry
-    from src.enhanced_extractor import EnhancedNotionExtractor
+    from src.enhanced_extractor import EnhancedNotionExtractor, close_llm_clients
     from src.optimized_notion_writer import OptimizedNotionJobWriter
     from src.enhanced_job_deduplicator import EnhancedJobDeduplicator, NotionJobDeduplicator
+    from src.job_identity import extract_job_id
+    from src.raw_jsonl_writer import open_raw_jsonl
+    from src.raw_crawl_store import RawCrawlStore, is_raw_store
+    from src.lazy_job_record import LazyJobRecord, load_lazy_records, close_lazy_sources, has_html
+    from src.replay_loader import resolve_replay_files, load_replay_files
+    from src.known_job_index import KnownJobIndex
+    from src.sweep_scheduler import SweepScheduler
+    from src.crawl_circuit_breaker import CircuitOpenError
     DEPENDENCIES_OK = True
 except ImportError as e:
     print(f"[ERROR] Dependency import failed: {e}")
@@ -67,7 +76,8 @@ class EnhancedNotionJobPipelineWithLogging:
             # 去重统计
             "url_duplicates": 0,
             "content_duplicates": 0,
-            "notion_duplicates": 0
+            "notion_duplicates": 0,
+            "crawl_id_duplicates": 0
         }
         
         # 初始化组件
@@ -80,6 +90,8 @@ class EnhancedNotionJobPipelineWithLogging:
         self.raw_jobs = []
         self.deduplicated_jobs = []
         self.extracted_jobs = []
+        self._crawled_job_ids = set()
+        self._notion_preload_task = None
         
         self.logger.debug("流水线初始化完成", {
             "config_keys": list(self.config.keys()),
@@ -174,6 +186,10 @@ class EnhancedNotionJobPipelineWithLogging:
         """查找最新的数据文件"""
         patterns = [
             "data/raw_boss_playwright_*.jsonl",
+            "data/raw_boss_playwright_*.jsonl.gz",
+            "data/raw_boss_http_*.jsonl",
+            "data/raw_boss_http_*.jsonl.gz",
+            "data/raw_boss_*.meta.jsonl",
             "data/deduplicated_jobs_*.json",
             "raw_boss_playwright_*.jsonl",
             "deduplicated_jobs_*.json"
@@ -197,11 +213,21 @@ class EnhancedNotionJobPipelineWithLogging:
             raise FileNotFoundError(f"数据文件不存在: {file_path}")
         
         jobs = []
+        # 原始数据默认延迟加载HTML：只保留元数据和HTML位置，提取时再读取
+        lazy_html = self.config.get("replay", {}).get("lazy_html", True)
         
         try:
-            if file_path.endswith('.jsonl'):
-                # JSONL格式（原始爬取数据）
-                with open(file_path, 'r', encoding='utf-8') as f:
+            if lazy_html and (is_raw_store(file_path) or file_path.endswith(('.jsonl', '.jsonl.gz'))):
+                jobs = load_lazy_records(file_path)
+            
+            elif is_raw_store(file_path):
+                # 紧凑存储：元数据与压缩HTML分开存放，按块顺序解压HTML
+                with RawCrawlStore(file_path) as store:
+                    jobs = list(store.iter_records())
+            
+            elif file_path.endswith(('.jsonl', '.jsonl.gz')):
+                # JSONL格式（原始爬取数据，可能为gzip压缩）
+                with open_raw_jsonl(file_path) as f:
                     for line_num, line in enumerate(f, 1):
                         if line.strip():
                             try:
@@ -228,7 +254,8 @@ class EnhancedNotionJobPipelineWithLogging:
             self.logger.success(f"数据文件加载成功", {
                 "file_path": file_path,
                 "job_count": len(jobs),
-                "file_type": "JSONL" if file_path.endswith('.jsonl') else "JSON",
+                "file_type": "JSON" if file_path.endswith('.json') else ("紧凑存储" if is_raw_store(file_path) else "JSONL"),
+                "lazy_html": sum(1 for job in jobs if isinstance(job, LazyJobRecord)),
                 "file_size_mb": round(os.path.getsize(file_path) / 1024 / 1024, 2)
             })
             
@@ -259,6 +286,11 @@ class EnhancedNotionJobPipelineWithLogging:
     
     async def _load_existing_jobs(self) -> bool:
         """加载已有数据"""
+        # 配置了回放文件范围（--replay）时并行加载多个文件
+        replay_config = self.config.get("replay", {})
+        if replay_config.get("patterns") and not self.data_file:
+            return await self._load_replay_jobs(replay_config)
+        
         try:
             # 确定数据文件
             data_file = self.data_file
@@ -294,7 +326,7 @@ class EnhancedNotionJobPipelineWithLogging:
             self.snapshot.capture("loaded_data", self.raw_jobs, {
                 "stage": "加载已有数据",
                 "source_file": data_file,
-                "file_type": "JSONL" if data_file.endswith('.jsonl') else "JSON"
+                "file_type": "JSON" if data_file.endswith('.json') else "JSONL"
             })
             
             load_success = len(self.raw_jobs) > 0
@@ -311,51 +343,71 @@ class EnhancedNotionJobPipelineWithLogging:
             self.logger.step_end("加载已有数据", False, {"错误": str(e)})
             return False
     
+    async def _load_replay_jobs(self, replay_config: Dict[str, Any]) -> bool:
+        """按通配符和日期范围加载多个数据文件，进程池并行解析，按岗位ID去重合并"""
+        try:
+            data_files = resolve_replay_files(
+                replay_config.get("patterns"),
+                since=replay_config.get("since"),
+                until=replay_config.get("until")
+            )
+            
+            if not data_files:
+                self.logger.error("没有匹配的回放数据文件", {
+                    "patterns": replay_config.get("patterns"),
+                    "since": replay_config.get("since"),
+                    "until": replay_config.get("until")
+                })
+                self.logger.step_end("加载已有数据", False, {"错误": "找不到数据文件"})
+                return False
+            
+            self.logger.info("开始并行加载回放数据", {
+                "file_count": len(data_files),
+                "first_file": data_files[0],
+                "last_file": data_files[-1]
+            })
+            
+            # 进程池解析是阻塞操作，放到线程中执行
+            jobs, replay_stats = await asyncio.get_running_loop().run_in_executor(
+                None, load_replay_files, data_files, replay_config.get("max_workers")
+            )
+            
+            for failed_file, error in replay_stats["failed_files"].items():
+                self.logger.warning(f"回放文件加载失败: {failed_file}", {"error": error})
+            
+            self.raw_jobs = self._normalize_job_data(jobs)
+            self.stats["crawled"] = len(self.raw_jobs)
+            
+            self.snapshot.capture("loaded_data", self.raw_jobs, {
+                "stage": "加载已有数据",
+                "source_files": data_files,
+                "replay_stats": replay_stats
+            })
+            
+            load_success = len(self.raw_jobs) > 0
+            self.logger.step_end("加载已有数据", load_success, {
+                "数据文件数": len(data_files),
+                "读取记录数": replay_stats["records_read"],
+                "合并去重数": replay_stats["id_duplicates"],
+                "总岗位数": len(self.raw_jobs),
+                "数据来源": "本地文件回放"
+            })
+            
+            return load_success
+            
+        except Exception as e:
+            self.logger.error("回放数据加载失败", {"error": str(e)}, e)
+            self.logger.step_end("加载已有数据", False, {"错误": str(e)})
+            return False
+    
     def _normalize_job_data(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """标准化岗位数据格式"""
         normalized_jobs = []
         
         for job in jobs:
-            normalized_job = {}
-            
-            # 检查数据格式并标准化
-            if 'api_data' in job:
-                # 原始爬取数据格式
-                api_data = job.get('api_data', {})
-                normalized_job = {
-                    '岗位名称': api_data.get('job_name', ''),
-                    '公司名称': api_data.get('company_name', ''),
-                    '工作地点': api_data.get('location', ''),
-                    '薪资': api_data.get('salary_desc', ''),
-                    '岗位链接': job.get('url', ''),
-                    '岗位描述': '',  # 需要从HTML提取
-                    'html': job.get('html', ''),
-                    'source_platform': job.get('source', 'Unknown'),
-                    'timestamp': job.get('timestamp', '')
-                }
-            
-            elif '岗位名称' in job:
-                # 已处理数据格式
-                normalized_job = job.copy()
-            
-            else:
-                # 其他格式，尝试映射
-                normalized_job = {
-                    '岗位名称': job.get('job_name', job.get('title', '')),
-                    '公司名称': job.get('company_name', job.get('company', '')),
-                    '工作地点': job.get('location', job.get('city', '')),
-                    '薪资': job.get('salary_desc', job.get('salary', '')),
-                    '岗位链接': job.get('url', job.get('link', '')),
-                    '岗位描述': job.get('description', ''),
-                    'html': job.get('html', ''),
-                    'source_platform': job.get('source_platform', job.get('source', 'Unknown')),
-                    'timestamp': job.get('timestamp', '')
-                }
-            
-            if normalized_job.get('岗位名称') or normalized_job.get('公司名称'):
+            normalized_job = self._normalize_job_record(job)
+            if normalized_job:
                 normalized_jobs.append(normalized_job)
-            else:
-                self.logger.warning("跳过无效数据", {"job_data": job})
         
         self.logger.debug("数据标准化完成", {
             "input_count": len(jobs),
@@ -365,19 +417,81 @@ class EnhancedNotionJobPipelineWithLogging:
         
         return normalized_jobs
     
+    def _normalize_job_record(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """标准化单条岗位数据，无效数据返回None"""
+        normalized_job = {}
+        
+        # 检查数据格式并标准化
+        if 'api_data' in job:
+            # 原始爬取数据格式
+            api_data = job.get('api_data', {})
+            normalized_job = {
+                '岗位名称': api_data.get('job_name', ''),
+                '公司名称': api_data.get('company_name', ''),
+                '工作地点': api_data.get('location', ''),
+                '薪资': api_data.get('salary_desc', ''),
+                '岗位链接': job.get('url', ''),
+                '岗位描述': '',  # 需要从HTML提取
+                'source_platform': job.get('source', 'Unknown'),
+                'timestamp': job.get('timestamp', '')
+            }
+            normalized_job = self._attach_html(normalized_job, job)
+        
+        elif '岗位名称' in job:
+            # 已处理数据格式
+            normalized_job = job.copy()
+        
+        else:
+            # 其他格式，尝试映射
+            normalized_job = {
+                '岗位名称': job.get('job_name', job.get('title', '')),
+                '公司名称': job.get('company_name', job.get('company', '')),
+                '工作地点': job.get('location', job.get('city', '')),
+                '薪资': job.get('salary_desc', job.get('salary', '')),
+                '岗位链接': job.get('url', job.get('link', '')),
+                '岗位描述': job.get('description', ''),
+                'source_platform': job.get('source_platform', job.get('source', 'Unknown')),
+                'timestamp': job.get('timestamp', '')
+            }
+            normalized_job = self._attach_html(normalized_job, job)
+        
+        if normalized_job.get('岗位名称') or normalized_job.get('公司名称'):
+            return normalized_job
+        
+        self.logger.warning("跳过无效数据", {"job_data": job})
+        return None
+    
+    @staticmethod
+    def _attach_html(normalized_job: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, Any]:
+        """为标准化记录带上HTML；延迟加载的记录只沿用HTML位置，不读取内容"""
+        if isinstance(job, LazyJobRecord):
+            return job.derive(normalized_job)
+        normalized_job['html'] = job.get('html', '')
+        return normalized_job
+    
     async def _crawl_new_jobs(self) -> bool:
-        """爬取新数据（原有逻辑）"""
+        """爬取新数据（多个爬虫并发执行）"""
         try:
             # 获取配置
-            enabled_sites = self.config.get("crawler", {}).get("enabled_sites", ["boss_playwright"])
-            max_pages = self.config.get("crawler", {}).get("max_pages", 1)
-            max_jobs_test = self.config.get("crawler", {}).get("max_jobs_test", None)
+            crawler_config = self.config.get("crawler", {})
+            enabled_sites = crawler_config.get("enabled_sites", ["boss_playwright"])
+            max_pages = crawler_config.get("max_pages", 1)
+            max_jobs_test = crawler_config.get("max_jobs_test", None)
+            resume_crawl = crawler_config.get("resume", False)
+            skip_known_config = crawler_config.get("skip_known_jobs", None)
             keyword = self.config.get("search", {}).get("default_keyword", "大模型 算法")
             city = self.config.get("search", {}).get("default_city", "101010100")
+            sweep_config = self.config.get("search", {}).get("sweep", {}) or {}
+            
+            # 配置了 search.keywords / search.cities 时按组合扫描，否则只跑默认查询
+            sweep = SweepScheduler.from_config(self.config)
+            search_combos = sweep.plan() if sweep else [(keyword, city)]
+            stop_on_known_page = bool(sweep) and sweep_config.get("stop_on_known_page", True)
             
             crawl_params = {
-                "keyword": keyword,
-                "city": city,
+                "keyword": keyword if not sweep else sweep.keywords,
+                "city": city if not sweep else sweep.cities,
+                "search_combinations": len(search_combos),
                 "max_pages": max_pages,
                 "enabled_sites": enabled_sites,
                 "max_jobs_test": max_jobs_test
@@ -397,50 +511,65 @@ class EnhancedNotionJobPipelineWithLogging:
                 "crawler_names": list(crawlers.keys())
             })
             
-            # 执行爬取
-            all_jobs = []
-            for platform_name, fetch_func in crawlers.items():
-                self.logger.info(f"开始爬取: {platform_name}")
-                
-                try:
+            # 爬取期间并行预加载Notion已有岗位，与网络爬取重叠
+            self._start_notion_preload()
+            
+            # 本地已知岗位索引：爬虫在抓取详情页前跳过已知岗位
+            known_jobs = KnownJobIndex.from_config(skip_known_config)
+            if known_jobs is not None:
+                self.logger.info("已知岗位索引构建完成", {
+                    "known_job_ids": len(known_jobs),
+                    "sources": {os.path.basename(path): count for path, count in known_jobs.source_counts.items()}
+                })
+            
+            # 执行爬取（支持流式的爬虫边爬边标准化、边按岗位ID去重）
+            self.raw_jobs = []
+            self._crawled_job_ids = set()
+            
+            crawl_tasks = []
+            for search_keyword, search_city in search_combos:
+                for platform_name, fetch_func in crawlers.items():
                     # 传递参数给爬虫函数
                     crawl_args = {
-                        "keyword": keyword,
-                        "city": city,
+                        "keyword": search_keyword,
+                        "city": search_city,
                         "max_pages": max_pages
                     }
                     if max_jobs_test:
                         crawl_args["max_jobs_test"] = max_jobs_test
+                    if resume_crawl:
+                        crawl_args["resume"] = True
+                    if known_jobs is not None:
+                        crawl_args["known_jobs"] = known_jobs
+                        if stop_on_known_page:
+                            crawl_args["stop_on_known_page"] = True
                     
-                    jobs = await fetch_func(**crawl_args)
-                    
-                    if jobs:
-                        # 添加来源标识
-                        for job in jobs:
-                            if isinstance(job, dict):
-                                job['source_platform'] = platform_name
-                        
-                        all_jobs.extend(jobs)
-                        
-                        self.logger.success(f"{platform_name}爬取完成", {
-                            "job_count": len(jobs),
-                            "platform": platform_name
-                        })
-                    else:
-                        self.logger.warning(f"{platform_name}没有获取到岗位")
-                
-                except Exception as e:
-                    self.logger.error(f"{platform_name}爬取失败", {
+                    crawl_tasks.append({
                         "platform": platform_name,
-                        "error": str(e)
-                    }, e)
-                    continue
-                
-                # 平台间延迟
-                await asyncio.sleep(2)
+                        "fetch_func": fetch_func,
+                        "crawl_args": crawl_args
+                    })
+            
+            task_results = await self._run_crawl_tasks(crawl_tasks)
+            
+            if sweep:
+                sweep_report = sweep.record(task_results)
+                sweep.save()
+                self.logger.info("扫描组合吞吐统计", {
+                    "combinations": [
+                        {
+                            "keyword": item["keyword"],
+                            "city": item["city"],
+                            "jobs": item["jobs"],
+                            "seconds": round(item["seconds"], 1),
+                            "jobs_per_minute": item["jobs_per_minute"],
+                            "expected_jobs": item["expected_jobs"]
+                        }
+                        for item in sweep_report
+                    ]
+                })
+            succeeded_platforms = len({result["platform"] for result in task_results if result["jobs"]})
             
-            # 标准化数据
-            self.raw_jobs = self._normalize_job_data(all_jobs)
             self.stats["crawled"] = len(self.raw_jobs)
             
             # 保存原始数据快照
@@ -448,14 +577,18 @@ class EnhancedNotionJobPipelineWithLogging:
                 self.snapshot.capture("raw_crawl", self.raw_jobs, {
                     "stage": "原始爬取",
                     "total_platforms": len(crawlers),
-                    "crawl_params": crawl_params
+                    "crawl_params": crawl_params,
+                    "crawl_tasks": task_results
                 })
             
             crawl_success = len(self.raw_jobs) > 0
             self.logger.step_end("爬取岗位数据", crawl_success, {
                 "总岗位数": len(self.raw_jobs),
                 "爬虫数量": len(crawlers),
-                "成功平台": sum(1 for jobs in [jobs for _, jobs in crawlers.items()] if jobs)
+                "成功平台": succeeded_platforms,
+                "超时平台": sum(1 for result in task_results if result["status"] == "timeout"),
+                "被封锁任务": sum(1 for result in task_results if result["status"] == "blocked"),
+                "爬取中丢弃的重复ID": self.stats["crawl_id_duplicates"]
             })
             
             return crawl_success
@@ -465,6 +598,218 @@ class EnhancedNotionJobPipelineWithLogging:
             self.logger.step_end("爬取岗位数据", False, {"错误": str(e)})
             return False
     
+    async def _run_crawl_tasks(self, crawl_tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """并发执行一组爬取任务
+        
+        每个任务为 {"platform", "fetch_func", "crawl_args"}。并发受两层限制：
+        crawler.max_parallel_crawlers（全局）和 crawler.platform_limits（按爬虫注册名或显示名，默认1）。
+        crawler.crawler_timeout 为单个任务的超时秒数，超时任务保留已产出的记录（流式爬虫）。
+        同一平台的任务复用会话池中的浏览器会话，数量不超过该平台的并发上限。
+        
+        Returns:
+            每个任务的结果统计，顺序与输入一致
+        """
+        crawler_config = self.config.get("crawler", {})
+        global_limit = asyncio.Semaphore(crawler_config.get("max_parallel_crawlers", 3))
+        platform_limits = crawler_config.get("platform_limits", {}) or {}
+        timeout = crawler_config.get("crawler_timeout", None)
+        
+        session_kwargs = {
+            "resource_blocking": crawler_config.get("resource_blocking", None),
+            "raw_output": crawler_config.get("raw_output", None),
+            "pacing": crawler_config.get("pacing", None),
+            "circuit_breaker": crawler_config.get("circuit_breaker", None),
+            "raw_store": crawler_config.get("raw_store", None)
+        }
+        if crawler_config.get("detail_concurrency"):
+            session_kwargs["detail_concurrency"] = crawler_config["detail_concurrency"]
+        
+        platform_semaphores: Dict[str, asyncio.Semaphore] = {}
+        idle_sessions: Dict[str, List[Any]] = {}
+        all_sessions: List[Any] = []
+        
+        def _platform_limit(platform_name: str) -> int:
+            site_name = crawler_registry.resolve_name(platform_name)
+            return platform_limits.get(platform_name, platform_limits.get(site_name, 1))
+        
+        async def _borrow_session(platform_name: str):
+            if idle_sessions.get(platform_name):
+                return idle_sessions[platform_name].pop()
+            session = crawler_registry.create_session(platform_name, **session_kwargs)
+            if session:
+                await session.start()
+                all_sessions.append(session)
+            return session
+        
+        async def _run_one(task: Dict[str, Any]) -> Dict[str, Any]:
+            platform_name = task["platform"]
+            crawl_args = dict(task["crawl_args"])
+            result = {
+                "platform": platform_name,
+                "keyword": crawl_args.get("keyword"),
+                "city": crawl_args.get("city"),
+                "jobs": 0,
+                "status": "pending",
+                "seconds": 0.0
+            }
+            semaphore = platform_semaphores.setdefault(platform_name, asyncio.Semaphore(_platform_limit(platform_name)))
+            
+            # 先占平台名额再占全局名额：等待平台名额时不占用全局名额，其他平台的任务可以继续运行
+            async with semaphore, global_limit:
+                self.logger.info(f"开始爬取: {platform_name}", {"keyword": result["keyword"], "city": result["city"]})
+                started = time.monotonic()
+                session = None
+                try:
+                    session = await _borrow_session(platform_name)
+                    if session:
+                        crawl_args["session"] = session
+                    elif crawl_args.get("detail_concurrency") is None and session_kwargs.get("detail_concurrency"):
+                        crawl_args["detail_concurrency"] = session_kwargs["detail_concurrency"]
+                    
+                    await asyncio.wait_for(
+                        self._run_crawler(platform_name, task["fetch_func"], crawl_args, result),
+                        timeout
+                    )
+                    result["status"] = "success"
+                    
+                    if result["jobs"]:
+                        self.logger.success(f"{platform_name}爬取完成", {
+                            "job_count": result["jobs"],
+                            "platform": platform_name,
+                            "keyword": result["keyword"]
+                        })
+                    else:
+                        self.logger.warning(f"{platform_name}没有获取到岗位", {"keyword": result["keyword"]})
+                
+                except CircuitOpenError as e:
+                    # 会话被判定为已封锁：保留已获取的记录，不再向该会话派发请求
+                    result["status"] = "blocked"
+                    self.logger.warning(f"{platform_name}会话被反爬虫封锁，停止该任务", {
+                        "error": str(e),
+                        "partial_jobs": result["jobs"],
+                        "keyword": result["keyword"]
+                    })
+                
+                except asyncio.TimeoutError:
+                    result["status"] = "timeout"
+                    self.logger.warning(f"{platform_name}爬取超时，保留已获取的部分结果", {
+                        "timeout_seconds": timeout,
+                        "partial_jobs": result["jobs"],
+                        "keyword": result["keyword"]
+                    })
+                
+                except Exception as e:
+                    result["status"] = "failed"
+                    self.logger.error(f"{platform_name}爬取失败", {
+                        "platform": platform_name,
+                        "error": str(e)
+                    }, e)
+                
+                finally:
+                    result["seconds"] = round(time.monotonic() - started, 1)
+                    breaker = getattr(session, "circuit_breaker", None)
+                    if breaker:
+                        result["circuit_breaker"] = breaker.stats()
+                    # 已封锁的会话不再复用
+                    if session and not (breaker and breaker.exhausted):
+                        idle_sessions.setdefault(platform_name, []).append(session)
+            
+            return result
+        
+        try:
+            return list(await asyncio.gather(*[_run_one(task) for task in crawl_tasks]))
+        finally:
+            pacing_stats = [session.pacer.stats() for session in all_sessions if getattr(session, "pacer", None)]
+            if pacing_stats:
+                self.logger.info("爬取节奏指标", {"sessions": pacing_stats})
+            for session in all_sessions:
+                try:
+                    await session.close()
+                except Exception as e:
+                    self.logger.warning("关闭爬虫会话失败", {"error": str(e)})
+    
+    async def _run_crawler(self, platform_name: str, fetch_func, crawl_args: Dict[str, Any],
+                           result: Dict[str, Any]) -> None:
+        """运行单个爬虫，把标准化后的记录追加到 self.raw_jobs，并在 result["jobs"] 中实时计数
+        
+        流式爬虫逐条累加，因此即使任务被超时取消，已处理的记录也会保留。
+        """
+        stream_func = crawler_registry.get_stream_crawler(platform_name)
+        
+        if stream_func:
+            # 流式：每条记录到达即标准化，重复记录（含HTML）立即丢弃
+            stream = stream_func(**crawl_args)
+            try:
+                async for job in stream:
+                    if self._accept_crawled_job(job, platform_name):
+                        result["jobs"] += 1
+            finally:
+                await stream.aclose()
+        else:
+            jobs = await fetch_func(**crawl_args)
+            for job in jobs or []:
+                if self._accept_crawled_job(job, platform_name):
+                    result["jobs"] += 1
+    
+    def _accept_crawled_job(self, job: Any, platform_name: str) -> bool:
+        """标准化一条爬取记录并按岗位ID做即时去重，接受时追加到 self.raw_jobs
+        
+        带原始文件位置的爬取记录（LazyJobRecord）标准化后只保留位置，HTML在提取阶段再从磁盘读取。
+        """
+        if not isinstance(job, dict):
+            return False
+        
+        # 添加来源标识
+        job['source_platform'] = platform_name
+        normalized_job = self._normalize_job_record(job)
+        if not normalized_job:
+            return False
+        
+        job_id = extract_job_id(normalized_job.get('岗位链接', ''))
+        if job_id:
+            if job_id in self._crawled_job_ids:
+                self.stats["crawl_id_duplicates"] += 1
+                self.logger.trace("爬取中发现重复岗位ID，已丢弃", {"job_id": job_id})
+                return False
+            self._crawled_job_ids.add(job_id)
+        
+        self.raw_jobs.append(normalized_job)
+        return True
+    
+    def _start_notion_preload(self):
+        """在后台预加载Notion已有岗位（配置了Notion时），供去重步骤复用"""
+        self._notion_preload_task = None
+        notion_token = os.getenv("NOTION_TOKEN")
+        database_id = os.getenv("NOTION_DATABASE_ID")
+        if not (notion_token and database_id):
+            return
+        
+        async def _preload():
+            notion_deduplicator = NotionJobDeduplicator(
+                notion_token=notion_token,
+                database_id=database_id,
+                skip_notion_load=getattr(self, 'skip_notion_load', False),
+                notion_cache_file=getattr(self, 'notion_cache_file', None)
+            )
+            await notion_deduplicator.load_existing_jobs()
+            return notion_deduplicator
+        
+        self._notion_preload_task = asyncio.create_task(_preload())
+        self.logger.debug("已在后台开始预加载Notion岗位")
+    
+    async def _take_preloaded_notion_deduplicator(self):
+        """取出预加载好的Notion去重器，没有或预加载失败时返回None"""
+        task = getattr(self, '_notion_preload_task', None)
+        self._notion_preload_task = None
+        if task is None:
+            return None
+        
+        try:
+            return await task
+        except Exception as e:
+            self.logger.warning("Notion预加载失败，将重新加载", {"error": str(e)})
+            return None
+    
     async def step2_deduplicate_jobs(self) -> bool:
         """步骤2: 去重处理 - 模板方法（统一入口）"""
         step_name = "去重处理"
@@ -551,16 +896,18 @@ class EnhancedNotionJobPipelineWithLogging:
             })
             
             try:
-                from src.enhanced_job_deduplicator import NotionJobDeduplicator
-                notion_deduplicator = NotionJobDeduplicator(
-                    notion_token=notion_token,
-                    database_id=database_id,
-                    skip_notion_load=getattr(self, 'skip_notion_load', False),
-                    notion_cache_file=getattr(self, 'notion_cache_file', None)
-                )
-                
-                # 加载Notion中已存在的岗位
-                await notion_deduplicator.load_existing_jobs()
+                notion_deduplicator = await self._take_preloaded_notion_deduplicator()
+                if notion_deduplicator is None:
+                    from src.enhanced_job_deduplicator import NotionJobDeduplicator
+                    notion_deduplicator = NotionJobDeduplicator(
+                        notion_token=notion_token,
+                        database_id=database_id,
+                        skip_notion_load=getattr(self, 'skip_notion_load', False),
+                        notion_cache_file=getattr(self, 'notion_cache_file', None)
+                    )
+                    
+                    # 加载Notion中已存在的岗位
+                    await notion_deduplicator.load_existing_jobs()
                 
                 # 执行Notion去重
                 new_jobs, duplicate_jobs = await notion_deduplicator.deduplicate_against_notion(locally_deduplicated)
@@ -627,66 +974,70 @@ class EnhancedNotionJobPipelineWithLogging:
             extracted_jobs = []
             failed_count = 0
             
-            for i, job in enumerate(self.deduplicated_jobs, 1):
-                job_title = job.get('岗位名称', 'N/A')
-                company = job.get('公司名称', 'N/A')
+            # HTML解析和正则提取在进程池中提前进行，LLM调用按 llm.max_in_flight 并发并受RPM/TPM限流，结果按岗位顺序返回
+            jobs = self.deduplicated_jobs
+            try:
+                async for index, result in self.extractor.iter_extract_batch(jobs):
+                    i = index + 1
+                    job = jobs[index]
+                    job_title = job.get('岗位名称', 'N/A')
+                    company = job.get('公司名称', 'N/A')
                 
-                self.logger.trace(f"提取第 {i}/{len(self.deduplicated_jobs)} 个岗位", {
-                    "job_title": job_title,
-                    "company": company,
-                    "url": job.get('岗位链接', 'N/A')
-                })
+                    self.logger.trace(f"提取第 {i}/{len(jobs)} 个岗位", {
+                        "job_title": job_title,
+                        "company": company,
+                        "url": job.get('岗位链接', 'N/A')
+                    })
                 
-                try:
-                    html = job.get('html', '')
-                    url = job.get('岗位链接', '')
+                    try:
+                        if result is None and not has_html(job):
+                            self.logger.warning(f"岗位 {i} 没有HTML内容", {
+                                "job_title": job_title,
+                                "company": company
+                            })
+                            failed_count += 1
+                            continue
                     
-                    if not html:
-                        self.logger.warning(f"岗位 {i} 没有HTML内容", {
-                            "job_title": job_title,
-                            "company": company
-                        })
-                        failed_count += 1
-                        continue
-                    
-                    # 使用增强版提取器
-                    result = await self.extractor.extract_for_notion_enhanced(html, url, job)
-                    
-                    if result:
-                        # 添加原始来源信息
-                        result['source_platform'] = job.get('source_platform', 'Unknown')
-                        result['原始时间戳'] = job.get('timestamp', '')
-                        extracted_jobs.append(result)
+                        if result:
+                            # 添加原始来源信息
+                            result['source_platform'] = job.get('source_platform', 'Unknown')
+                            result['原始时间戳'] = job.get('timestamp', '')
+                            extracted_jobs.append(result)
                         
-                        match_status = result.get('毕业时间_匹配状态', 'N/A')
+                            match_status = result.get('毕业时间_匹配状态', 'N/A')
                         
-                        # 根据匹配状态显示不同信息并统计
-                        if '符合' in match_status:
-                            self.logger.success(f"提取成功【推荐】: {job_title} - {company}")
-                            self.stats["recommended"] += 1
-                        elif '不符合' in match_status:
-                            self.logger.info(f"提取成功【不匹配】: {job_title} - {company}")
-                            self.stats["not_suitable"] += 1
+                            # 根据匹配状态显示不同信息并统计
+                            if '符合' in match_status:
+                                self.logger.success(f"提取成功【推荐】: {job_title} - {company}")
+                                self.stats["recommended"] += 1
+                            elif '不符合' in match_status:
+                                self.logger.info(f"提取成功【不匹配】: {job_title} - {company}")
+                                self.stats["not_suitable"] += 1
+                            else:
+                                self.logger.info(f"提取成功【需确认】: {job_title} - {company}")
+                                self.stats["need_check"] += 1
                         else:
-                            self.logger.info(f"提取成功【需确认】: {job_title} - {company}")
-                            self.stats["need_check"] += 1
-                    else:
-                        self.logger.warning(f"岗位 {i} 提取失败", {
+                            self.logger.warning(f"岗位 {i} 提取失败", {
+                                "job_title": job_title,
+                                "company": company
+                            })
+                            failed_count += 1
+                
+                    except Exception as e:
+                        self.logger.error(f"岗位 {i} 处理异常", {
                             "job_title": job_title,
-                            "company": company
-                        })
+                            "company": company,
+                            "error": str(e)
+                        }, e)
                         failed_count += 1
-                
-                except Exception as e:
-                    self.logger.error(f"岗位 {i} 处理异常", {
-                        "job_title": job_title,
-                        "company": company,
-                        "error": str(e)
-                    }, e)
-                    failed_count += 1
-                
-                # API调用间隔
-                await asyncio.sleep(1.5)
+            finally:
+                # 延迟加载的HTML已全部读取完毕（提取中途出错时同样关闭源文件和缓存）
+                close_lazy_sources()
+                self.logger.info("LLM请求并发与限流统计", self.extractor.extraction_stats())
+                self.logger.info("LLM响应缓存统计", self.extractor.response_cache.stats())
+                self.extractor.response_cache.close()
+                self.logger.info("提取结果缓存统计", self.extractor.result_cache.stats())
+                self.extractor.result_cache.close()
             
             self.extracted_jobs = extracted_jobs
             self.stats["extracted"] = len(extracted_jobs)
@@ -972,10 +1323,104 @@ class EnhancedNotionJobPipelineWithLogging:
             
             # 保存快照摘要
             self.snapshot.save_summary()
+            
+            # 关闭共享的LLM连接
+            await close_llm_clients()
         
         return pipeline_success
 
 
+def add_common_args(parser: argparse.ArgumentParser) -> None:
+    """添加两个流水线入口共用的命令行参数（日志、数据来源、断点续爬、回放、缓存、文件列表）"""
+    parser.add_argument('--log-level', 
+                      choices=['production', 'normal', 'debug', 'trace'],
+                      default='normal',
+                      help='日志详细程度 (默认: normal)')
+    
+    parser.add_argument('--no-debug-data', 
+                      action='store_true',
+                      help='不保存调试数据文件（节省磁盘空间）')
+    
+    parser.add_argument('--test-mode',
+                      action='store_true', 
+                      help='测试模式（限制处理数量，降低API成本）')
+    
+    parser.add_argument('--skip-crawl',
+                      action='store_true',
+                      help='跳过爬虫，使用已有数据文件')
+    
+    parser.add_argument('--data-file',
+                      type=str,
+                      help='指定要使用的数据文件路径（与--skip-crawl一起使用）')
+    
+    parser.add_argument('--skip-notion-load',
+                      action='store_true',
+                      help='跳过Notion加载，使用缓存文件（大幅提速）')
+    
+    parser.add_argument('--notion-cache-file',
+                      type=str,
+                      help='指定要使用的Notion缓存文件路径')
+    
+    parser.add_argument('--resume-crawl',
+                      action='store_true',
+                      help='从上次中断的爬取断点继续（跳过已完成的搜索页和详情页）')
+    
+    parser.add_argument('--replay',
+                      nargs='+',
+                      metavar='PATTERN',
+                      help='回放多个数据文件（通配符，与--skip-crawl一起使用），按岗位ID去重合并')
+    
+    parser.add_argument('--since',
+                      type=str,
+                      help='回放起始日期 YYYY-MM-DD（按文件名中的爬取时间过滤）')
+    
+    parser.add_argument('--until',
+                      type=str,
+                      help='回放结束日期 YYYY-MM-DD（含当天）')
+    
+    parser.add_argument('--replay-workers',
+                      type=int,
+                      help='回放解析进程数（默认CPU核数）')
+    
+    parser.add_argument('--no-llm-cache',
+                      action='store_true',
+                      help='跳过LLM响应缓存和提取结果缓存（仍写入新的结果）')
+    
+    parser.add_argument('--list-notion-cache',
+                      action='store_true',
+                      help='列出可用的Notion缓存文件')
+    
+    parser.add_argument('--list-data-files',
+                      action='store_true',
+                      help='列出可用的数据文件')
+
+def check_arg_conflicts(args: argparse.Namespace) -> Optional[str]:
+    """检查共用参数的组合，返回错误信息，合法时返回None"""
+    if args.data_file and not args.skip_crawl:
+        return "--data-file 必须与 --skip-crawl 一起使用"
+    if args.replay and not args.skip_crawl:
+        return "--replay 必须与 --skip-crawl 一起使用"
+    if args.replay and args.data_file:
+        return "--replay 与 --data-file 不能同时使用"
+    if args.notion_cache_file and not args.skip_notion_load:
+        return "--notion-cache-file 必须与 --skip-notion-load 一起使用"
+    return None
+
+def apply_cli_config(config: Dict[str, Any], args: argparse.Namespace) -> None:
+    """把 --resume-crawl、--replay 和 --no-llm-cache 写入流水线配置"""
+    if args.resume_crawl:
+        config.setdefault("crawler", {})["resume"] = True
+    if args.replay:
+        config.setdefault("replay", {}).update({
+            "patterns": args.replay,
+            "since": args.since,
+            "until": args.until,
+            "max_workers": args.replay_workers
+        })
+    if args.no_llm_cache:
+        config.setdefault("llm", {}).setdefault("cache", {})["bypass"] = True
+        config["llm"].setdefault("result_cache", {})["bypass"] = True
+
 def parse_args():
     """解析命令行参数"""
     parser = argparse.ArgumentParser(
@@ -1025,42 +1470,7 @@ def parse_args():
         """
     )
     
-    parser.add_argument('--log-level', 
-                      choices=['production', 'normal', 'debug', 'trace'],
-                      default='normal',
-                      help='日志详细程度 (默认: normal)')
-    
-    parser.add_argument('--no-debug-data', 
-                      action='store_true',
-                      help='不保存调试数据文件（节省磁盘空间）')
-    
-    parser.add_argument('--test-mode',
-                      action='store_true', 
-                      help='测试模式（限制处理数量，降低API成本）')
-    
-    parser.add_argument('--skip-crawl',
-                      action='store_true',
-                      help='跳过爬虫，使用已有数据文件')
-    
-    parser.add_argument('--data-file',
-                      type=str,
-                      help='指定要使用的数据文件路径（与--skip-crawl一起使用）')
-    
-    parser.add_argument('--skip-notion-load',
-                      action='store_true',
-                      help='跳过Notion加载，使用缓存文件（大幅提速）')
-    
-    parser.add_argument('--notion-cache-file',
-                      type=str,
-                      help='指定要使用的Notion缓存文件路径')
-    
-    parser.add_argument('--list-notion-cache',
-                      action='store_true',
-                      help='列出可用的Notion缓存文件')
-    
-    parser.add_argument('--list-data-files',
-                      action='store_true',
-                      help='列出可用的数据文件')
+    add_common_args(parser)
     
     return parser.parse_args()
 
@@ -1112,6 +1522,8 @@ def list_available_data_files():
     """列出可用的数据文件"""
     patterns = [
         "data/raw_boss_playwright_*.jsonl",
+        "data/raw_boss_http_*.jsonl",
+        "data/raw_boss_*.meta.jsonl",
         "data/deduplicated_jobs_*.json",
         "data/enhanced_pipeline_extracted_*.json",
         "raw_boss_playwright_*.jsonl",
@@ -1175,12 +1587,9 @@ async def main():
         return
     
     # 验证参数组合
-    if args.data_file and not args.skip_crawl:
-        print("❌ --data-file 必须与 --skip-crawl 一起使用")
-        return
-    
-    if args.notion_cache_file and not args.skip_notion_load:
-        print("❌ --notion-cache-file 必须与 --skip-notion-load 一起使用")
+    arg_error = check_arg_conflicts(args)
+    if arg_error:
+        print(f"❌ {arg_error}")
         return
     
     # 初始化日志系统
@@ -1201,7 +1610,13 @@ async def main():
     
     # 如果跳过爬虫，显示将要使用的数据文件
     if args.skip_crawl:
-        if args.data_file:
+        if args.replay:
+            logger.info("将回放多个数据文件", {
+                "patterns": args.replay,
+                "since": args.since,
+                "until": args.until
+            })
+        elif args.data_file:
             if not os.path.exists(args.data_file):
                 logger.error(f"指定的数据文件不存在: {args.data_file}")
                 return
@@ -1300,6 +1715,7 @@ async def main():
             skip_notion_load=args.skip_notion_load,
             notion_cache_file=args.notion_cache_file
         )
+        apply_cli_config(pipeline.config, args)
         success = await pipeline.run_full_enhanced_pipeline_with_logging()
         
         if success:
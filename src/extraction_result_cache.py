@@ -0,0 +1,141 @@
+"""
+岗位提取结果缓存
+以 (岗位ID, 规范化HTML指纹) 为键保存 extract_for_notion_enhanced 的最终结果；
+指纹同时包含提取器版本和LLM提供商/模型（scope），更换模型或修改提示词后旧结果自动失效。
+岗位重新发布或再次爬取时页面内容通常不变，命中后直接复用上次的结果，跳过解析和LLM调用；
+调用方只需重新计算与当前时间相关的字段（截止状态、提取时间等）。
+HTML规范化会去掉脚本、样式、注释和空白差异，避免每次请求都变化的埋点、令牌导致指纹不同。
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.job_identity import extract_job_id
+
+DEFAULT_CACHE_PATH = "data/extraction_cache.sqlite"
+
+_VOLATILE_BLOCKS = re.compile(r'<(script|style|noscript)\b[^>]*>.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_WHITESPACE = re.compile(r'\s+')
+
+def html_fingerprint(html: str, scope: str = "") -> str:
+    """规范化HTML（去掉脚本、样式、注释，合并空白）后的SHA-256，scope 不同时指纹不同"""
+    normalized = _WHITESPACE.sub(' ', _VOLATILE_BLOCKS.sub('', html)).strip()
+    return hashlib.sha256(f"{scope}\n{normalized}".encode('utf-8')).hexdigest()
+
+class ExtractionResultCache:
+    """SQLite持久化的岗位提取结果缓存"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, enabled: bool = True, bypass: bool = False,
+                 ttl_days: float = 90):
+        """
+        Args:
+            path: SQLite文件路径
+            enabled: 是否启用缓存
+            bypass: 跳过读取缓存（仍写入新的结果）
+            ttl_days: 结果有效期（天），0为永不过期
+        """
+        self.path = path
+        self.enabled = enabled
+        self.bypass = bypass
+        self.ttl = ttl_days * 86400 if ttl_days else 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ExtractionResultCache":
+        """按 llm.result_cache 配置创建"""
+        return cls(**(config or {}))
+
+    @staticmethod
+    def make_key(url: str, html: str, scope: str = "") -> Tuple[str, str]:
+        """(岗位ID, HTML指纹)，无法提取岗位ID时用URL；scope 为提取器版本、提供商和模型"""
+        return extract_job_id(url) or url, html_fingerprint(html, scope)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "job_id TEXT NOT NULL, fingerprint TEXT NOT NULL, result TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (job_id, fingerprint))"
+            )
+        return self._conn
+
+    def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """读取缓存的提取结果，未命中、已过期或跳过缓存时返回None"""
+        if not self.enabled or self.bypass:
+            return None
+
+        try:
+            row = self._connect().execute(
+                "SELECT result, created_at FROM results WHERE job_id = ? AND fingerprint = ?", key
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️  提取结果缓存读取失败: {e}")
+            row = None
+
+        if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+            self.record_lookup(False)
+            return None
+
+        self.record_lookup(True)
+        return json.loads(row[0])
+
+    def record_lookup(self, hit: bool) -> None:
+        """计入一次查询（进程池子进程中的查询结果由主进程计入）"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def put(self, key: Tuple[str, str], result: Dict[str, Any]) -> None:
+        """保存提取结果"""
+        if not self.enabled:
+            return
+
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (job_id, fingerprint, result, created_at) VALUES (?, ?, ?, ?)",
+                (*key, json.dumps(result, ensure_ascii=False), time.time())
+            )
+            conn.commit()
+            self.writes += 1
+        except sqlite3.Error as e:
+            print(f"⚠️  提取结果缓存写入失败: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "bypass": self.bypass,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": f"{self.hits / lookups * 100:.1f}%" if lookups else "N/A",
+            "writes": self.writes
+        }
+
+    def close(self) -> None:
+        """删除过期结果并关闭连接"""
+        if self._conn is not None:
+            try:
+                if self.ttl:
+                    self._conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl,))
+                    self._conn.commit()
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+            self._conn = None
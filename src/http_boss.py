@@ -0,0 +1,383 @@
+"""
+Boss直聘 HTTP 快速爬虫
+直接请求搜索接口（wapi/zpgeek/search/joblist.json）和详情页HTML，不经过浏览器渲染；
+遇到验证页面时，本会话后续请求回退到 Playwright 后端（BossCrawlerSession），冷却后再试探恢复HTTP。
+爬取主循环（原始数据写入、断点续爬、已知岗位跳过）与 playwright_boss 共用 crawl_loop.iter_crawl_jobs。
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from src.playwright_boss import (
+    BROWSER_USER_AGENT, BossCrawlerSession,
+    _build_job_info, extract_job_info_from_page, human_like_delay, is_search_page_blocked, scroll_page
+)
+from src.crawl_circuit_breaker import CrawlCircuitBreaker
+from src.crawl_loop import iter_crawl_jobs
+from src.known_job_index import KnownJobIndex
+from src.crawl_pacing import AdaptivePacer
+
+JOB_LIST_API = "https://www.zhipin.com/wapi/zpgeek/search/joblist.json"
+JOB_DETAIL_URL = "https://www.zhipin.com/job_detail/{job_id}.html"
+SEARCH_PAGE_URL = "https://www.zhipin.com/web/geek/job?query={query}&city={city}"
+
+# 详情页命中这些特征时视为验证页面（跳转到验证地址或页面中出现验证码提示）
+CHALLENGE_URL_MARKERS = ["verify", "security-check", "passport"]
+CHALLENGE_TEXT_MARKERS = ["安全验证", "环境存在异常", "访问行为异常"]
+# 正常详情页的服务端渲染内容中一定包含的结构，缺失时（404、5xx、岗位已下线等）按普通失败处理
+DETAIL_PAGE_MARKERS = ["job-sec-text", "job-detail"]
+
+class BossChallengeError(Exception):
+    """HTTP请求遇到验证页面"""
+
+def is_challenge_response(status_code: int, final_url: str, html: str) -> bool:
+    """判断详情页响应是否为验证页面：被重定向到验证地址，或页面中出现验证码提示"""
+    if any(marker in final_url for marker in CHALLENGE_URL_MARKERS):
+        return True
+    return any(marker in html for marker in CHALLENGE_TEXT_MARKERS)
+
+def is_detail_response(status_code: int, html: str) -> bool:
+    """判断详情页响应是否为正常的岗位详情"""
+    return status_code == 200 and any(marker in html for marker in DETAIL_PAGE_MARKERS)
+
+def parse_job_list(data: Dict) -> Tuple[List[Dict[str, str]], bool]:
+    """解析搜索接口响应，返回 (岗位信息列表, 是否还有下一页)；code 非0 时抛出 BossChallengeError"""
+    if not isinstance(data, dict) or data.get("code") != 0:
+        message = data.get("message", "") if isinstance(data, dict) else ""
+        raise BossChallengeError(f"搜索接口返回异常: code={data.get('code') if isinstance(data, dict) else None} {message}")
+
+    zp_data = data.get("zpData") or {}
+    page_jobs = []
+    for item in zp_data.get("jobList") or []:
+        job_id = item.get("encryptJobId")
+        location = " · ".join(part for part in (item.get("cityName"), item.get("areaDistrict"),
+                                                item.get("businessDistrict")) if part)
+        job_info = _build_job_info(
+            item.get("jobName", ""),
+            item.get("brandName", ""),
+            item.get("salaryDesc", ""),
+            location,
+            list(item.get("jobLabels") or []) + list(item.get("skills") or []),
+            JOB_DETAIL_URL.format(job_id=job_id) if job_id else None
+        )
+        if job_info:
+            page_jobs.append(job_info)
+
+    return page_jobs, bool(zp_data.get("hasMore", page_jobs))
+
+class BossHttpSession:
+    """Boss直聘HTTP爬虫会话
+
+    持有一个连接池化的 httpx.AsyncClient（keep-alive，多次搜索之间复用cookies），
+    详情页并发抓取数由 detail_concurrency 控制、节奏由 AdaptivePacer 控制。
+    遇到验证页面后，本会话后续的搜索和详情请求改走浏览器（按需启动 BossCrawlerSession），
+    每隔 http_retry_after 秒放行一个请求试探HTTP，试探得到正常响应即恢复HTTP。
+    """
+
+    def __init__(self, detail_concurrency: int = 5, detail_min_interval: float = 1.0,
+                 max_connections: int = 10, timeout: float = 20.0,
+                 fallback_to_browser: bool = True, headless: bool = False,
+                 resource_blocking: Optional[Dict] = None, raw_output: Optional[Dict] = None,
+                 pacing: Optional[Dict] = None, circuit_breaker: Optional[Dict] = None,
+                 raw_store: Optional[Dict] = None, http_retry_after: float = 300.0):
+        """
+        Args:
+            detail_concurrency: 同时进行的详情页请求数
+            detail_min_interval: 同一host两次请求的初始间隔（秒），之后由AdaptivePacer自动调整
+            max_connections: 连接池大小
+            fallback_to_browser: 遇到验证页面时是否回退到Playwright
+            resource_blocking / headless: 透传给回退使用的 BossCrawlerSession
+            raw_output: 原始数据写入配置，透传给 RawJsonlWriter
+            pacing: 节奏控制配置，透传给 AdaptivePacer
+            circuit_breaker: 透传给回退使用的 BossCrawlerSession 的熔断配置
+            raw_store: 紧凑存储配置（同 BossCrawlerSession）
+            http_retry_after: 回退到浏览器后，每隔多少秒试探一次HTTP
+        """
+        self.detail_concurrency = detail_concurrency
+        self.detail_min_interval = detail_min_interval
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.fallback_to_browser = fallback_to_browser
+        self.headless = headless
+        self.resource_blocking = resource_blocking
+        self.raw_output = dict(raw_output or {})
+        self.raw_store = dict(raw_store or {})
+        self.pacing = pacing
+        self.circuit_breaker_config = circuit_breaker
+        self.pacer = AdaptivePacer.from_config(pacing, initial_interval=detail_min_interval)
+
+        self.client: Optional[httpx.AsyncClient] = None
+        self.browser_session: Optional[BossCrawlerSession] = None
+        self._browser_lock = asyncio.Lock()
+        self._detail_slots = asyncio.Semaphore(max(1, detail_concurrency))
+        self.http_retry_after = http_retry_after
+        self.challenged = False
+        self.challenged_at: Optional[float] = None
+        self.searches_done = 0
+        self.http_fetches = 0
+        self.browser_fetches = 0
+
+    @property
+    def started(self) -> bool:
+        return self.client is not None
+
+    async def start(self) -> "BossHttpSession":
+        """创建连接池"""
+        if self.started:
+            return self
+
+        self.client = httpx.AsyncClient(
+            headers={
+                "User-Agent": BROWSER_USER_AGENT,
+                "Accept-Language": "zh-CN,zh;q=0.9",
+                "Referer": "https://www.zhipin.com/web/geek/job"
+            },
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_connections),
+            timeout=self.timeout,
+            follow_redirects=True
+        )
+        return self
+
+    def mark_challenged(self, reason: str) -> None:
+        """记录遇到验证页面，之后的请求改走浏览器，冷却后再试探HTTP"""
+        if not self.challenged:
+            print(f"🛡️  HTTP请求遇到验证页面（{reason}）" +
+                  ("，后续请求回退到Playwright" if self.fallback_to_browser else ""))
+        self.challenged = True
+        self.challenged_at = time.monotonic()
+
+    def mark_recovered(self) -> None:
+        """HTTP请求得到正常响应，恢复走HTTP"""
+        if self.challenged:
+            print("✅ HTTP请求已恢复正常，后续请求不再回退到Playwright")
+        self.challenged = False
+        self.challenged_at = None
+
+    def _try_http(self) -> bool:
+        """本次请求是否走HTTP：未遇到验证，或冷却已过（同一冷却周期只放行一个试探请求）"""
+        if not self.challenged:
+            return True
+        if self.challenged_at is None or time.monotonic() - self.challenged_at < self.http_retry_after:
+            return False
+        self.challenged_at = time.monotonic()
+        return True
+
+    @property
+    def use_browser(self) -> bool:
+        return self.challenged and self.fallback_to_browser
+
+    @property
+    def circuit_breaker(self) -> Optional[CrawlCircuitBreaker]:
+        """回退浏览器会话的熔断器，尚未回退到浏览器时为None"""
+        return self.browser_session.circuit_breaker if self.browser_session else None
+
+    async def get_browser_session(self) -> BossCrawlerSession:
+        """按需启动回退用的浏览器会话"""
+        async with self._browser_lock:
+            if self.browser_session is None:
+                self.browser_session = BossCrawlerSession(
+                    headless=self.headless,
+                    detail_concurrency=self.detail_concurrency,
+                    detail_min_interval=self.detail_min_interval,
+                    resource_blocking=self.resource_blocking,
+                    raw_output=self.raw_output,
+                    pacing=self.pacing,
+                    circuit_breaker=self.circuit_breaker_config
+                )
+            await self.browser_session.start()
+            return self.browser_session
+
+    async def fetch_job_list(self, keyword: str, city: str, page_num: int) -> Tuple[List[Dict[str, str]], bool]:
+        """获取一页搜索结果，返回 (岗位信息列表, 是否还有下一页)"""
+        if self._try_http():
+            await self.pacer.acquire(JOB_LIST_API)
+            started = time.monotonic()
+            try:
+                response = await self.client.get(JOB_LIST_API, params={
+                    "scene": 1, "query": keyword, "city": city, "page": page_num, "pageSize": 30
+                })
+                result = parse_job_list(response.json())
+                self.pacer.record_success(time.monotonic() - started)
+                self.mark_recovered()
+                return result
+            except httpx.HTTPError as e:
+                self.pacer.record_error()
+                print(f"⚠️  获取搜索结果失败 第{page_num}页: {e}")
+                return [], True
+            except (BossChallengeError, ValueError) as e:
+                self.pacer.record_challenge()
+                self.mark_challenged(str(e))
+
+        if not self.use_browser:
+            return [], False
+
+        # 浏览器回退：与Playwright后端相同，经过熔断guard和节奏控制，渲染搜索页并提取岗位卡片
+        browser_session = await self.get_browser_session()
+        pacer = browser_session.pacer
+        breaker = browser_session.circuit_breaker
+        search_url = SEARCH_PAGE_URL.format(query=quote(keyword), city=city) + f"&page={page_num}"
+        for attempt in range(2):
+            # 熔断时等待冷却（可能轮换上下文，需要重新取搜索页）
+            await browser_session.guard()
+            page = browser_session.search_page
+            await pacer.acquire(search_url)
+            started = time.monotonic()
+            try:
+                await page.goto(search_url, wait_until='domcontentloaded', timeout=60000)
+            except Exception as e:
+                pacer.record_error()
+                print(f"⚠️  回退浏览器加载搜索页失败: {e}")
+                return [], True
+            load_seconds = time.monotonic() - started
+            await human_like_delay(pacer)
+
+            if not await is_search_page_blocked(page):
+                pacer.record_success(load_seconds)
+                breaker.record_success()
+                await scroll_page(page, pacer)
+                return await extract_job_info_from_page(page), True
+
+            pacer.record_challenge()
+            breaker.record_challenge()
+            print(f"⚠️  回退浏览器遇到反爬虫页面（当前间隔 {pacer.interval:.1f}s）" +
+                  ("，放慢节奏后重试..." if attempt == 0 else f"，跳过第 {page_num} 页"))
+
+        # 仍被拦截：不提取无效页面，本页不记断点，留待续爬
+        return [], True
+
+    async def fetch_detail(self, job_url: str) -> Optional[str]:
+        """抓取详情页HTML；HTTP遇到验证页面时回退到浏览器"""
+        async with self._detail_slots:
+            if self._try_http():
+                await self.pacer.acquire(job_url)
+                started = time.monotonic()
+                try:
+                    response = await self.client.get(job_url)
+                except httpx.HTTPError as e:
+                    self.pacer.record_error()
+                    print(f"⚠️  获取详情页失败 {job_url}: {e}")
+                    return None
+
+                if is_challenge_response(response.status_code, str(response.url), response.text):
+                    self.pacer.record_challenge()
+                    self.mark_challenged(f"HTTP {response.status_code} {response.url}")
+                elif is_detail_response(response.status_code, response.text):
+                    self.pacer.record_success(time.monotonic() - started)
+                    self.mark_recovered()
+                    self.http_fetches += 1
+                    return response.text
+                else:
+                    # 404、5xx、岗位已下线等：普通失败，不影响后续请求走HTTP
+                    self.pacer.record_error()
+                    print(f"⚠️  获取详情页失败 {job_url}: HTTP {response.status_code}")
+                    return None
+
+            if not self.use_browser:
+                return None
+
+        browser_session = await self.get_browser_session()
+        self.browser_fetches += 1
+        return await browser_session.detail_pool.fetch(job_url)
+
+    async def fetch_details_in_order(self, job_urls: List[str]) -> AsyncIterator[Tuple[int, Optional[str]]]:
+        """并发抓取一组URL，按输入顺序产出 (序号, HTML)；空URL直接返回空字符串"""
+        tasks = [
+            asyncio.create_task(self.fetch_detail(url)) if url else None
+            for url in job_urls
+        ]
+        try:
+            for i, task in enumerate(tasks):
+                yield i, (await task if task else "")
+        finally:
+            for task in tasks:
+                if task and not task.done():
+                    task.cancel()
+
+    async def close(self) -> None:
+        """关闭连接池和回退浏览器"""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+        if self.browser_session:
+            await self.browser_session.close()
+            self.browser_session = None
+
+    async def __aenter__(self) -> "BossHttpSession":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+async def iter_boss_jobs_http(keyword: str, city: str = "101010100", max_pages: int = 2, max_jobs_test: Optional[int] = None,
+                              detail_concurrency: int = 5, detail_min_interval: float = 1.0,
+                              session: Optional[BossHttpSession] = None,
+                              resume: bool = False,
+                              known_jobs: Optional[KnownJobIndex] = None,
+                              stop_on_known_page: bool = False) -> AsyncIterator[Dict[str, str]]:
+    """使用HTTP接口从Boss直聘流式获取岗位信息（参数含义同 iter_boss_jobs_playwright）"""
+    if session is None:
+        async with BossHttpSession(detail_concurrency=detail_concurrency,
+                                   detail_min_interval=detail_min_interval) as temp_session:
+            async for job_record in iter_boss_jobs_http(keyword, city, max_pages, max_jobs_test,
+                                                        session=temp_session, resume=resume,
+                                                        known_jobs=known_jobs,
+                                                        stop_on_known_page=stop_on_known_page):
+                yield job_record
+        return
+
+    await session.start()
+
+    print(f"🚀 启动HTTP爬虫: {keyword}")
+    if max_jobs_test:
+        print(f"🧪 测试模式: 每页最多处理 {max_jobs_test} 个岗位")
+
+    http_before, browser_before = session.http_fetches, session.browser_fetches
+
+    async for job_record in iter_crawl_jobs(
+        "http", "Boss直聘HTTP", keyword, city,
+        lambda page_num: session.fetch_job_list(keyword, city, page_num),
+        session.fetch_details_in_order,
+        max_pages=max_pages, max_jobs_test=max_jobs_test,
+        raw_output=session.raw_output, raw_store=session.raw_store,
+        resume=resume, known_jobs=known_jobs, stop_on_known_page=stop_on_known_page
+    ):
+        yield job_record
+
+    session.searches_done += 1
+
+    print(f"🌐 详情页来源: HTTP {session.http_fetches - http_before} 个，"
+          f"浏览器回退 {session.browser_fetches - browser_before} 个")
+    pacing = session.pacer.stats()
+    print(f"⏱️  当前节奏: 间隔 {pacing['interval']}s ({pacing['rate_per_minute']} 次/分钟)，"
+          f"反爬虫 {pacing['challenges']} 次，失败 {pacing['errors']} 次")
+
+async def fetch_boss_jobs_http(keyword: str, city: str = "101010100", max_pages: int = 2, max_jobs_test: Optional[int] = None,
+                               detail_concurrency: int = 5, detail_min_interval: float = 1.0,
+                               session: Optional[BossHttpSession] = None,
+                               resume: bool = False,
+                               known_jobs: Optional[KnownJobIndex] = None,
+                               stop_on_known_page: bool = False) -> List[Dict[str, str]]:
+    """使用HTTP接口从Boss直聘获取岗位信息（一次性返回列表，参数同 iter_boss_jobs_http）"""
+    return [
+        job_record async for job_record in iter_boss_jobs_http(
+            keyword, city, max_pages, max_jobs_test,
+            detail_concurrency=detail_concurrency,
+            detail_min_interval=detail_min_interval,
+            session=session,
+            resume=resume,
+            known_jobs=known_jobs,
+            stop_on_known_page=stop_on_known_page
+        )
+    ]
+
+# 测试函数
+if __name__ == "__main__":
+    async def test():
+        jobs = await fetch_boss_jobs_http("大模型 算法", max_pages=1, max_jobs_test=3)
+        print(f"获取到 {len(jobs)} 个岗位")
+
+    asyncio.run(test())
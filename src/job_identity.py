@@ -0,0 +1,21 @@
+"""
+岗位标识工具
+爬虫、断点续爬、已知岗位索引和去重器共用的岗位ID提取逻辑
+"""
+import re
+
+def extract_job_id(url: str) -> str:
+    """从URL中提取岗位ID"""
+    if not url:
+        return ""
+    
+    # 处理不同招聘网站的URL格式
+    base_url = url.split('?')[0]
+    
+    # Boss直聘
+    if 'zhipin.com' in url:
+        match = re.search(r'/job_detail/([^/.]+)', base_url)
+        return match.group(1) if match else base_url.split('/')[-1] if '/' in base_url else base_url
+    
+    # 其他网站的通用处理
+    return base_url.split('/')[-1] if '/' in base_url else base_url
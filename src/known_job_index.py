@@ -0,0 +1,139 @@
+"""
+已知岗位ID索引
+从Notion缓存文件和历史原始爬取数据中收集岗位ID，爬虫在抓取详情页之前查询，
+已知岗位直接跳过，把去重提前到最昂贵的网络请求之前。
+"""
+import glob
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.job_identity import extract_job_id
+from src.raw_jsonl_writer import open_raw_jsonl
+
+NOTION_CACHE_PATTERNS = [
+    "debug/snapshots/*_notion_cache.json",
+    "debug/notion_cache_*.json",
+    "data/notion_cache_*.json",
+    "cache/notion_cache_*.json",
+    "notion_cache_*.json",
+]
+
+RAW_DATA_PATTERNS = [
+    "data/raw_boss_playwright_*.jsonl",
+    "data/raw_boss_playwright_*.jsonl.gz",
+    "data/raw_boss_http_*.jsonl",
+    "data/raw_boss_http_*.jsonl.gz",
+    "data/raw_boss_*.meta.jsonl",
+]
+
+# 爬虫写入的记录（以及紧凑存储的元数据行）以 {"url": ...} 开头，先用正则取URL，避免对整行（含HTML）做json解析
+_RAW_URL_PATTERN = re.compile(r'^\{"url": "((?:[^"\\]|\\.)*)"')
+
+class KnownJobIndex:
+    """已知岗位ID集合，按URL查询"""
+
+    def __init__(self):
+        self.job_ids: Set[str] = set()
+        self.source_counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def __contains__(self, url: str) -> bool:
+        return self.contains(url)
+
+    def contains(self, url: str) -> bool:
+        job_id = extract_job_id(url)
+        return bool(job_id) and job_id in self.job_ids
+
+    def add(self, url: str) -> bool:
+        """加入一个岗位URL，返回是否为新ID"""
+        job_id = extract_job_id(url)
+        if not job_id or job_id in self.job_ids:
+            return False
+        self.job_ids.add(job_id)
+        return True
+
+    def _add_urls(self, urls: Iterable[str], source: str) -> int:
+        added = sum(1 for url in urls if url and self.add(url))
+        self.source_counts[source] = added
+        return added
+
+    def add_notion_cache(self, path: str) -> int:
+        """加载Notion缓存文件（支持 jobs 列表和 existing_urls 两种格式）"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        urls: List[str] = []
+        if isinstance(data, dict):
+            urls.extend(data.get("existing_urls", []))
+            urls.extend(job.get("岗位链接", "") for job in data.get("jobs", []) if isinstance(job, dict))
+        return self._add_urls(urls, path)
+
+    def add_raw_file(self, path: str) -> int:
+        """加载原始爬取JSONL文件中的岗位URL"""
+        def _iter_urls():
+            with open_raw_jsonl(path) as f:
+                for line in f:
+                    match = _RAW_URL_PATTERN.match(line)
+                    if match:
+                        yield json.loads(f'"{match.group(1)}"')
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    yield record.get("url") or record.get("岗位链接", "")
+
+        return self._add_urls(_iter_urls(), path)
+
+    @classmethod
+    def build(cls, include_notion_cache: bool = True, include_raw_files: bool = True,
+              max_age_days: Optional[float] = 14,
+              notion_cache_patterns: Optional[List[str]] = None,
+              raw_patterns: Optional[List[str]] = None) -> "KnownJobIndex":
+        """从本地文件构建索引
+
+        Args:
+            include_notion_cache: 是否加载最新的Notion缓存文件（Notion数据库的完整快照）
+            include_raw_files: 是否加载历史原始爬取数据
+            max_age_days: 只加载这么多天内修改过的原始数据文件，None表示不限
+        """
+        index = cls()
+
+        if include_notion_cache:
+            cache_files = [f for pattern in (notion_cache_patterns or NOTION_CACHE_PATTERNS) for f in glob.glob(pattern)]
+            if cache_files:
+                latest_cache = max(cache_files, key=os.path.getmtime)
+                try:
+                    index.add_notion_cache(latest_cache)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Notion缓存加载失败 {latest_cache}: {e}")
+
+        if include_raw_files:
+            cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+            for pattern in (raw_patterns or RAW_DATA_PATTERNS):
+                for path in glob.glob(pattern):
+                    if cutoff and os.path.getmtime(path) < cutoff:
+                        continue
+                    try:
+                        index.add_raw_file(path)
+                    except (OSError, EOFError) as e:
+                        print(f"⚠️  原始数据加载失败 {path}: {e}")
+
+        return index
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["KnownJobIndex"]:
+        """按 crawler.skip_known_jobs 配置构建索引，enabled 为False时返回None"""
+        config = config or {}
+        if not config.get("enabled", True):
+            return None
+        return cls.build(
+            include_notion_cache=config.get("include_notion_cache", True),
+            include_raw_files=config.get("include_raw_files", True),
+            max_age_days=config.get("max_age_days", 14)
+        )
@@ -0,0 +1,137 @@
+"""
+延迟加载HTML的岗位记录
+回放大型原始数据文件或边爬取边写入原始数据时，每条记录只保留元数据和HTML在源文件中的位置，
+HTML在提取阶段通过 job['html'] / job.get('html') 访问时才从磁盘读取（不缓存），
+加载、标准化、去重和过滤都只在轻量的元数据上进行。
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from src.raw_jsonl_writer import open_raw_jsonl
+from src.raw_crawl_store import RawCrawlStore, is_raw_store
+
+HTML_KEY = "html"
+
+# 按路径缓存打开的源文件，按顺序读取HTML时避免反复打开
+_open_sources: Dict[str, Any] = {}
+
+def _get_source(path: str):
+    source = _open_sources.get(path)
+    if source is None:
+        source = RawCrawlStore(path) if is_raw_store(path) else open_raw_jsonl(path, 'rb')
+        _open_sources[path] = source
+    return source
+
+def close_lazy_sources() -> None:
+    """关闭所有延迟加载用到的源文件"""
+    for source in _open_sources.values():
+        try:
+            source.close()
+        except Exception:
+            pass
+    _open_sources.clear()
+
+class HtmlRef:
+    """HTML在源文件中的位置：JSONL为 (行偏移, 行长度)，紧凑存储为 html_ref"""
+
+    __slots__ = ("path", "offset", "length", "store_ref")
+
+    def __init__(self, path: str, offset: int = 0, length: int = 0, store_ref: Optional[List[int]] = None):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.store_ref = store_ref
+
+    def __getstate__(self):
+        return (self.path, self.offset, self.length, self.store_ref)
+
+    def __setstate__(self, state):
+        self.path, self.offset, self.length, self.store_ref = state
+
+    def load(self) -> Optional[str]:
+        source = _get_source(self.path)
+        if self.store_ref is not None:
+            return source.get_html(self.store_ref)
+
+        source.seek(self.offset)
+        return json.loads(source.read(self.length)).get(HTML_KEY)
+
+class LazyJobRecord(dict):
+    """dict子类：'html' 不存放在字典中，访问时按 HtmlRef 从源文件读取
+
+    json序列化、items()、快照等只看到元数据；'html' in job 仍为True。
+    刚爬取的记录字典中仍带有HTML（直接返回），derive() 得到的记录只保留位置。
+    """
+
+    def __init__(self, data: Dict[str, Any], html_ref: HtmlRef):
+        super().__init__(data)
+        self.html_ref = html_ref
+
+    def __getitem__(self, key):
+        if key == HTML_KEY and not dict.__contains__(self, key):
+            return self.html_ref.load()
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if key == HTML_KEY and not dict.__contains__(self, key):
+            html = self.html_ref.load()
+            return default if html is None else html
+        return super().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key == HTML_KEY or super().__contains__(key)
+
+    def copy(self) -> "LazyJobRecord":
+        return LazyJobRecord(self, self.html_ref)
+
+    def derive(self, data: Dict[str, Any]) -> "LazyJobRecord":
+        """用新的字段构造记录，沿用同一个HTML位置"""
+        return LazyJobRecord(data, self.html_ref)
+
+    def materialize(self) -> Dict[str, Any]:
+        """读取HTML，返回普通dict"""
+        data = dict(self)
+        data.setdefault(HTML_KEY, self.html_ref.load())
+        return data
+
+    def __reduce__(self):
+        return (LazyJobRecord, (dict(self), self.html_ref))
+
+def has_html(job: Dict[str, Any]) -> bool:
+    """不读取HTML判断记录是否带有HTML（延迟加载的记录只在源文件中有HTML时创建）"""
+    return isinstance(job, LazyJobRecord) or bool(dict.get(job, HTML_KEY))
+
+def load_lazy_records(path: str) -> List[Dict[str, Any]]:
+    """加载原始数据文件（JSONL / JSONL.gz / 紧凑存储），带HTML的记录返回 LazyJobRecord"""
+    records: List[Dict[str, Any]] = []
+
+    if is_raw_store(path):
+        store = RawCrawlStore(path)
+        for meta in store.iter_metadata():
+            data = {key: value for key, value in meta.items() if key != "html_ref"}
+            if meta.get("html_ref"):
+                records.append(LazyJobRecord(data, HtmlRef(path, store_ref=meta["html_ref"])))
+            else:
+                records.append(data)
+        return records
+
+    offset = 0
+    with open_raw_jsonl(path, 'rb') as f:
+        for line in f:
+            length = len(line)
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+
+                if isinstance(record, dict):
+                    if record.get(HTML_KEY):
+                        # 解析后立即丢弃HTML，只保留行位置
+                        del record[HTML_KEY]
+                        records.append(LazyJobRecord(record, HtmlRef(path, offset, length)))
+                    else:
+                        records.append(record)
+            offset += length
+
+    return records
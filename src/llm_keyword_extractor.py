@@ -87,7 +87,9 @@ class LLMKeywordExtractor:
         messages = [{"role": "user", "content": prompt}]
         
         # 使用现有的LLM API调用
-        response = await self.llm_client._call_llm_api(messages, max_retries=2)
+        response = await self.llm_client._call_llm_api(
+            messages, max_retries=2, cache_check=lambda reply: bool(self._clean_llm_response(reply))
+        )
 
         print(f"LLM原始返回: {response}")
 
@@ -0,0 +1,106 @@
+"""
+LLM请求速率限制
+按提供商的每分钟请求数（RPM）和每分钟token数（TPM）限流，使用60秒滑动窗口。
+并发提取时同一个提取器的所有LLM调用共用一个限流器；收到429时整体暂停一段时间。
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+# 各提供商的默认限额（偏保守，可通过 llm.rate_limits.<provider> 覆盖）
+PROVIDER_RATE_LIMITS: Dict[str, Dict[str, int]] = {
+    "deepseek": {"requests_per_minute": 120, "tokens_per_minute": 300000},
+    "zhipu": {"requests_per_minute": 60, "tokens_per_minute": 150000},
+    "siliconflow": {"requests_per_minute": 500, "tokens_per_minute": 50000},
+    "01ai": {"requests_per_minute": 60, "tokens_per_minute": 100000},
+    "openai": {"requests_per_minute": 500, "tokens_per_minute": 200000},
+}
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数：中文等非ASCII字符约0.6个token，ASCII约4个字符一个token"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return int(non_ascii * 0.6 + (len(text) - non_ascii) / 4) + 1
+
+class LLMRateLimiter:
+    """RPM/TPM滑动窗口限流器，limit为0或None表示不限制"""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 window: float = 60.0):
+        self.requests_per_minute = requests_per_minute or 0
+        self.tokens_per_minute = tokens_per_minute or 0
+        self.window = window
+
+        self._events: deque = deque()  # (时间, token数)
+        self._tokens_in_window = 0
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+        self.requests = 0
+        self.tokens = 0
+        self.waited = 0.0
+        self.rate_limited = 0
+
+    @classmethod
+    def from_config(cls, provider: str, llm_config: Optional[Dict[str, Any]] = None) -> "LLMRateLimiter":
+        """按提供商默认限额创建，llm.rate_limits.<provider> 中的配置优先"""
+        overrides = ((llm_config or {}).get("rate_limits") or {}).get(provider) or {}
+        return cls(**{**PROVIDER_RATE_LIMITS.get(provider, {}), **overrides})
+
+    def _prune(self, now: float) -> None:
+        while self._events and self._events[0][0] <= now - self.window:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        wait = max(0.0, self._paused_until - now)
+        if not self._events:
+            return wait
+        if self.requests_per_minute and len(self._events) >= self.requests_per_minute:
+            wait = max(wait, self._events[0][0] + self.window - now)
+        if self.tokens_per_minute and self._tokens_in_window + tokens > self.tokens_per_minute:
+            # 等到窗口内释放出足够的token
+            released = self._tokens_in_window
+            for timestamp, event_tokens in self._events:
+                released -= event_tokens
+                if released + tokens <= self.tokens_per_minute:
+                    wait = max(wait, timestamp + self.window - now)
+                    break
+            else:
+                # 单个请求超过TPM：等窗口清空后放行
+                wait = max(wait, self._events[-1][0] + self.window - now)
+        return wait
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """等待直到窗口内还有请求数和token额度"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                wait = self._wait_time(tokens, now)
+                if wait <= 0:
+                    break
+                self.waited += wait
+                await asyncio.sleep(wait)
+
+            self._events.append((time.monotonic(), tokens))
+            self._tokens_in_window += tokens
+            self.requests += 1
+            self.tokens += tokens
+
+    def pause(self, seconds: float) -> None:
+        """收到429等限流响应后，所有请求暂停 seconds 秒"""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        print(f"🚦 LLM请求被限流，暂停 {seconds:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """累计请求数、估算token数、限流等待时间"""
+        return {
+            "requests": self.requests,
+            "estimated_tokens": self.tokens,
+            "waited_seconds": round(self.waited, 1),
+            "rate_limited": self.rate_limited,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute
+        }
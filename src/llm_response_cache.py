@@ -0,0 +1,167 @@
+"""
+LLM响应缓存
+以 (提供商, 模型, temperature, max_tokens, messages) 的哈希为键，把LLM响应保存在SQLite中，
+使用 --skip-crawl 重放同一批数据时相同的请求直接命中缓存，不再调用API。
+条目超过TTL后失效；总大小超过上限时按最近访问时间淘汰最旧的条目。
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CACHE_PATH = "data/llm_cache.sqlite"
+
+class LLMResponseCache:
+    """SQLite持久化的LLM响应缓存"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, enabled: bool = True, bypass: bool = False,
+                 ttl_days: float = 30, max_size_mb: float = 200, evict_check_interval: int = 100):
+        """
+        Args:
+            path: SQLite文件路径
+            enabled: 是否启用缓存
+            bypass: 跳过读取缓存（仍写入新的响应，用于强制刷新）
+            ttl_days: 条目有效期（天），0为永不过期
+            max_size_mb: 响应总大小上限（MB），0为不限制
+            evict_check_interval: 每写入多少条检查一次大小
+        """
+        self.path = path
+        self.enabled = enabled
+        self.bypass = bypass
+        self.ttl = ttl_days * 86400 if ttl_days else 0
+        self.max_size = int(max_size_mb * 1024 * 1024) if max_size_mb else 0
+        self.evict_check_interval = max(1, evict_check_interval)
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "LLMResponseCache":
+        """按 llm.cache 配置创建"""
+        return cls(**(config or {}))
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: Any, max_tokens: Any,
+                 messages: List[Dict[str, Any]]) -> str:
+        """请求内容的哈希"""
+        payload = json.dumps([provider, model, temperature, max_tokens, messages],
+                             ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中、已过期或跳过缓存时返回None"""
+        if not self.enabled or self.bypass:
+            return None
+
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            if row and self.ttl and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+        except sqlite3.Error as e:
+            print(f"⚠️  LLM缓存读取失败: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str) -> None:
+        """写入缓存"""
+        if not self.enabled:
+            return
+
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), now, now)
+            )
+            conn.commit()
+            self.writes += 1
+            if self.writes % self.evict_check_interval == 0:
+                self.evict()
+        except sqlite3.Error as e:
+            print(f"⚠️  LLM缓存写入失败: {e}")
+
+    def evict(self) -> int:
+        """删除过期条目，总大小超过上限时按最近访问时间淘汰，返回删除条数"""
+        conn = self._connect()
+        removed = 0
+
+        if self.ttl:
+            removed += conn.execute("DELETE FROM responses WHERE created_at < ?",
+                                    (time.time() - self.ttl,)).rowcount
+
+        if self.max_size:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_size:
+                # 淘汰到上限的90%，避免每次写入都触发
+                target = int(self.max_size * 0.9)
+                stale_keys = []
+                for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+                    if total <= target:
+                        break
+                    stale_keys.append((key,))
+                    total -= size
+                conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+                removed += len(stale_keys)
+
+        conn.commit()
+        self.evicted += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "bypass": self.bypass,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": f"{self.hits / lookups * 100:.1f}%" if lookups else "N/A",
+            "writes": self.writes,
+            "evicted": self.evicted
+        }
+
+    def close(self) -> None:
+        """淘汰超限条目并关闭连接"""
+        if self._conn is not None:
+            try:
+                self.evict()
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+            self._conn = None
@@ -1,14 +1,88 @@
 import asyncio
-import json
 import random
 import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable, Awaitable, AsyncIterator, Tuple
+from urllib.parse import urlparse
 from playwright.async_api import async_playwright, Page, Browser
 import os
 
-async def setup_page(page: Page) -> None:
-    """配置页面以避免检测"""
+from src.crawl_loop import iter_crawl_jobs
+from src.known_job_index import KnownJobIndex
+from src.crawl_pacing import AdaptivePacer
+from src.crawl_circuit_breaker import CrawlCircuitBreaker, OPEN
+
+# 详情页提取只需要 page.content() 的HTML，这些资源类型默认直接拦截
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+DEFAULT_FIRST_PARTY_DOMAINS = ["zhipin.com"]
+
+class ResourceBlockingPolicy:
+    """请求拦截策略
+    
+    - blocked_types 中的资源类型一律拦截（image/media/font 等）
+    - block_third_party 为True时，非 first_party_domains 域名的子资源也会被拦截
+    - allow 为按资源类型的域名白名单，如 {"script": ["zhipin.com"]}，命中时放行
+    - 主文档（document）永远放行
+    
+    注意：Playwright 启用路由后该页面不再使用HTTP缓存，因此只建议用于详情页。
+    """
+    
+    def __init__(self, blocked_types: Optional[List[str]] = None, block_third_party: bool = True,
+                 first_party_domains: Optional[List[str]] = None,
+                 allow: Optional[Dict[str, List[str]]] = None):
+        self.blocked_types = set(DEFAULT_BLOCKED_RESOURCE_TYPES if blocked_types is None else blocked_types)
+        self.block_third_party = block_third_party
+        self.first_party_domains = list(first_party_domains or DEFAULT_FIRST_PARTY_DOMAINS)
+        self.allow = {res_type: list(hosts) for res_type, hosts in (allow or {}).items()}
+        self.blocked_count = 0
+        self.allowed_count = 0
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> Optional["ResourceBlockingPolicy"]:
+        """从 crawler.resource_blocking 配置构建策略，enabled 为False时返回None"""
+        config = config or {}
+        if not config.get("enabled", True):
+            return None
+        return cls(
+            blocked_types=config.get("blocked_types"),
+            block_third_party=config.get("block_third_party", True),
+            first_party_domains=config.get("first_party_domains"),
+            allow=config.get("allow")
+        )
+    
+    @staticmethod
+    def _host_matches(host: str, domains: List[str]) -> bool:
+        return any(host == domain or host.endswith("." + domain) for domain in domains)
+    
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """判断一个请求是否应被拦截"""
+        if resource_type == "document":
+            return False
+        
+        host = urlparse(url).hostname or ""
+        if self._host_matches(host, self.allow.get(resource_type, [])):
+            return False
+        
+        if resource_type in self.blocked_types:
+            return True
+        
+        if self.block_third_party and host and not self._host_matches(host, self.first_party_domains):
+            return True
+        
+        return False
+    
+    async def handle_route(self, route) -> None:
+        """Playwright 路由回调"""
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked_count += 1
+            await route.abort()
+        else:
+            self.allowed_count += 1
+            await route.continue_()
+
+async def setup_page(page: Page, resource_policy: Optional[ResourceBlockingPolicy] = None) -> None:
+    """配置页面以避免检测，可选启用资源拦截（轻量加载模式）"""
     # 设置用户代理 - 修复API调用
     await page.set_extra_http_headers({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
@@ -42,88 +116,187 @@ async def setup_page(page: Page) -> None:
                 originalQuery(parameters)
         );
     """)
+    
+    # 拦截图片、字体、第三方脚本等无用资源
+    if resource_policy:
+        await page.route("**/*", resource_policy.handle_route)
 
-async def human_like_delay():
-    """模拟人类操作的随机延迟"""
-    await asyncio.sleep(random.uniform(1.5, 3.5))
+async def human_like_delay(pacer: Optional[AdaptivePacer] = None):
+    """模拟人类操作的随机延迟；传入pacer时停顿随当前节奏缩放"""
+    if pacer:
+        await pacer.pause()
+    else:
+        await asyncio.sleep(random.uniform(1.5, 3.5))
 
-async def scroll_page(page: Page):
+async def scroll_page(page: Page, pacer: Optional[AdaptivePacer] = None):
     """模拟人类滚动行为"""
     # 随机滚动
     for _ in range(random.randint(2, 5)):
         await page.mouse.wheel(0, random.randint(200, 800))
-        await asyncio.sleep(random.uniform(0.5, 1.5))
+        if pacer:
+            await pacer.pause(scale=0.5)
+        else:
+            await asyncio.sleep(random.uniform(0.5, 1.5))
 
-async def extract_job_info_from_page(page: Page) -> List[Dict[str, str]]:
-    """从页面提取岗位信息"""
+# 反爬虫/验证页面特征
+ANTI_BOT_URL_MARKERS = ["verify", "security-check"]
+
+async def is_anti_bot_page(page: Page) -> bool:
+    """根据标题和URL判断当前页面是否为反爬虫验证页面"""
+    try:
+        page_title = await page.title()
+    except Exception:
+        return False
+    return ("异常" in page_title or "验证" in page_title
+            or any(marker in page.url for marker in ANTI_BOT_URL_MARKERS))
+
+# 在页面内一次性读取所有岗位卡片字段（单次IPC往返）
+JOB_CARDS_EXTRACT_JS = """
+(cards) => cards.map((card) => {
+    const text = (selector) => {
+        const el = card.querySelector(selector);
+        return el ? el.innerText : "";
+    };
+    const nameElem = card.querySelector('.job-name');
+    return {
+        job_name: text('.job-name'),
+        company_name: text('.boss-name'),
+        salary: text('.job-salary'),
+        location: text('.company-location'),
+        tags: Array.from(card.querySelectorAll('.tag-list li')).map((li) => li.innerText),
+        href: nameElem ? nameElem.getAttribute('href') : ""
+    };
+})
+"""
+
+def _build_job_info(job_name: str, company_name: str, salary: str, location: str,
+                    tag_texts: List[str], job_url: Optional[str]) -> Optional[Dict[str, str]]:
+    """将卡片原始字段整理为岗位信息，缺少岗位名或公司名时返回None"""
+    if job_url and not job_url.startswith('http'):
+        job_url = f"https://www.zhipin.com{job_url}"
+    
+    tags = [tag_text.strip() for tag_text in tag_texts if tag_text]
+    
+    if not (job_name and company_name):  # 确保有基本信息
+        return None
+    
+    return {
+        "job_name": job_name.strip(),
+        "company_name": company_name.strip(),
+        "salary_desc": (salary or "").strip(),
+        "location": (location or "").strip(),
+        "tags": ", ".join(tags),
+        "url": job_url or ""
+    }
+
+async def _extract_job_cards_batch(page: Page) -> List[Dict[str, str]]:
+    """通过一次 page 内JS执行批量提取所有岗位卡片"""
+    cards = await page.eval_on_selector_all('.job-card-wrap', JOB_CARDS_EXTRACT_JS)
+    print(f"📄 页面找到 {len(cards)} 个岗位元素")
+    
+    jobs = []
+    for card in cards:
+        job_info = _build_job_info(
+            card.get("job_name") or "",
+            card.get("company_name") or "",
+            card.get("salary") or "",
+            card.get("location") or "",
+            card.get("tags") or [],
+            card.get("href")
+        )
+        if job_info:
+            jobs.append(job_info)
+    return jobs
+
+async def _extract_job_cards_per_element(page: Page) -> List[Dict[str, str]]:
+    """逐个元素提取岗位卡片（兼容路径，每个字段一次IPC）"""
     jobs = []
     
+    # 提取岗位信息 - 使用正确的选择器
+    job_elements = await page.query_selector_all('.job-card-wrap')
+    
+    print(f"📄 页面找到 {len(job_elements)} 个岗位元素")
+    
+    for job_element in job_elements:
+        try:
+            # 提取基本信息 - 根据实际HTML结构调整
+            job_name_elem = await job_element.query_selector('.job-name')
+            company_name_elem = await job_element.query_selector('.boss-name')
+            salary_elem = await job_element.query_selector('.job-salary')
+            location_elem = await job_element.query_selector('.company-location')
+            tag_elements = await job_element.query_selector_all('.tag-list li')
+            
+            # 获取岗位链接
+            job_url = ""
+            if job_name_elem:
+                job_url = await job_name_elem.get_attribute('href')
+            
+            # 提取文本内容
+            job_name = await job_name_elem.inner_text() if job_name_elem else ""
+            company_name = await company_name_elem.inner_text() if company_name_elem else ""
+            salary = await salary_elem.inner_text() if salary_elem else ""
+            location = await location_elem.inner_text() if location_elem else ""
+            
+            # 提取标签信息（经验要求、学历等）
+            tag_texts = [await tag_elem.inner_text() for tag_elem in tag_elements]
+            
+            job_info = _build_job_info(job_name, company_name, salary, location, tag_texts, job_url)
+            if job_info:
+                jobs.append(job_info)
+                
+        except Exception as e:
+            print(f"⚠️  提取单个岗位信息失败: {e}")
+            continue
+    
+    return jobs
+
+async def extract_job_info_from_page(page: Page, batch: bool = True) -> List[Dict[str, str]]:
+    """从页面提取岗位信息
+    
+    Args:
+        page: 已加载搜索结果的页面
+        batch: 是否使用单次JS执行批量提取；失败时自动回退到逐元素提取
+    """
     try:
         # 等待岗位列表加载 - 修复选择器
         await page.wait_for_selector('.rec-job-list', timeout=10000)
-        
-        # 提取岗位信息 - 使用正确的选择器
-        job_elements = await page.query_selector_all('.job-card-wrap')
-        
-        print(f"📄 页面找到 {len(job_elements)} 个岗位元素")
-        
-        for job_element in job_elements:
-            try:
-                # 提取基本信息 - 根据实际HTML结构调整
-                job_name_elem = await job_element.query_selector('.job-name')
-                company_name_elem = await job_element.query_selector('.boss-name')
-                salary_elem = await job_element.query_selector('.job-salary')
-                location_elem = await job_element.query_selector('.company-location')
-                tag_elements = await job_element.query_selector_all('.tag-list li')
-                
-                # 获取岗位链接
-                job_url = ""
-                if job_name_elem:
-                    job_url = await job_name_elem.get_attribute('href')
-                    if job_url and not job_url.startswith('http'):
-                        job_url = f"https://www.zhipin.com{job_url}"
-                
-                # 提取文本内容
-                job_name = await job_name_elem.inner_text() if job_name_elem else ""
-                company_name = await company_name_elem.inner_text() if company_name_elem else ""
-                salary = await salary_elem.inner_text() if salary_elem else ""
-                location = await location_elem.inner_text() if location_elem else ""
-                
-                # 提取标签信息（经验要求、学历等）
-                tags = []
-                for tag_elem in tag_elements:
-                    tag_text = await tag_elem.inner_text()
-                    if tag_text:
-                        tags.append(tag_text.strip())
-                
-                if job_name and company_name:  # 确保有基本信息
-                    job_info = {
-                        "job_name": job_name.strip(),
-                        "company_name": company_name.strip(),
-                        "salary_desc": salary.strip(),
-                        "location": location.strip(),
-                        "tags": ", ".join(tags),
-                        "url": job_url
-                    }
-                    jobs.append(job_info)
-                    
-            except Exception as e:
-                print(f"⚠️  提取单个岗位信息失败: {e}")
-                continue
-                
     except Exception as e:
         print(f"❌ 提取岗位信息失败: {e}")
+        return []
     
-    return jobs
+    if batch:
+        try:
+            return await _extract_job_cards_batch(page)
+        except Exception as e:
+            print(f"⚠️  批量提取失败，回退到逐元素提取: {e}")
+    
+    try:
+        return await _extract_job_cards_per_element(page)
+    except Exception as e:
+        print(f"❌ 提取岗位信息失败: {e}")
+        return []
+
+async def is_search_page_blocked(page: Page) -> bool:
+    """搜索页是否为反爬虫/验证/未加载完成的页面"""
+    page_title = await page.title()
+    page_content = await page.content()
+    return "异常" in page_title or "验证" in page_content or "加载中" in page_content
 
-async def get_job_detail_html(page: Page, job_url: str) -> Optional[str]:
-    """获取岗位详情页HTML"""
+async def get_job_detail_html(page: Page, job_url: str, settle_delay: bool = True) -> Optional[str]:
+    """获取岗位详情页HTML
+    
+    Args:
+        page: 用于访问详情页的页面
+        job_url: 岗位详情URL
+        settle_delay: 加载后是否追加随机延迟；由AdaptivePacer控制节奏时可关闭
+    """
     try:
         print(f"🔍 访问岗位详情: {job_url}")
         
         # 降低等待要求，增加超时时间
         await page.goto(job_url, wait_until='domcontentloaded', timeout=45000)
-        await human_like_delay()
+        if settle_delay:
+            await human_like_delay()
         
         # 等待页面加载，使用更宽松的条件
         try:
@@ -140,158 +313,443 @@ async def get_job_detail_html(page: Page, job_url: str) -> Optional[str]:
         print(f"⚠️  获取详情页失败 {job_url}: {e}")
         return None
 
-async def fetch_boss_jobs_playwright(keyword: str, city: str = "101010100", max_pages: int = 2, max_jobs_test: Optional[int] = None) -> List[Dict[str, str]]:
-    """使用Playwright从Boss直聘获取岗位信息
+class DetailPagePool:
+    """详情页并发抓取池
+    
+    维护固定数量的页面（new_page 需返回已配置好的页面），并发抓取详情页HTML，节奏由AdaptivePacer控制
+    （每次抓取的耗时和结果会反馈给pacer和熔断器），fetch_in_order 按输入顺序逐个返回结果。
+    guard 在借到页面并经pacer放行之后、发出请求之前调用（排队等待的任务不会提前通过guard），
+    熔断时由会话在其中等待冷却并轮换上下文（随后调用 reset() 重建页面）。
+    """
+    
+    def __init__(self, new_page: Callable[[], Awaitable[Page]], size: int = 3,
+                 pacer: Optional[AdaptivePacer] = None,
+                 circuit_breaker: Optional[CrawlCircuitBreaker] = None,
+                 guard: Optional[Callable[[], Awaitable[None]]] = None):
+        self.new_page = new_page
+        self.size = max(1, size)
+        self.pacer = pacer or AdaptivePacer()
+        self.circuit_breaker = circuit_breaker
+        self.guard = guard
+        self._pages: List[Page] = []
+        self._idle: Optional[asyncio.Queue] = None
+    
+    async def start(self) -> None:
+        """创建页面池"""
+        self._idle = asyncio.Queue()
+        await self._fill()
+    
+    async def _fill(self) -> None:
+        for _ in range(self.size):
+            page = await self.new_page()
+            self._pages.append(page)
+            self._idle.put_nowait(page)
+    
+    async def reset(self) -> None:
+        """关闭现有页面并用 new_page 重建（上下文轮换后调用）；借出中的旧页面归还时直接丢弃"""
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        await self.close()
+        await self._fill()
+    
+    async def _borrow_page(self, job_url: str) -> Page:
+        """借出一个空闲页面并等待pacer放行，发请求前再经过guard；guard轮换上下文后借到的页面已被关闭，改借重建后的页面"""
+        while True:
+            page = await self._idle.get()
+            if page not in self._pages:
+                continue
+            try:
+                await self.pacer.acquire(job_url)
+                if self.guard:
+                    await self.guard()
+            except BaseException:
+                if page in self._pages:
+                    self._idle.put_nowait(page)
+                raise
+            if page in self._pages:
+                return page
+    
+    async def fetch(self, job_url: str) -> Optional[str]:
+        """借用一个空闲页面抓取详情页；遇到反爬虫验证页面时返回None"""
+        page = await self._borrow_page(job_url)
+        try:
+            started = time.monotonic()
+            html = await get_job_detail_html(page, job_url, settle_delay=False)
+            if html is None:
+                self.pacer.record_error()
+            elif await is_anti_bot_page(page):
+                print(f"⚠️  详情页遇到反爬虫验证: {job_url}")
+                self.pacer.record_challenge()
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_challenge()
+                return None
+            else:
+                self.pacer.record_success(time.monotonic() - started)
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_success()
+            return html
+        finally:
+            if page in self._pages:
+                self._idle.put_nowait(page)
+    
+    async def fetch_in_order(self, job_urls: List[str]) -> AsyncIterator[Tuple[int, Optional[str]]]:
+        """并发抓取一组URL，按输入顺序产出 (序号, HTML)；空URL直接返回空字符串"""
+        tasks = [
+            asyncio.create_task(self.fetch(url)) if url else None
+            for url in job_urls
+        ]
+        try:
+            for i, task in enumerate(tasks):
+                yield i, (await task if task else "")
+        finally:
+            for task in tasks:
+                if task and not task.done():
+                    task.cancel()
+    
+    async def close(self) -> None:
+        """关闭池中所有页面"""
+        for page in self._pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._pages = []
+
+BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+BROWSER_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-infobars',
+    '--disable-extensions',
+    '--disable-dev-shm-usage',
+    f'--user-agent={BROWSER_USER_AGENT}'
+]
+
+class BossCrawlerSession:
+    """长生命周期的Boss直聘爬虫会话
+    
+    持有一个浏览器和一个浏览器上下文，多次搜索（不同关键词×城市）之间复用
+    cookies、HTTP缓存、搜索页和详情页池，避免每次搜索都重新启动Chromium。
+    连续遇到反爬虫页面时熔断器打开：所有请求在 guard() 中等待冷却，随后轮换到新的浏览器上下文。
+    
+    用法:
+        async with BossCrawlerSession() as session:
+            jobs = await fetch_boss_jobs_playwright("大模型", "101010100", session=session)
+            jobs = await fetch_boss_jobs_playwright("LLM", "101020100", session=session)
+    """
+    
+    def __init__(self, headless: bool = False, detail_concurrency: int = 3, detail_min_interval: float = 1.5,
+                 resource_blocking: Optional[Dict] = None, raw_output: Optional[Dict] = None,
+                 pacing: Optional[Dict] = None, circuit_breaker: Optional[Dict] = None,
+                 raw_store: Optional[Dict] = None):
+        """
+        Args:
+            detail_min_interval: 同一host两次请求的初始间隔（秒），之后由AdaptivePacer自动调整
+            resource_blocking: 详情页资源拦截配置（见 ResourceBlockingPolicy.from_config），
+                默认拦截图片/媒体/字体和第三方请求；{"enabled": False} 关闭拦截
+            raw_output: 原始数据写入配置，透传给 RawJsonlWriter（compress、flush_every 等）
+            pacing: 节奏控制配置，透传给 AdaptivePacer（min_interval、max_interval、backoff 等）
+            circuit_breaker: 熔断配置，透传给 CrawlCircuitBreaker（failure_threshold、base_cooldown 等）
+            raw_store: 紧凑存储配置，enabled 为True时完整结束的爬取转换为紧凑存储，
+                其余参数透传给 compact_raw_jsonl（codec、chunk_records、remove_source 等）
+        """
+        self.headless = headless
+        self.detail_concurrency = detail_concurrency
+        self.detail_resource_policy = ResourceBlockingPolicy.from_config(resource_blocking)
+        self.raw_output = dict(raw_output or {})
+        self.raw_store = dict(raw_store or {})
+        self.pacer = AdaptivePacer.from_config(pacing, initial_interval=detail_min_interval)
+        self.circuit_breaker = CrawlCircuitBreaker.from_config(circuit_breaker)
+        self._guard_lock = asyncio.Lock()
+        self.context_rotations = 0
+        
+        self._playwright = None
+        self.browser: Optional[Browser] = None
+        self.context = None
+        self.search_page: Optional[Page] = None
+        self.detail_pool: Optional[DetailPagePool] = None
+        self.searches_done = 0
+    
+    @property
+    def started(self) -> bool:
+        return self.browser is not None
+    
+    async def start(self) -> "BossCrawlerSession":
+        """启动浏览器并创建共享上下文"""
+        if self.started:
+            return self
+        
+        print("🚀 启动浏览器会话...")
+        self._playwright = await async_playwright().start()
+        try:
+            # 启动浏览器（使用Chromium）
+            self.browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                args=BROWSER_LAUNCH_ARGS
+            )
+            self.context = await self._new_context()
+            
+            self.search_page = await self.new_page()
+            self.detail_pool = DetailPagePool(
+                lambda: self.new_page(resource_policy=self.detail_resource_policy),
+                size=self.detail_concurrency,
+                pacer=self.pacer,
+                circuit_breaker=self.circuit_breaker,
+                guard=self.guard
+            )
+            await self.detail_pool.start()
+        except Exception:
+            await self.close()
+            raise
+        
+        return self
+    
+    async def _new_context(self):
+        return await self.browser.new_context(
+            user_agent=BROWSER_USER_AGENT,
+            viewport={"width": 1920, "height": 1080}
+        )
+    
+    async def rotate_context(self) -> None:
+        """换用全新的浏览器上下文（新cookies和存储），重建搜索页和详情页池"""
+        old_context = self.context
+        self.context = await self._new_context()
+        self.search_page = await self.new_page()
+        if self.detail_pool:
+            await self.detail_pool.reset()
+        try:
+            await old_context.close()
+        except Exception:
+            pass
+        self.context_rotations += 1
+        print(f"🔄 已轮换到新的浏览器上下文（第 {self.context_rotations} 次）")
+    
+    async def guard(self) -> None:
+        """每次请求前调用：熔断打开时等待冷却并轮换上下文；熔断次数超限时抛出 CircuitOpenError"""
+        self.circuit_breaker.check()
+        if self.circuit_breaker.state != OPEN:
+            return
+        
+        async with self._guard_lock:
+            # 其他协程可能已经完成了这次恢复
+            if self.circuit_breaker.state != OPEN:
+                return
+            remaining = self.circuit_breaker.cooldown_remaining()
+            if remaining > 0:
+                print(f"⏸️  熔断冷却中，等待 {remaining:.0f}s")
+                await asyncio.sleep(remaining)
+            await self.rotate_context()
+            self.circuit_breaker.half_open()
+    
+    async def new_page(self, resource_policy: Optional[ResourceBlockingPolicy] = None) -> Page:
+        """在共享上下文中创建一个已配置的页面"""
+        page = await self.context.new_page()
+        await setup_page(page, resource_policy)
+        return page
+    
+    async def close(self) -> None:
+        """关闭页面池、浏览器和Playwright"""
+        if self.detail_pool:
+            await self.detail_pool.close()
+            self.detail_pool = None
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        self.context = None
+        self.search_page = None
+    
+    async def __aenter__(self) -> "BossCrawlerSession":
+        return await self.start()
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+async def iter_boss_jobs_playwright(keyword: str, city: str = "101010100", max_pages: int = 2, max_jobs_test: Optional[int] = None,
+                                    detail_concurrency: int = 3, detail_min_interval: float = 1.5,
+                                    resource_blocking: Optional[Dict] = None,
+                                    session: Optional[BossCrawlerSession] = None,
+                                    resume: bool = False,
+                                    known_jobs: Optional[KnownJobIndex] = None,
+                                    stop_on_known_page: bool = False) -> AsyncIterator[Dict[str, str]]:
+    """使用Playwright从Boss直聘流式获取岗位信息
+    
+    每抓到一个岗位详情就写入原始JSONL并立即产出该记录，调用方可以边爬取边处理，
+    不必等待整次搜索结束，也无需在内存中保留全部记录。
         
     Args:
         keyword: 搜索关键词
         city: 城市代码
         max_pages: 最大页数
         max_jobs_test: 测试模式下每页最多处理的岗位数量，None表示处理所有岗位
+        detail_concurrency: 并发抓取详情页的页面数量（仅在未传入session时生效）
+        detail_min_interval: 同一host两次请求的初始间隔（秒，仅在未传入session时生效）
+        resource_blocking: 详情页资源拦截配置（仅在未传入session时生效）
+        session: 可复用的爬虫会话；为None时为本次搜索临时创建并在结束时关闭
+        resume: 是否从同一关键词和城市最近一次未完成的爬取断点继续；
+            续爬时先重新产出已保存的记录，再跳过已完成的搜索页和已抓取的详情页
+        known_jobs: 已知岗位索引（Notion缓存 + 历史爬取），命中的岗位不抓取详情页也不产出
+        stop_on_known_page: 某一页的岗位全部为已知岗位时停止继续翻页（搜索结果按时间排序，
+            后续页大概率也都是旧岗位）
     """
+    if session is None:
+        async with BossCrawlerSession(detail_concurrency=detail_concurrency,
+                                      detail_min_interval=detail_min_interval,
+                                      resource_blocking=resource_blocking) as temp_session:
+            async for job_record in iter_boss_jobs_playwright(keyword, city, max_pages, max_jobs_test,
+                                                              session=temp_session, resume=resume,
+                                                              known_jobs=known_jobs,
+                                                              stop_on_known_page=stop_on_known_page):
+                yield job_record
+        return
+    
+    await session.start()
+    
     print(f"🚀 启动Playwright爬虫: {keyword}")
     if max_jobs_test:
         print(f"🧪 测试模式: 每页最多处理 {max_jobs_test} 个岗位")
+    if session.searches_done:
+        print(f"♻️  复用浏览器会话（已完成 {session.searches_done} 次搜索）")
     
-    # 创建保存目录
     os.makedirs("data", exist_ok=True)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    raw_file = f"data/raw_boss_playwright_{timestamp}.jsonl"
+    pacer = session.pacer
     
-    jobs = []
+    # 构造搜索URL
+    from urllib.parse import quote
+    encoded_keyword = quote(keyword)
+    base_url = f"https://www.zhipin.com/web/geek/job?query={encoded_keyword}&city={city}"
     
-    async with async_playwright() as p:
-        # 启动浏览器（使用Chromium）
-        browser = await p.chromium.launch(
-            headless=False,  # 设为True可以无界面运行
-            args=[
-                '--no-sandbox',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-infobars',
-                '--disable-extensions',
-                '--disable-dev-shm-usage',
-                '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            ]
-        )
+    async def fetch_job_list(page_num: int) -> Tuple[List[Dict[str, str]], bool]:
+        """渲染一页搜索结果并提取岗位卡片；页面无法加载或被拦截时返回空列表"""
+        # 访问搜索页面
+        search_url = f"{base_url}&page={page_num}"
+        print(f"访问URL: {search_url}")
+        
+        # 熔断时等待冷却（可能轮换上下文，需要重新取搜索页）
+        await session.guard()
+        page = session.search_page
         
+        # 搜索页与详情页同host，共用节奏控制
+        await pacer.acquire(search_url)
+        load_started = time.monotonic()
+    
         try:
-            # 创建页面
-            page = await browser.new_page()
-            await setup_page(page)
+            # 增加超时时间，降低等待标准
+            await page.goto(search_url, wait_until='domcontentloaded', timeout=60000)
+            print("✅ 页面加载成功")
+        except Exception as e:
+            pacer.record_error()
+            print(f"⚠️  页面加载失败，尝试重新加载: {e}")
+            try:
+                # 再次尝试，使用更宽松的等待条件
+                await page.goto(search_url, wait_until='load', timeout=45000)
+                print("✅ 重新加载成功")
+            except Exception as e2:
+                print(f"❌ 重新加载也失败: {e2}")
+                # 保存错误页面
+                error_file = f"data/error_page_{page_num}_{timestamp}.html"
+                try:
+                    content = await page.content()
+                    with open(error_file, "w", encoding="utf-8") as f:
+                        f.write(content)
+                    print(f"已保存错误页面到: {error_file}")
+                except:
+                    pass
+                return [], True
+        load_seconds = time.monotonic() - load_started
+    
+        await human_like_delay(pacer)
+    
+        # 检查是否有反爬虫页面
+        if await is_search_page_blocked(page):
+            pacer.record_challenge()
+            session.circuit_breaker.record_challenge()
+            print(f"⚠️  遇到反爬虫页面，放慢节奏（当前间隔 {pacer.interval:.1f}s）后重试...")
             
-            # 构造搜索URL
-            from urllib.parse import quote
-            encoded_keyword = quote(keyword)
-            base_url = f"https://www.zhipin.com/web/geek/job?query={encoded_keyword}&city={city}"
+            # 熔断时在guard中冷却并轮换上下文，否则按放慢后的节奏重新加载
+            await session.guard()
+            page = session.search_page
+            await pacer.acquire(search_url)
+            try:
+                await page.goto(search_url, wait_until='domcontentloaded', timeout=60000)
+            except Exception as e:
+                print(f"⚠️  重新加载失败: {e}")
+            await human_like_delay(pacer)
             
-            for page_num in range(1, max_pages + 1):
-                print(f"\n🔍 正在爬取第 {page_num} 页...")
-                
-                # 访问搜索页面
-                search_url = f"{base_url}&page={page_num}"
-                print(f"访问URL: {search_url}")
-                
-                try:
-                    # 增加超时时间，降低等待标准
-                    await page.goto(search_url, wait_until='domcontentloaded', timeout=60000)
-                    print("✅ 页面加载成功")
-                except Exception as e:
-                    print(f"⚠️  页面加载失败，尝试重新加载: {e}")
-                    try:
-                        # 再次尝试，使用更宽松的等待条件
-                        await page.goto(search_url, wait_until='load', timeout=45000)
-                        print("✅ 重新加载成功")
-                    except Exception as e2:
-                        print(f"❌ 重新加载也失败: {e2}")
-                        # 保存错误页面
-                        error_file = f"data/error_page_{page_num}_{timestamp}.html"
-                        try:
-                            content = await page.content()
-                            with open(error_file, "w", encoding="utf-8") as f:
-                                f.write(content)
-                            print(f"已保存错误页面到: {error_file}")
-                        except:
-                            pass
-                        continue
-                
-                await human_like_delay()
-                
-                # 检查是否有反爬虫页面
-                page_title = await page.title()
-                page_content = await page.content()
-                
-                if "异常" in page_title or "验证" in page_content or "加载中" in page_content:
-                    print("⚠️  遇到反爬虫页面，尝试等待...")
-                    await asyncio.sleep(10)
-                    
-                    # 尝试刷新
-                    await page.reload(wait_until='networkidle')
-                    await human_like_delay()
-                
-                # 模拟人类行为
-                await scroll_page(page)
-                await human_like_delay()
-                
-                # 提取当前页面的岗位信息
-                page_jobs = await extract_job_info_from_page(page)
-                
-                if not page_jobs:
-                    print(f"⚠️  第 {page_num} 页没有找到岗位信息")
-                    
-                    # 保存调试信息
-                    debug_file = f"data/debug_playwright_page_{page_num}_{timestamp}.html"
-                    with open(debug_file, "w", encoding="utf-8") as f:
-                        f.write(await page.content())
-                    print(f"已保存调试页面到: {debug_file}")
-                    continue
-
-                # 应用测试模式限制
-                if max_jobs_test and len(page_jobs) > max_jobs_test:
-                    page_jobs = page_jobs[:max_jobs_test]
-                    print(f"🧪 测试模式: 限制为前 {max_jobs_test} 个岗位")
-                
-                print(f"✅ 第 {page_num} 页提取到 {len(page_jobs)} 个岗位")
-                
-                # 处理每个岗位
-                for i, job_info in enumerate(page_jobs):
-                    print(f"处理岗位 {i+1}/{len(page_jobs)}: {job_info['job_name']}")
-                    
-                    # 获取详情页HTML（可选，耗时较长）
-                    job_html = ""
-                    if job_info.get("url"):
-                        # 在测试模式下，获取所有岗位的详情页（因为数量已经被限制了）
-                        job_html = await get_job_detail_html(page, job_info["url"])
-                        await human_like_delay()
-                    
-                    # 保存岗位数据
-                    job_record = {
-                        "url": job_info.get("url", ""),
-                        "html": job_html,
-                        "api_data": job_info,
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "source": "Boss直聘Playwright"
-                    }
-                    
-                    jobs.append(job_record)
-                    
-                    # 实时保存
-                    with open(raw_file, "a", encoding="utf-8") as f:
-                        f.write(json.dumps(job_record, ensure_ascii=False) + "\n")
-                    
-                    print(f"✅ 保存: {job_info['job_name']} - {job_info['company_name']}")
-                
-                # 页面间延迟
-                print(f"⏳ 等待后继续下一页...")
-                await asyncio.sleep(random.uniform(3, 6))
+            if await is_search_page_blocked(page):
+                # 仍被拦截：不提取无效页面，本页不记断点，留待续爬
+                pacer.record_challenge()
+                session.circuit_breaker.record_challenge()
+                print(f"❌ 第 {page_num} 页仍是反爬虫页面，跳过")
+                return [], True
         
-        finally:
-            await browser.close()
+        pacer.record_success(load_seconds)
+        session.circuit_breaker.record_success()
     
-    print(f"\n🎉 爬取完成！")
-    print(f"💾 数据已保存到: {raw_file}")
-    print(f"📊 总共获取 {len(jobs)} 个岗位")
+        # 模拟人类行为
+        await scroll_page(page, pacer)
+        await human_like_delay(pacer)
     
-    return jobs
+        # 提取当前页面的岗位信息
+        page_jobs = await extract_job_info_from_page(page)
+        if not page_jobs:
+            # 保存调试信息
+            debug_file = f"data/debug_playwright_page_{page_num}_{timestamp}.html"
+            with open(debug_file, "w", encoding="utf-8") as f:
+                f.write(await page.content())
+            print(f"已保存调试页面到: {debug_file}")
+        
+        # 渲染的搜索页不提供是否还有下一页，按 max_pages 翻页
+        return page_jobs, True
+    
+    async for job_record in iter_crawl_jobs(
+        "playwright", "Boss直聘Playwright", keyword, city,
+        fetch_job_list, lambda urls: session.detail_pool.fetch_in_order(urls),
+        max_pages=max_pages, max_jobs_test=max_jobs_test,
+        raw_output=session.raw_output, raw_store=session.raw_store,
+        resume=resume, known_jobs=known_jobs, stop_on_known_page=stop_on_known_page
+    ):
+        yield job_record
+    
+    session.searches_done += 1
+    
+    if session.detail_resource_policy:
+        policy = session.detail_resource_policy
+        print(f"🚫 详情页资源拦截: 已拦截 {policy.blocked_count} 个请求，放行 {policy.allowed_count} 个")
+    pacing = pacer.stats()
+    print(f"⏱️  当前节奏: 间隔 {pacing['interval']}s ({pacing['rate_per_minute']} 次/分钟)，"
+          f"反爬虫 {pacing['challenges']} 次，失败 {pacing['errors']} 次")
+    if session.circuit_breaker.trips:
+        print(f"🔌 熔断器: {session.circuit_breaker.state}，已熔断 {session.circuit_breaker.trips} 次，"
+              f"轮换上下文 {session.context_rotations} 次")
+
+async def fetch_boss_jobs_playwright(keyword: str, city: str = "101010100", max_pages: int = 2, max_jobs_test: Optional[int] = None,
+                                     detail_concurrency: int = 3, detail_min_interval: float = 1.5,
+                                     resource_blocking: Optional[Dict] = None,
+                                     session: Optional[BossCrawlerSession] = None,
+                                     resume: bool = False,
+                                     known_jobs: Optional[KnownJobIndex] = None,
+                                     stop_on_known_page: bool = False) -> List[Dict[str, str]]:
+    """使用Playwright从Boss直聘获取岗位信息（一次性返回列表，参数同 iter_boss_jobs_playwright）"""
+    return [
+        job_record async for job_record in iter_boss_jobs_playwright(
+            keyword, city, max_pages, max_jobs_test,
+            detail_concurrency=detail_concurrency,
+            detail_min_interval=detail_min_interval,
+            resource_blocking=resource_blocking,
+            session=session,
+            resume=resume,
+            known_jobs=known_jobs,
+            stop_on_known_page=stop_on_known_page
+        )
+    ]
 
 # 测试函数
 if __name__ == "__main__":
@@ -0,0 +1,383 @@
+"""
+紧凑的原始爬取数据存储
+原始JSONL每条记录都内嵌完整的详情页HTML，而页面大部分是相同的站点框架。
+本格式把HTML与元数据分开存放：
+
+- <base>.meta.jsonl  首行为文件头，之后每行一条记录的元数据（url、api_data、timestamp、source）
+                     和 html_ref = [块号, 块内偏移, 长度]；每个块写完后追加一行块位置
+                     {"chunk": n, "offset": ..., "length": ..., "raw_length": ...}
+- <base>.html.bin    HTML按块（默认32条）拼接后整体压缩，块与块首尾相接
+- <base>.dict        压缩字典（由第一个块的HTML训练，zstd可用时用zstd字典，否则作为zlib预置字典）
+
+相同HTML只存一份；只读元数据时无需解压HTML，按记录取HTML时只解压所在的块。
+zstandard 为可选依赖，未安装时使用标准库 zlib。
+"""
+import hashlib
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.raw_jsonl_writer import open_raw_jsonl
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+STORE_FORMAT = "raw_crawl_store"
+STORE_VERSION = 1
+META_SUFFIX = ".meta.jsonl"
+DATA_SUFFIX = ".html.bin"
+DICT_SUFFIX = ".dict"
+
+# zlib 预置字典只有最后32KB有效
+ZLIB_DICT_SIZE = 32 * 1024
+
+def is_raw_store(path: str) -> bool:
+    """是否为紧凑存储的元数据文件"""
+    return path.endswith(META_SUFFIX)
+
+def store_base_path(path: str) -> str:
+    """由元数据文件或原始JSONL路径得到存储的基础路径"""
+    for suffix in (META_SUFFIX, ".jsonl.gz", ".jsonl"):
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+class _Codec:
+    """块压缩编解码（zstd 或 zlib，可带字典）"""
+
+    def __init__(self, name: str, dictionary: Optional[bytes] = None, level: Optional[int] = None):
+        if name == "zstd" and not ZSTD_AVAILABLE:
+            raise ImportError("zstandard 未安装，无法读写 zstd 压缩的存储")
+        self.name = name
+        self.dictionary = dictionary
+        self.level = level
+
+        if name == "zstd":
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            self._compressor = zstandard.ZstdCompressor(level=level or 10, dict_data=dict_data)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.name == "zstd":
+            return self._compressor.compress(data)
+        compressor = zlib.compressobj(self.level or 9, zdict=self.dictionary) if self.dictionary \
+            else zlib.compressobj(self.level or 9)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes, raw_length: int) -> bytes:
+        if self.name == "zstd":
+            return self._decompressor.decompress(data, max_output_size=raw_length)
+        decompressor = zlib.decompressobj(zdict=self.dictionary) if self.dictionary else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+
+def _train_dictionary(codec_name: str, samples: List[bytes], dict_size: int) -> Optional[bytes]:
+    """用一批HTML训练压缩字典，样本不足或训练失败时返回None"""
+    samples = [sample for sample in samples if sample]
+    if not samples:
+        return None
+
+    if codec_name == "zstd":
+        try:
+            return zstandard.train_dictionary(dict_size, samples).as_bytes()
+        except zstandard.ZstdError:
+            return None
+
+    # zlib：用第一份HTML的首尾（页头、导航、页脚等站点框架）作为预置字典
+    sample = samples[0]
+    half = ZLIB_DICT_SIZE // 2
+    return sample if len(sample) <= ZLIB_DICT_SIZE else sample[:half] + sample[-half:]
+
+class RawCrawlStoreWriter:
+    """紧凑存储写入器
+
+    用法:
+        with RawCrawlStoreWriter("data/raw_boss_playwright_20250101_120000") as store:
+            for record in records:
+                store.write(record)
+    """
+
+    def __init__(self, base_path: str, codec: str = "auto", chunk_records: int = 32,
+                 dict_size: int = 112 * 1024, level: Optional[int] = None, use_dictionary: bool = True):
+        """
+        Args:
+            base_path: 存储基础路径（不含后缀）
+            codec: "zstd"、"zlib" 或 "auto"（zstandard可用时用zstd）
+            chunk_records: 每个压缩块包含的HTML数量
+            dict_size: zstd字典大小（字节）
+            level: 压缩级别，None使用默认值
+            use_dictionary: 是否用第一个块训练压缩字典
+        """
+        if codec == "auto":
+            codec = "zstd" if ZSTD_AVAILABLE else "zlib"
+
+        self.base_path = base_path
+        self.meta_path = base_path + META_SUFFIX
+        self.data_path = base_path + DATA_SUFFIX
+        self.dict_path = base_path + DICT_SUFFIX
+        self.codec_name = codec
+        self.chunk_records = max(1, chunk_records)
+        self.dict_size = dict_size
+        self.level = level
+        self.use_dictionary = use_dictionary
+
+        self._codec: Optional[_Codec] = None
+        self._meta_file = None
+        self._data_file = None
+        self._chunk_no = 0
+        self._chunk_parts: List[bytes] = []
+        self._chunk_size = 0
+        self._pending_meta: List[Dict[str, Any]] = []
+        self._html_refs: Dict[str, List[int]] = {}
+        self.records_written = 0
+        self.html_bytes = 0
+        self.duplicate_html = 0
+
+    def open(self) -> "RawCrawlStoreWriter":
+        directory = os.path.dirname(self.meta_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._meta_file = open(self.meta_path, 'w', encoding='utf-8')
+        self._data_file = open(self.data_path, 'wb')
+        return self
+
+    def write(self, record: Dict[str, Any]) -> int:
+        """写入一条原始爬取记录，返回记录序号"""
+        if not self._meta_file:
+            self.open()
+
+        meta = {key: value for key, value in record.items() if key != "html"}
+        html = record.get("html")
+
+        if isinstance(html, str) and html:
+            digest = hashlib.sha1(html.encode('utf-8')).hexdigest()
+            if digest in self._html_refs:
+                self.duplicate_html += 1
+            else:
+                data = html.encode('utf-8')
+                self._html_refs[digest] = [self._chunk_no, self._chunk_size, len(data)]
+                self._chunk_parts.append(data)
+                self._chunk_size += len(data)
+                self.html_bytes += len(data)
+            meta["html_ref"] = self._html_refs[digest]
+        else:
+            meta["html_ref"] = None
+            meta["html"] = html
+
+        # 元数据行在所在块落盘后再写，保证元数据文件中每条记录的HTML都已可读
+        self._pending_meta.append(meta)
+        self.records_written += 1
+
+        if len(self._chunk_parts) >= self.chunk_records:
+            self._flush_chunk()
+
+        return self.records_written - 1
+
+    def _ensure_codec(self) -> None:
+        if self._codec:
+            return
+
+        dictionary = None
+        if self.use_dictionary:
+            dictionary = _train_dictionary(self.codec_name, self._chunk_parts, self.dict_size)
+            if dictionary:
+                with open(self.dict_path, 'wb') as f:
+                    f.write(dictionary)
+
+        self._codec = _Codec(self.codec_name, dictionary, self.level)
+        header = {
+            "format": STORE_FORMAT,
+            "version": STORE_VERSION,
+            "codec": self.codec_name,
+            "dictionary": os.path.basename(self.dict_path) if dictionary else None,
+            "data_file": os.path.basename(self.data_path),
+            "chunk_records": self.chunk_records
+        }
+        self._meta_file.write(json.dumps(header) + "\n")
+
+    def _flush_chunk(self) -> None:
+        self._ensure_codec()
+
+        lines = []
+        if self._chunk_parts:
+            raw = b"".join(self._chunk_parts)
+            compressed = self._codec.compress(raw)
+            offset = self._data_file.tell()
+            self._data_file.write(compressed)
+            self._data_file.flush()
+            lines.append(json.dumps({"chunk": self._chunk_no, "offset": offset,
+                                     "length": len(compressed), "raw_length": len(raw)}) + "\n")
+            self._chunk_no += 1
+            self._chunk_parts = []
+            self._chunk_size = 0
+
+        lines.extend(json.dumps(meta, ensure_ascii=False) + "\n" for meta in self._pending_meta)
+        self._pending_meta = []
+        self._meta_file.writelines(lines)
+        self._meta_file.flush()
+
+    def close(self) -> None:
+        if not self._meta_file:
+            return
+        self._flush_chunk()
+        self._meta_file.close()
+        self._data_file.close()
+        self._meta_file = None
+        self._data_file = None
+
+    def __enter__(self) -> "RawCrawlStoreWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+class RawCrawlStore:
+    """紧凑存储读取器
+
+    元数据在打开时一次性读入（不含HTML）；get_html 按需解压HTML所在的块，并缓存最近一个块。
+    """
+
+    def __init__(self, meta_path: str):
+        self.meta_path = meta_path
+        self.base_path = store_base_path(meta_path)
+        self.directory = os.path.dirname(meta_path)
+        self.header: Dict[str, Any] = {}
+        self.records: List[Dict[str, Any]] = []
+        self.chunks: Dict[int, Tuple[int, int, int]] = {}
+        self._codec: Optional[_Codec] = None
+        self._data_file = None
+        self._cached_chunk: Tuple[Optional[int], bytes] = (None, b"")
+        self._load_metadata()
+
+    def _load_metadata(self) -> None:
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # 尾部半写入
+                if line_num == 0:
+                    if entry.get("format") != STORE_FORMAT:
+                        raise ValueError(f"不是紧凑存储元数据文件: {self.meta_path}")
+                    self.header = entry
+                elif "chunk" in entry and "raw_length" in entry:
+                    self.chunks[entry["chunk"]] = (entry["offset"], entry["length"], entry["raw_length"])
+                else:
+                    self.records.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _codec_instance(self) -> _Codec:
+        if self._codec is None:
+            dictionary = None
+            if self.header.get("dictionary"):
+                with open(os.path.join(self.directory, self.header["dictionary"]), 'rb') as f:
+                    dictionary = f.read()
+            self._codec = _Codec(self.header.get("codec", "zlib"), dictionary)
+        return self._codec
+
+    def _read_chunk(self, chunk_no: int) -> bytes:
+        if self._cached_chunk[0] == chunk_no:
+            return self._cached_chunk[1]
+
+        offset, length, raw_length = self.chunks[chunk_no]
+        if self._data_file is None:
+            self._data_file = open(os.path.join(self.directory, self.header["data_file"]), 'rb')
+        self._data_file.seek(offset)
+        raw = self._codec_instance().decompress(self._data_file.read(length), raw_length)
+        self._cached_chunk = (chunk_no, raw)
+        return raw
+
+    def get_html(self, html_ref: Optional[List[int]]) -> Optional[str]:
+        """按 html_ref 读取HTML"""
+        if not html_ref:
+            return None
+        chunk_no, start, length = html_ref
+        return self._read_chunk(chunk_no)[start:start + length].decode('utf-8')
+
+    def iter_metadata(self) -> Iterator[Dict[str, Any]]:
+        """逐条产出元数据（不含HTML，不解压）"""
+        return iter(self.records)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """逐条产出与原始JSONL相同结构的完整记录（按块顺序解压）"""
+        for meta in self.records:
+            record = {key: value for key, value in meta.items() if key != "html_ref"}
+            if meta.get("html_ref"):
+                record["html"] = self.get_html(meta["html_ref"])
+            yield record
+
+    def close(self) -> None:
+        if self._data_file:
+            self._data_file.close()
+            self._data_file = None
+        self._cached_chunk = (None, b"")
+
+    def __enter__(self) -> "RawCrawlStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def compact_raw_jsonl(jsonl_path: str, base_path: Optional[str] = None, remove_source: bool = False,
+                      **writer_options) -> Dict[str, Any]:
+    """把原始JSONL（可为gzip）转换为紧凑存储，返回转换统计
+
+    Args:
+        jsonl_path: 原始JSONL路径
+        base_path: 存储基础路径，默认与原始文件同名
+        remove_source: 转换成功后是否删除原始JSONL及其索引文件
+        writer_options: 透传给 RawCrawlStoreWriter（codec、chunk_records 等）
+    """
+    base_path = base_path or store_base_path(jsonl_path)
+    with RawCrawlStoreWriter(base_path, **writer_options) as writer:
+        with open_raw_jsonl(jsonl_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    writer.write(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    source_size = os.path.getsize(jsonl_path)
+    store_size = sum(os.path.getsize(path) for path in (writer.meta_path, writer.data_path, writer.dict_path)
+                     if os.path.exists(path))
+
+    if remove_source:
+        for path in (jsonl_path, jsonl_path + '.idx'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {
+        "meta_path": writer.meta_path,
+        "records": writer.records_written,
+        "duplicate_html": writer.duplicate_html,
+        "codec": writer.codec_name,
+        "source_bytes": source_size,
+        "store_bytes": store_size
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="把原始爬取JSONL转换为紧凑存储")
+    parser.add_argument("files", nargs="+", help="原始JSONL文件")
+    parser.add_argument("--codec", default="auto", choices=["auto", "zstd", "zlib"])
+    parser.add_argument("--chunk-records", type=int, default=32)
+    parser.add_argument("--remove-source", action="store_true", help="转换后删除原始JSONL")
+    args = parser.parse_args()
+
+    for path in args.files:
+        result = compact_raw_jsonl(path, remove_source=args.remove_source,
+                                   codec=args.codec, chunk_records=args.chunk_records)
+        ratio = result["store_bytes"] / result["source_bytes"] if result["source_bytes"] else 0
+        print(f"✅ {path} -> {result['meta_path']}: {result['records']} 条记录，"
+              f"{result['source_bytes'] / 1024:.0f}KB -> {result['store_bytes'] / 1024:.0f}KB ({ratio:.1%})")
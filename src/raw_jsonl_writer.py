@@ -0,0 +1,294 @@
+"""
+原始爬取数据写入器
+保持一个打开的文件句柄，按条数/字节数/时间批量落盘，检查点时fsync，
+可选gzip压缩，并在旁路索引文件中记录每条记录的字节偏移，支持断点续写。
+
+索引文件（<数据文件>.idx）为JSONL，两类行：
+- {"offset": 0, "length": 1234}    每条记录在（解压后）数据流中的偏移和长度
+- {"commit": 56789, "records": 20}  一次落盘完成后数据文件的大小和累计记录数
+
+续写时从最后一个不超过实际文件大小的 commit 开始（没有索引时从文件开头）扫描数据文件，
+其后完整的记录重新加入索引，只截断半写入的尾部数据。
+"""
+import gzip
+import io
+import json
+import os
+import re
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+class RawJsonlWriter:
+    """缓冲、可断点续写的原始JSONL写入器
+
+    写入是同步的内存缓冲操作，多个并发协程可以直接调用 write()；
+    真正的磁盘IO只发生在 flush()/checkpoint() 时。
+    """
+
+    def __init__(self, path: str, flush_every: int = 20, flush_bytes: int = 1024 * 1024,
+                 flush_interval: float = 5.0, compress: bool = False, resume: bool = False):
+        """
+        Args:
+            path: 数据文件路径，compress=True 时自动补 .gz 后缀
+            flush_every: 缓冲多少条记录后落盘
+            flush_bytes: 缓冲多少字节后落盘
+            flush_interval: 距离上次落盘超过多少秒后，下一次写入触发落盘
+            compress: 是否gzip压缩（每次落盘写一个独立的gzip member）
+            resume: 文件已存在时是否截断到最后一次完整落盘并继续追加
+        """
+        if compress and not path.endswith('.gz'):
+            path += '.gz'
+
+        self.path = path
+        self.index_path = path + '.idx'
+        self.flush_every = flush_every
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.compress = compress
+        self.resume = resume
+
+        self._file = None
+        self._index_file = None
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._stream_offset = 0      # 解压后数据流中的下一个偏移
+        self._last_flush = time.monotonic()
+        self.records_written = 0
+        # 最近一条 write() 的记录在（解压后）数据流中的 (偏移, 长度)，可用于之后按位置读回
+        self.last_location: Optional[Tuple[int, int]] = None
+
+    def open(self) -> "RawJsonlWriter":
+        """打开数据文件和索引文件"""
+        if self._file:
+            return self
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self.resume and os.path.exists(self.path):
+            self._recover()
+        else:
+            # 新文件：清空可能残留的旧索引
+            open(self.path, 'wb').close()
+            open(self.index_path, 'w').close()
+
+        self._file = open(self.path, 'ab')
+        self._index_file = open(self.index_path, 'a', encoding='utf-8')
+        self._last_flush = time.monotonic()
+        return self
+
+    def _recover(self):
+        """从索引恢复到最后一次完整落盘，再扫描其后的完整记录补齐索引，截断半写入的尾部"""
+        actual_size = os.path.getsize(self.path)
+        kept_lines = []
+        pending_lines = []
+        commit_size = 0
+        records = 0
+        stream_offset = 0
+        pending_offset = 0
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # 索引尾部半写入
+
+                    if "commit" in entry:
+                        if entry["commit"] > actual_size:
+                            break
+                        kept_lines.extend(pending_lines)
+                        kept_lines.append(line)
+                        pending_lines = []
+                        commit_size = entry["commit"]
+                        records = entry["records"]
+                        stream_offset = pending_offset
+                    else:
+                        pending_lines.append(line)
+                        pending_offset = entry["offset"] + entry["length"]
+
+        # 索引缺失、为空或落后于数据文件时（如崩溃发生在写索引之前），最后一个commit之后的完整记录重新建立索引
+        scanned = 0
+        for end, lengths in self._scan_records(commit_size):
+            for length in lengths:
+                kept_lines.append(json.dumps({"offset": stream_offset, "length": length}) + "\n")
+                stream_offset += length
+            scanned += len(lengths)
+            commit_size = end
+        if scanned:
+            records += scanned
+            kept_lines.append(json.dumps({"commit": commit_size, "records": records}) + "\n")
+
+        with open(self.path, 'r+b') as f:
+            f.truncate(commit_size)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            f.writelines(kept_lines)
+
+        self.records_written = records
+        self._stream_offset = stream_offset
+
+        dropped_bytes = actual_size - commit_size
+        print(f"♻️  续写原始数据: {self.path} (已有 {records} 条记录"
+              + (f"，重建 {scanned} 条索引" if scanned else "")
+              + (f"，丢弃 {dropped_bytes} 字节未完成数据)" if dropped_bytes else ")"))
+
+    def _scan_records(self, start: int) -> Iterator[Tuple[int, List[int]]]:
+        """从文件偏移 start 开始扫描完整的记录，逐段返回 (该段结束处的文件偏移, 各记录长度)
+
+        未压缩文件每条完整的JSON行为一段；gzip文件每个完整的member为一段（一次落盘）。
+        遇到不完整或无法解析的数据时停止。
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            if not self.compress:
+                end = start
+                for line in f:
+                    try:
+                        json.loads(line)
+                    except ValueError:
+                        return
+                    if not line.endswith(b"\n"):
+                        return
+                    end += len(line)
+                    yield end, [len(line)]
+                return
+
+            decompressor = zlib.decompressobj(31)
+            chunks = []
+            consumed = start
+            while True:
+                data = f.read(1024 * 1024)
+                if not data:
+                    return
+                while data:
+                    try:
+                        chunks.append(decompressor.decompress(data))
+                    except zlib.error:
+                        return
+                    consumed += len(data)
+                    if not decompressor.eof:
+                        break
+                    # 一个member结束，剩余数据属于下一个member
+                    data = decompressor.unused_data
+                    consumed -= len(data)
+                    lengths = []
+                    for line in io.BytesIO(b"".join(chunks)):
+                        if not line.endswith(b"\n"):
+                            return
+                        lengths.append(len(line))
+                    yield consumed, lengths
+                    chunks = []
+                    decompressor = zlib.decompressobj(31)
+
+    def write(self, record: Dict[str, Any]) -> int:
+        """缓冲一条记录，返回其记录序号（从0开始）"""
+        if not self._file:
+            self.open()
+
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        self.last_location = (self._stream_offset + self._buffered_bytes, len(data))
+        self._buffer.append(data)
+        self._buffered_bytes += len(data)
+        record_no = self.records_written + len(self._buffer) - 1
+
+        if (len(self._buffer) >= self.flush_every
+                or self._buffered_bytes >= self.flush_bytes
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+        return record_no
+
+    def flush(self) -> None:
+        """把缓冲写入数据文件（不fsync），并记录索引和commit点"""
+        self._last_flush = time.monotonic()
+        if not self._buffer or not self._file:
+            return
+
+        payload = b"".join(self._buffer)
+        if self.compress:
+            # 每次落盘写一个完整的gzip member，文件在任意commit点都是合法gzip
+            self._file.write(gzip.compress(payload))
+        else:
+            self._file.write(payload)
+        self._file.flush()
+
+        index_lines = []
+        for data in self._buffer:
+            index_lines.append(json.dumps({"offset": self._stream_offset, "length": len(data)}) + "\n")
+            self._stream_offset += len(data)
+
+        self.records_written += len(self._buffer)
+        index_lines.append(json.dumps({"commit": self._file.tell(), "records": self.records_written}) + "\n")
+        self._index_file.writelines(index_lines)
+        self._index_file.flush()
+
+        self._buffer = []
+        self._buffered_bytes = 0
+
+    def checkpoint(self) -> None:
+        """落盘并fsync数据文件和索引，保证崩溃后能恢复到此处"""
+        self.flush()
+        if self._file:
+            os.fsync(self._file.fileno())
+            os.fsync(self._index_file.fileno())
+
+    def close(self) -> None:
+        """检查点后关闭文件"""
+        if not self._file:
+            return
+        self.checkpoint()
+        self._file.close()
+        self._index_file.close()
+        self._file = None
+        self._index_file = None
+
+    def __enter__(self) -> "RawJsonlWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def new_raw_file_path(backend: str, keyword: str, city: str, data_dir: str = "data") -> str:
+    """新的原始数据文件路径，如 data/raw_boss_http_20250101_120000_123_算法工程师_101010100_1a2b3c4d.jsonl
+
+    时间戳放在最前面（回放按文件名中的时间排序），再加毫秒、关键词/城市和随机后缀，
+    同一秒内启动的多个爬取任务不会写到同一个文件（open() 会截断已有文件）。
+    """
+    now = datetime.now()
+    slug = re.sub(r'[^\w]+', '-', f"{keyword}_{city}").strip('-')[:40]
+    name = f"raw_boss_{backend}_{now:%Y%m%d_%H%M%S}_{now.microsecond // 1000:03d}_{slug}_{uuid.uuid4().hex[:8]}.jsonl"
+    return os.path.join(data_dir, name)
+
+def open_raw_jsonl(path: str, mode: str = 'rt'):
+    """打开原始JSONL数据文件，自动处理gzip压缩"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8' if 't' in mode else None)
+    if 't' in mode:
+        return open(path, mode, encoding='utf-8')
+    return open(path, mode)
+
+def read_record_index(path: str) -> List[Tuple[int, int]]:
+    """读取数据文件的记录索引，返回已提交记录的 (偏移, 长度) 列表；没有索引时返回空列表"""
+    index_path = path + '.idx'
+    if not os.path.exists(index_path):
+        return []
+
+    committed: List[Tuple[int, int]] = []
+    pending: List[Tuple[int, int]] = []
+    with open(index_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if "commit" in entry:
+                committed.extend(pending)
+                pending = []
+            else:
+                pending.append((entry["offset"], entry["length"]))
+    return committed
@@ -0,0 +1,138 @@
+"""
+多文件回放加载
+--skip-crawl 回放时按通配符和日期范围选取多个原始/去重数据文件，在进程池中并行解析，
+合并时按岗位ID去重（同一岗位保留最新文件中的记录），用于历史回填和跨多周爬取的重新评分。
+原始数据文件按 LazyJobRecord 加载，进程间只传递元数据和HTML位置。
+"""
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.job_identity import extract_job_id
+from src.lazy_job_record import load_lazy_records
+from src.raw_crawl_store import is_raw_store
+
+DEFAULT_REPLAY_PATTERNS = [
+    "data/raw_boss_*.jsonl",
+    "data/raw_boss_*.jsonl.gz",
+    "data/raw_boss_*.meta.jsonl",
+    "data/deduplicated_jobs_*.json",
+]
+
+# 文件名中的爬取时间，如 raw_boss_playwright_20250101_120000.jsonl
+_FILE_TIMESTAMP_PATTERN = re.compile(r'(\d{8})_(\d{6})')
+
+def file_timestamp(path: str) -> datetime:
+    """数据文件的时间：优先取文件名中的时间戳，否则用修改时间"""
+    match = _FILE_TIMESTAMP_PATTERN.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H%M%S")
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(path))
+
+def _parse_date(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.strptime(value, "%Y-%m-%d")
+    return parsed.replace(hour=23, minute=59, second=59) if end_of_day else parsed
+
+def resolve_replay_files(patterns: Optional[List[str]] = None, since: Optional[str] = None,
+                         until: Optional[str] = None) -> List[str]:
+    """展开通配符并按日期范围（YYYY-MM-DD，含两端）过滤，按时间从旧到新返回
+
+    原始JSONL已转换为紧凑存储时（同名 .meta.jsonl 存在），只保留紧凑存储。
+    """
+    since_dt = _parse_date(since)
+    until_dt = _parse_date(until, end_of_day=True)
+
+    files = set()
+    for pattern in patterns or DEFAULT_REPLAY_PATTERNS:
+        files.update(glob.glob(pattern))
+
+    # .meta.jsonl 也匹配 *.jsonl；索引、检查点等旁路文件不是数据文件
+    files = {path for path in files if path.endswith(('.jsonl', '.jsonl.gz', '.json'))
+             and not path.endswith('.checkpoint.json')}
+    compacted = {path[:-len('.meta.jsonl')] for path in files if is_raw_store(path)}
+    files = {path for path in files if is_raw_store(path)
+             or re.sub(r'\.jsonl(\.gz)?$', '', path) not in compacted}
+
+    selected = []
+    for path in files:
+        timestamp = file_timestamp(path)
+        if (since_dt and timestamp < since_dt) or (until_dt and timestamp > until_dt):
+            continue
+        selected.append((timestamp, path))
+
+    return [path for _, path in sorted(selected)]
+
+def load_data_file(path: str) -> List[Dict[str, Any]]:
+    """解析单个数据文件（进程池中执行）：原始数据延迟加载HTML，JSON文件读取岗位数组"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError("JSON文件应包含岗位数组")
+        return data
+    return load_lazy_records(path)
+
+def _job_key(record: Dict[str, Any]) -> Optional[str]:
+    return extract_job_id(record.get("url") or record.get("岗位链接") or "")
+
+def load_replay_files(paths: List[str], max_workers: Optional[int] = None,
+                      dedup: bool = True) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """并行加载多个数据文件并合并
+
+    Args:
+        paths: 数据文件列表（按时间从旧到新）
+        max_workers: 进程数，None为CPU核数；只有一个文件时不启动进程池
+        dedup: 是否按岗位ID去重，同一岗位保留最新文件中的记录
+
+    Returns:
+        (合并后的记录, 统计信息)
+    """
+    stats = {"files": len(paths), "failed_files": {}, "records_read": 0, "id_duplicates": 0, "per_file": {}}
+    loaded: Dict[str, List[Dict[str, Any]]] = {}
+
+    if len(paths) <= 1 or max_workers == 1:
+        for path in paths:
+            try:
+                loaded[path] = load_data_file(path)
+            except Exception as e:
+                stats["failed_files"][path] = str(e)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {path: executor.submit(load_data_file, path) for path in paths}
+            for path, future in futures.items():
+                try:
+                    loaded[path] = future.result()
+                except Exception as e:
+                    stats["failed_files"][path] = str(e)
+
+    # 从最新文件往前合并，先出现的岗位ID即为最新记录
+    seen_ids = set()
+    merged_by_file: Dict[str, List[Dict[str, Any]]] = {}
+    for path in reversed(paths):
+        records = loaded.get(path, [])
+        stats["records_read"] += len(records)
+        kept = []
+        for record in records:
+            job_key = _job_key(record) if dedup else None
+            if job_key:
+                if job_key in seen_ids:
+                    stats["id_duplicates"] += 1
+                    continue
+                seen_ids.add(job_key)
+            kept.append(record)
+        merged_by_file[path] = kept
+        stats["per_file"][os.path.basename(path)] = {"read": len(records), "kept": len(kept)}
+
+    # 输出仍按时间从旧到新
+    merged = [record for path in paths for record in merged_by_file.get(path, [])]
+    stats["records_kept"] = len(merged)
+    return merged, stats
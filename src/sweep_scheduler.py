@@ -0,0 +1,133 @@
+"""
+多查询扫描调度
+把 search.keywords × search.cities 展开为爬取任务，按历史产出（每次运行的新岗位数）排序，
+优先跑产出高的组合；从未跑过的组合排在最前面，保证每个组合至少被探索一次。
+运行结果写回 data/sweep_history.json，并给出每个组合的吞吐统计。
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_HISTORY_PATH = "data/sweep_history.json"
+
+class SweepScheduler:
+    """关键词 × 城市 组合的调度器"""
+
+    def __init__(self, keywords: List[str], cities: List[str],
+                 history_path: str = DEFAULT_HISTORY_PATH, smoothing: float = 0.5):
+        """
+        Args:
+            keywords: 搜索关键词列表
+            cities: 城市代码列表
+            history_path: 历史产出文件
+            smoothing: 历史产出的指数平滑系数，越大越看重最近一次运行
+        """
+        self.keywords = list(dict.fromkeys(keywords))
+        self.cities = list(dict.fromkeys(cities))
+        self.history_path = history_path
+        self.smoothing = smoothing
+        self.history: Dict[str, Dict[str, Any]] = self._load_history()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SweepScheduler"]:
+        """按 search 配置构建调度器；没有配置 keywords/cities 列表时返回None（使用单一默认查询）"""
+        search_config = config.get("search", {})
+        keywords = search_config.get("keywords") or []
+        cities = search_config.get("cities") or []
+        if not keywords and not cities:
+            return None
+
+        sweep_config = search_config.get("sweep", {}) or {}
+        return cls(
+            keywords or [search_config.get("default_keyword", "大模型 算法")],
+            cities or [search_config.get("default_city", "101010100")],
+            history_path=sweep_config.get("history_file", DEFAULT_HISTORY_PATH),
+            smoothing=sweep_config.get("smoothing", 0.5)
+        )
+
+    @staticmethod
+    def _combo_key(keyword: str, city: str) -> str:
+        return f"{keyword}|{city}"
+
+    def _load_history(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.history_path):
+            return {}
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("combinations", {})
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️  扫描历史无法读取 {self.history_path}: {e}")
+            return {}
+
+    def expected_yield(self, keyword: str, city: str) -> Optional[float]:
+        """组合的历史平均产出（每次运行的新岗位数），没有历史时返回None"""
+        entry = self.history.get(self._combo_key(keyword, city))
+        return entry.get("jobs_avg") if entry else None
+
+    def plan(self) -> List[Tuple[str, str]]:
+        """返回按优先级排序的 (关键词, 城市) 列表"""
+        combos = [(keyword, city) for keyword in self.keywords for city in self.cities]
+
+        def _priority(combo: Tuple[str, str]):
+            expected = self.expected_yield(*combo)
+            # 未跑过的组合优先探索，其余按历史产出从高到低
+            return (0, 0.0) if expected is None else (1, -expected)
+
+        return sorted(combos, key=_priority)
+
+    def record(self, task_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """记录一轮扫描结果并返回每个组合的吞吐统计
+
+        task_results 为爬取任务结果（含 keyword、city、jobs、status、seconds），
+        同一组合的多个平台结果会合并。超时/失败的任务也计入，产出按实际获取的岗位数计。
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for result in task_results:
+            key = self._combo_key(result.get("keyword"), result.get("city"))
+            combo = merged.setdefault(key, {
+                "keyword": result.get("keyword"),
+                "city": result.get("city"),
+                "jobs": 0,
+                "seconds": 0.0,
+                "statuses": []
+            })
+            combo["jobs"] += result.get("jobs", 0)
+            combo["seconds"] += result.get("seconds", 0.0)
+            combo["statuses"].append(result.get("status"))
+
+        report = []
+        now = datetime.now().isoformat()
+        for key, combo in merged.items():
+            entry = self.history.setdefault(key, {"runs": 0})
+            if entry["runs"]:
+                entry["jobs_avg"] += self.smoothing * (combo["jobs"] - entry["jobs_avg"])
+                entry["seconds_avg"] += self.smoothing * (combo["seconds"] - entry["seconds_avg"])
+            else:
+                entry["jobs_avg"] = float(combo["jobs"])
+                entry["seconds_avg"] = combo["seconds"]
+            entry["runs"] += 1
+            entry["last_jobs"] = combo["jobs"]
+            entry["last_run"] = now
+
+            minutes = combo["seconds"] / 60
+            report.append({
+                **combo,
+                "jobs_per_minute": round(combo["jobs"] / minutes, 2) if minutes else 0.0,
+                "expected_jobs": round(entry["jobs_avg"], 2)
+            })
+
+        report.sort(key=lambda item: item["jobs_per_minute"], reverse=True)
+        return report
+
+    def save(self) -> None:
+        """原子写入扫描历史"""
+        directory = os.path.dirname(self.history_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.history_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"combinations": self.history, "updated_at": datetime.now().isoformat()},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.history_path)
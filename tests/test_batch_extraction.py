@@ -0,0 +1,99 @@
+"""多岗位合并提取：返回解析、部分失败只重试失败岗位、整批失败改为逐个提取"""
+import asyncio
+import json
+import re
+
+import pytest
+
+pytest.importorskip("bs4")
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+from src import enhanced_extractor as ee
+
+def test_parse_batch_response_ignores_bad_entries():
+    content = '结果如下：[{"编号": 0, "公司名称": "A"}, {"编号": "1", "公司名称": "B"}, ' \
+              '{"编号": 0, "公司名称": "重复"}, {"编号": 9}, {"公司名称": "无编号"}, "x"]'
+    parsed = ee._parse_batch_response(content, 3)
+    assert sorted(parsed) == [0, 1]
+    assert parsed[0]["公司名称"] == "A"
+
+def test_parse_batch_response_truncated_array():
+    assert ee._parse_batch_response('[{"编号": 0, "公司名称": "A"}, {"编号": 1, "公司', 2) == {}
+
+class _FakeLLM:
+    """按提示词中的公司编号作答；drop 中的公司在批量请求里不返回，garbage 为True时批量请求返回截断的数组"""
+
+    def __init__(self, drop=(), garbage=False):
+        self.drop = set(drop)
+        self.garbage = garbage
+        self.requests = []
+
+    def __call__(self, request):
+        prompt = json.loads(request.content)["messages"][0]["content"]
+        if "### 岗位" in prompt:
+            companies = re.findall(r'### 岗位 (\d+)\n公司(C\d+)', prompt)
+            self.requests.append(("batch", [c for _, c in companies]))
+            if self.garbage:
+                content = '[{"编号": 0, "公司名称": "C'
+            else:
+                content = json.dumps([{"编号": int(i), "公司名称": c, "岗位描述": "d"}
+                                      for i, c in companies if c not in self.drop], ensure_ascii=False)
+        else:
+            company = re.search(r'公司(C\d+)', prompt).group(1)
+            self.requests.append(("single", company))
+            content = json.dumps({"公司名称": company, "岗位描述": "d"}, ensure_ascii=False)
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}, "finish_reason": "stop"}]})
+
+def _run(tmp_path, monkeypatch, fake, size=4):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+    extractor = ee.EnhancedNotionExtractor(provider="deepseek", config={"llm": {
+        "cache": {"path": str(tmp_path / "llm.sqlite")},
+        "result_cache": {"enabled": False}
+    }})
+    monkeypatch.setitem(ee._llm_clients, (extractor.provider, extractor.base_url),
+                        httpx.AsyncClient(transport=httpx.MockTransport(fake)))
+    items = [(f"https://www.zhipin.com/job_detail/{i}.html", {"岗位名称": f"岗位{i}"}, f"公司C{i}\n负责训练", None)
+             for i in range(size)]
+    return asyncio.run(extractor.complete_extraction_batch(items))
+
+def test_partial_failure_retries_only_missing_jobs(tmp_path, monkeypatch):
+    fake = _FakeLLM(drop={"C1", "C3"})
+    results = _run(tmp_path, monkeypatch, fake)
+    assert [r["公司名称"] for r in results] == ["C0", "C1", "C2", "C3"]
+    # 第一次整批，第二次只重试C1、C3（仍缺失），最后逐个提取
+    assert fake.requests[0] == ("batch", ["C0", "C1", "C2", "C3"])
+    assert fake.requests[1] == ("batch", ["C1", "C3"])
+    assert sorted(fake.requests[2:]) == [("single", "C1"), ("single", "C3")]
+
+def test_unparseable_batch_falls_back_to_single_requests(tmp_path, monkeypatch):
+    fake = _FakeLLM(garbage=True)
+    results = _run(tmp_path, monkeypatch, fake, size=3)
+    assert [r["公司名称"] for r in results] == ["C0", "C1", "C2"]
+    assert [kind for kind, _ in fake.requests] == ["batch", "single", "single", "single"]
+
+def test_batch_max_tokens_is_capped_and_oversized_batches_split(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+    requested = []
+    fake = _FakeLLM()
+
+    def handler(request):
+        requested.append(json.loads(request.content)["max_tokens"])
+        return fake(request)
+
+    extractor = ee.EnhancedNotionExtractor(provider="deepseek", config={"llm": {
+        "max_tokens": 1000, "max_output_tokens": 2500,
+        "cache": {"path": str(tmp_path / "llm.sqlite")},
+        "result_cache": {"enabled": False}
+    }})
+    monkeypatch.setitem(ee._llm_clients, (extractor.provider, extractor.base_url),
+                        httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    items = [(f"https://www.zhipin.com/job_detail/{i}.html", {"岗位名称": f"岗位{i}"}, f"公司C{i}\n负责训练", None)
+             for i in range(5)]
+
+    results = asyncio.run(extractor.complete_extraction_batch(items))
+
+    assert extractor.max_batch_size == 2
+    assert [r["公司名称"] for r in results] == ["C0", "C1", "C2", "C3", "C4"]
+    assert fake.requests == [("batch", ["C0", "C1"]), ("batch", ["C2", "C3"]), ("single", "C4")]
+    assert max(requested) <= 2500
@@ -0,0 +1,50 @@
+"""断点续爬检查点：保存/加载、从原始数据补齐已抓取岗位、按后端查找未完成的爬取"""
+import json
+import os
+
+from src.crawl_checkpoint import CrawlCheckpoint
+from src.raw_jsonl_writer import new_raw_file_path
+
+def _start(tmp_path, backend, keyword="算法", city="101010100"):
+    raw_file = new_raw_file_path(backend, keyword, city, str(tmp_path))
+    open(raw_file, "w").close()
+    checkpoint = CrawlCheckpoint(raw_file, keyword, city)
+    checkpoint.save()
+    return checkpoint
+
+def test_round_trip_and_resume_state(tmp_path):
+    checkpoint = _start(tmp_path, "http")
+    checkpoint.mark_page_done("算法", "101010100", 1)
+    checkpoint.mark_job_fetched("https://www.zhipin.com/job_detail/aaa.html")
+    checkpoint.save()
+    # 保存检查点之后又写入了一条记录
+    with open(checkpoint.raw_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"url": "https://www.zhipin.com/job_detail/bbb.html"}) + "\n")
+
+    resumed = CrawlCheckpoint.find_resumable("算法", "101010100", "http", str(tmp_path))
+    assert resumed.raw_file == checkpoint.raw_file
+    assert resumed.is_page_done("算法", "101010100", 1)
+    assert not resumed.is_page_done("算法", "101010100", 2)
+    assert resumed.load_fetched_from_raw_file() == 1
+    assert resumed.is_job_fetched("https://www.zhipin.com/job_detail/aaa.html")
+    assert resumed.is_job_fetched("https://www.zhipin.com/job_detail/bbb.html?from=search")
+
+def test_resume_is_scoped_by_backend(tmp_path):
+    playwright = _start(tmp_path, "playwright")
+    assert CrawlCheckpoint.find_resumable("算法", "101010100", "http", str(tmp_path)) is None
+    assert CrawlCheckpoint.find_resumable("算法", "101010100", "playwright", str(tmp_path)).raw_file == playwright.raw_file
+
+def test_finished_or_other_query_is_not_resumed(tmp_path):
+    checkpoint = _start(tmp_path, "http")
+    assert CrawlCheckpoint.find_resumable("算法", "101020100", "http", str(tmp_path)) is None
+    checkpoint.finished = True
+    checkpoint.save()
+    assert CrawlCheckpoint.find_resumable("算法", "101010100", "http", str(tmp_path)) is None
+
+def test_corrupt_checkpoint_is_ignored(tmp_path):
+    checkpoint = _start(tmp_path, "http")
+    with open(checkpoint.path, "w") as f:
+        f.write("{not json")
+    assert CrawlCheckpoint.load(checkpoint.path) is None
+    assert CrawlCheckpoint.find_resumable("算法", "101010100", "http", str(tmp_path)) is None
+    assert os.path.exists(checkpoint.raw_file)
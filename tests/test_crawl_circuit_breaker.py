@@ -0,0 +1,42 @@
+"""反爬虫熔断器：阈值熔断、指数冷却、半开试探、熔断次数上限"""
+import pytest
+
+from src.crawl_circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitOpenError, CrawlCircuitBreaker
+
+def test_opens_after_consecutive_challenges():
+    breaker = CrawlCircuitBreaker(failure_threshold=3, base_cooldown=60)
+    assert not breaker.record_challenge()
+    breaker.record_success()
+    assert not breaker.record_challenge()
+    assert not breaker.record_challenge()
+    assert breaker.state == CLOSED
+    assert breaker.record_challenge()
+    assert breaker.state == OPEN and breaker.trips == 1
+    assert 0 < breaker.cooldown_remaining() <= 60
+
+def test_half_open_recovers_or_reopens_with_longer_cooldown():
+    breaker = CrawlCircuitBreaker(failure_threshold=1, base_cooldown=10, max_cooldown=25)
+    breaker.record_challenge()
+    breaker.half_open()
+    assert breaker.state == HALF_OPEN and breaker.cooldown_remaining() == 0
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    breaker.record_challenge()
+    assert breaker.cooldown == 20
+    breaker.half_open()
+    # 半开状态下一次验证页面立即重新熔断，冷却时间不超过上限
+    assert breaker.record_challenge()
+    assert breaker.trips == 3 and breaker.cooldown == 25
+
+def test_check_raises_after_max_trips():
+    breaker = CrawlCircuitBreaker(failure_threshold=1, max_trips=2)
+    for _ in range(2):
+        breaker.record_challenge()
+        breaker.half_open()
+    breaker.check()
+    breaker.record_challenge()
+    assert breaker.exhausted
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.stats()["trips"] == 3
@@ -0,0 +1,105 @@
+"""两个后端共用的爬取主循环：逐页抓取、跳过已知岗位、续爬时重新产出已保存的记录"""
+import asyncio
+
+import pytest
+
+from src.crawl_loop import iter_crawl_jobs
+from src.known_job_index import KnownJobIndex
+from src.lazy_job_record import LazyJobRecord, close_lazy_sources
+
+def _job(job_id):
+    return {"job_name": f"岗位{job_id}", "company_name": "公司",
+            "url": f"https://www.zhipin.com/job_detail/{job_id}.html"}
+
+class _FakeBackend:
+    def __init__(self, pages, failing=()):
+        self.pages = pages
+        self.failing = set(failing)
+        self.list_calls = []
+        self.detail_calls = []
+
+    async def fetch_job_list(self, page_num):
+        self.list_calls.append(page_num)
+        jobs = self.pages.get(page_num, [])
+        return list(jobs), page_num < max(self.pages)
+
+    async def fetch_details_in_order(self, urls):
+        self.detail_calls.extend(urls)
+        for i, url in enumerate(urls):
+            yield i, None if url in self.failing else f"<div class='job-detail'>{url}</div>"
+
+def _crawl(backend, tmp_path, **kwargs):
+    async def run():
+        return [record async for record in iter_crawl_jobs(
+            "http", "测试", "算法", "101010100",
+            backend.fetch_job_list, backend.fetch_details_in_order,
+            data_dir=str(tmp_path), **kwargs
+        )]
+    return asyncio.run(run())
+
+def test_pages_are_crawled_until_the_last_page(tmp_path):
+    backend = _FakeBackend({1: [_job("a"), _job("b")], 2: [_job("c")]},
+                           failing={_job("b")["url"]})
+
+    records = _crawl(backend, tmp_path, max_pages=5)
+
+    assert [record["url"] for record in records] == [_job("a")["url"], _job("c")["url"]]
+    assert records[0]["source"] == "测试" and records[0]["api_data"]["job_name"] == "岗位a"
+    assert backend.list_calls == [1, 2]
+
+def test_known_jobs_are_skipped_and_stop_paging(tmp_path):
+    known = KnownJobIndex()
+    known.add(_job("b")["url"])
+    known.add(_job("c")["url"])
+    backend = _FakeBackend({1: [_job("a"), _job("b")], 2: [_job("c")], 3: [_job("d")]})
+
+    records = _crawl(backend, tmp_path, max_pages=3, known_jobs=known, stop_on_known_page=True)
+
+    assert [record["url"] for record in records] == [_job("a")["url"]]
+    assert backend.detail_calls == [_job("a")["url"]]
+    assert backend.list_calls == [1, 2]
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_records_reload_html_from_the_raw_file(tmp_path, compress):
+    backend = _FakeBackend({1: [_job("a"), _job("b")], 2: [_job("c")]})
+
+    records = _crawl(backend, tmp_path, max_pages=2, raw_output={"compress": compress, "flush_every": 2})
+
+    assert all(isinstance(record, LazyJobRecord) for record in records)
+    # 只保留位置的记录从磁盘读回爬取时的HTML
+    refs = [record.derive({"url": record["url"]}) for record in records]
+    try:
+        assert [ref["html"] for ref in refs] == [record["html"] for record in records]
+        assert not any(dict.__contains__(ref, "html") for ref in refs)
+    finally:
+        close_lazy_sources()
+
+def test_records_without_raw_file_when_compaction_removes_it(tmp_path):
+    backend = _FakeBackend({1: [_job("a")]})
+
+    records = _crawl(backend, tmp_path, max_pages=1,
+                     raw_store={"enabled": True, "remove_source": True, "codec": "zlib"})
+
+    assert records and not any(isinstance(record, LazyJobRecord) for record in records)
+
+class _InterruptedBackend(_FakeBackend):
+    async def fetch_job_list(self, page_num):
+        if page_num == 2:
+            raise RuntimeError("爬取中断")
+        return await super().fetch_job_list(page_num)
+
+def test_resume_reyields_saved_records_and_skips_done_pages(tmp_path):
+    pages = {1: [_job("a"), _job("b")], 2: [_job("c")]}
+    with pytest.raises(RuntimeError):
+        _crawl(_InterruptedBackend(pages, failing={_job("b")["url"]}), tmp_path, max_pages=2)
+
+    # 第1页已完成：续爬先重新产出已保存的记录，再只抓第2页
+    backend = _FakeBackend(pages)
+    records = _crawl(backend, tmp_path, max_pages=2, resume=True)
+
+    assert [record["url"] for record in records] == [_job("a")["url"], _job("c")["url"]]
+    assert backend.list_calls == [2]
+    try:
+        assert records[0].derive({})["html"] == records[0]["html"]
+    finally:
+        close_lazy_sources()
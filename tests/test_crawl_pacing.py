@@ -0,0 +1,50 @@
+"""AIMD节奏控制：加性提速、乘性降速、上下限，以及按host间隔请求"""
+import asyncio
+import time
+
+import pytest
+
+from src.crawl_pacing import AdaptivePacer
+
+def test_additive_increase_multiplicative_decrease():
+    pacer = AdaptivePacer(initial_interval=2.0, min_interval=0.5, max_interval=10.0, step=0.5,
+                          backoff=2.0, error_backoff=1.5)
+    pacer.record_success(latency=0.1)
+    assert pacer.interval == 1.5
+    pacer.record_challenge()
+    assert pacer.interval == 3.0
+    pacer.record_error()
+    assert pacer.interval == 4.5
+    assert pacer.stats()["successes"] == 1 and pacer.stats()["challenges"] == 1 and pacer.stats()["errors"] == 1
+
+def test_interval_is_clamped():
+    pacer = AdaptivePacer(initial_interval=1.0, min_interval=0.5, max_interval=4.0, step=1.0)
+    for _ in range(5):
+        pacer.record_success()
+    assert pacer.interval == 0.5
+    for _ in range(5):
+        pacer.record_challenge()
+    assert pacer.interval == 4.0
+
+def test_slow_responses_slow_down():
+    pacer = AdaptivePacer(initial_interval=1.0, step=0.2, latency_target=1.0, smoothing=1.0)
+    pacer.record_success(latency=5.0)
+    assert pacer.interval == pytest.approx(1.2)
+    pacer.record_success(latency=0.2)
+    assert pacer.interval == pytest.approx(1.0)
+
+def test_acquire_spaces_requests_per_host():
+    pacer = AdaptivePacer(initial_interval=0.05, min_interval=0.01, jitter=0)
+
+    async def run():
+        started = time.monotonic()
+        await pacer.acquire("https://www.zhipin.com/a")
+        await pacer.acquire("https://other.example.com/b")
+        other_host = time.monotonic() - started
+        await pacer.acquire("https://www.zhipin.com/c")
+        await pacer.acquire("https://www.zhipin.com/d")
+        return other_host, time.monotonic() - started
+
+    other_host, same_host = asyncio.run(run())
+    assert other_host < 0.04
+    assert same_host >= 0.095
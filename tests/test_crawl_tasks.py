@@ -0,0 +1,85 @@
+"""并发爬取任务：平台和全局并发上限、超时任务保留已产出的记录"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+from src import enhanced_pipeline_fixed as pipeline_module
+
+def _job(platform, n):
+    return {"url": f"https://www.zhipin.com/job_detail/{platform}{n}.html",
+            "api_data": {"job_name": f"岗位{n}", "company_name": "公司"}, "html": "<p>x</p>"}
+
+class _FakeRegistry:
+    """流式爬虫：产出 jobs_per_task 条记录，每条之间等待 delay 秒，hang 为True时最后一直挂起"""
+
+    def __init__(self, jobs_per_task=2, delay=0.02, hang=False):
+        self.jobs_per_task = jobs_per_task
+        self.delay = delay
+        self.hang = hang
+        self.running = {}
+        self.max_running = {}
+        self.max_total = 0
+        self.tasks_started = 0
+
+    def resolve_name(self, name):
+        return name
+
+    def create_session(self, name, **kwargs):
+        return None
+
+    def get_stream_crawler(self, name):
+        async def stream(keyword, city, **kwargs):
+            self.running[name] = self.running.get(name, 0) + 1
+            self.max_running[name] = max(self.max_running.get(name, 0), self.running[name])
+            self.max_total = max(self.max_total, sum(self.running.values()))
+            task_no = self.tasks_started
+            self.tasks_started += 1
+            try:
+                for n in range(self.jobs_per_task):
+                    await asyncio.sleep(self.delay)
+                    yield _job(name, f"{task_no}_{n}")
+                if self.hang:
+                    await asyncio.sleep(60)
+            finally:
+                self.running[name] -= 1
+        return stream
+
+def _pipeline(tmp_path, monkeypatch, registry, crawler_config):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pipeline_module, "crawler_registry", registry)
+    return pipeline_module.EnhancedNotionJobPipelineWithLogging(config={"crawler": crawler_config})
+
+def _tasks(*platforms):
+    return [{"platform": platform, "fetch_func": None,
+             "crawl_args": {"keyword": f"关键词{i}", "city": "101010100"}}
+            for i, platform in enumerate(platforms)]
+
+def test_platform_and_global_limits(tmp_path, monkeypatch):
+    registry = _FakeRegistry()
+    pipeline = _pipeline(tmp_path, monkeypatch, registry, {
+        "max_parallel_crawlers": 2, "platform_limits": {"boss_http": 2}
+    })
+
+    results = asyncio.run(pipeline._run_crawl_tasks(_tasks(
+        "boss_playwright", "boss_playwright", "boss_http", "boss_http", "boss_http"
+    )))
+
+    assert [result["status"] for result in results] == ["success"] * 5
+    assert registry.max_running["boss_playwright"] == 1
+    assert registry.max_total == 2
+    assert len(pipeline.raw_jobs) == 10
+
+def test_timed_out_task_keeps_partial_results(tmp_path, monkeypatch):
+    registry = _FakeRegistry(jobs_per_task=2, hang=True)
+    pipeline = _pipeline(tmp_path, monkeypatch, registry, {"crawler_timeout": 0.3})
+
+    results = asyncio.run(pipeline._run_crawl_tasks(_tasks("boss_playwright")))
+
+    assert results[0]["status"] == "timeout"
+    assert results[0]["jobs"] == 2
+    assert [job["岗位名称"] for job in pipeline.raw_jobs] == ["岗位0_0", "岗位0_1"]
+    assert registry.running["boss_playwright"] == 0
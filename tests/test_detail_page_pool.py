@@ -0,0 +1,60 @@
+"""详情页池：熔断打开后，排队等待页面的抓取在guard中等待，不会在熔断期间发出请求"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from src import playwright_boss
+from src.crawl_circuit_breaker import OPEN, CrawlCircuitBreaker
+from src.crawl_pacing import AdaptivePacer
+
+class _FakePage:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+def test_queued_fetches_wait_for_guard_after_breaker_opens(monkeypatch):
+    breaker = CrawlCircuitBreaker(failure_threshold=1, base_cooldown=0, max_trips=100)
+    fetch_states = []
+    rotations = []
+
+    async def fake_detail_html(page, url, settle_delay=True):
+        fetch_states.append(breaker.state)
+        await asyncio.sleep(0.001)
+        return "<html>安全验证</html>"
+
+    async def always_challenge(page):
+        return True
+
+    monkeypatch.setattr(playwright_boss, "get_job_detail_html", fake_detail_html)
+    monkeypatch.setattr(playwright_boss, "is_anti_bot_page", always_challenge)
+
+    async def new_page():
+        return _FakePage()
+
+    async def run():
+        pool = None
+
+        async def guard():
+            # 与 BossCrawlerSession.guard 相同：熔断打开时冷却、重建页面池、进入半开
+            breaker.check()
+            if breaker.state == OPEN:
+                rotations.append(len(fetch_states))
+                await pool.reset()
+                breaker.half_open()
+
+        pool = playwright_boss.DetailPagePool(
+            new_page, size=3, circuit_breaker=breaker, guard=guard,
+            pacer=AdaptivePacer(initial_interval=0.001, min_interval=0.001, max_interval=0.001, jitter=0)
+        )
+        await pool.start()
+        urls = [f"https://www.zhipin.com/job_detail/{i}.html" for i in range(10)]
+        return [html async for _, html in pool.fetch_in_order(urls)]
+
+    results = asyncio.run(run())
+    assert results == [None] * 10
+    assert len(fetch_states) == 10
+    assert OPEN not in fetch_states
+    assert rotations
@@ -0,0 +1,106 @@
+"""岗位提取结果缓存：键的组成、命中/过期/跳过读取，以及批量提取时每个岗位只读取一次HTML"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.extraction_result_cache import ExtractionResultCache, html_fingerprint
+
+URL = "https://www.zhipin.com/job_detail/abc123.html"
+HTML = "<html><body>\n<h1>算法工程师</h1><p>负责模型训练</p></body></html>"
+
+def test_fingerprint_ignores_volatile_markup():
+    noisy = HTML.replace("<body>\n", "<body><script>var t = 1;</script><!-- 埋点 -->\n    ")
+    assert html_fingerprint(noisy) == html_fingerprint(HTML)
+    assert html_fingerprint(HTML.replace("训练", "推理")) != html_fingerprint(HTML)
+
+def test_key_depends_on_scope():
+    job_id, fingerprint = ExtractionResultCache.make_key(URL, HTML, "v1|deepseek|deepseek-chat")
+    assert job_id == "abc123"
+    assert fingerprint != ExtractionResultCache.make_key(URL, HTML, "v1|openai|gpt-4o-mini")[1]
+    assert fingerprint != ExtractionResultCache.make_key(URL, HTML, "v2|deepseek|deepseek-chat")[1]
+
+def test_hit_miss_ttl_and_bypass(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    key = ExtractionResultCache.make_key(URL, HTML)
+    cache = ExtractionResultCache(path=path)
+    assert cache.get(key) is None
+    cache.put(key, {"公司名称": "C"})
+    assert cache.get(key) == {"公司名称": "C"}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    assert ExtractionResultCache(path=path, bypass=True).get(key) is None
+    time.sleep(0.01)
+    assert ExtractionResultCache(path=path, ttl_days=1e-9).get(key) is None
+
+class _CountingJob(dict):
+    """记录 'html' 被读取次数的岗位记录（模拟延迟加载的HTML）"""
+
+    loads = 0
+
+    def get(self, key, default=None):
+        if key == "html":
+            _CountingJob.loads += 1
+        return super().get(key, default)
+
+def _extractor(tmp_path, monkeypatch, model, calls):
+    pytest.importorskip("bs4")
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("dotenv")
+    from src import enhanced_extractor as ee
+
+    def reply(request):
+        calls.append(request)
+        content = json.dumps({"岗位描述": "负责模型训练", "公司名称": "C"}, ensure_ascii=False)
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}, "finish_reason": "stop"}]})
+
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+    monkeypatch.setenv("DEEPSEEK_MODEL", model)
+    extractor = ee.EnhancedNotionExtractor(provider="deepseek", config={"llm": {
+        "cache": {"enabled": False},
+        "result_cache": {"path": str(tmp_path / "results.sqlite")}
+    }})
+    monkeypatch.setitem(ee._llm_clients, (extractor.provider, extractor.base_url),
+                        httpx.AsyncClient(transport=httpx.MockTransport(reply)))
+    return extractor
+
+def test_batch_reads_html_once_and_scopes_by_model(tmp_path, monkeypatch):
+    calls = []
+
+    def run(model):
+        extractor = _extractor(tmp_path, monkeypatch, model, calls)
+        _CountingJob.loads = 0
+        job = _CountingJob(url=URL, html=HTML)
+        results = asyncio.run(extractor.extract_batch([job], max_workers=1))
+        extractor.result_cache.close()
+        return results[0], extractor.result_cache.stats()
+
+    result, stats = run("model-a")
+    assert result["公司名称"] == "C" and len(calls) == 1
+    assert _CountingJob.loads == 1 and stats["misses"] == 1
+
+    result, stats = run("model-a")
+    assert result["公司名称"] == "C" and len(calls) == 1
+    assert _CountingJob.loads == 1 and stats["hits"] == 1
+
+    # 换模型后不复用旧结果
+    run("model-b")
+    assert len(calls) == 2
+
+def test_worker_pool_parses_and_reads_cache(tmp_path, monkeypatch):
+    calls = []
+    jobs = [{"url": f"https://www.zhipin.com/job_detail/job{i}.html", "html": HTML.replace("训练", f"训练{i}")}
+            for i in range(3)]
+
+    extractor = _extractor(tmp_path, monkeypatch, "model-a", calls)
+    first = asyncio.run(extractor.extract_batch(jobs, max_workers=2))
+    extractor.result_cache.close()
+    assert len(calls) == 3 and all(result["公司名称"] == "C" for result in first)
+
+    # 子进程中查询缓存命中，不再调用LLM；命中数计入主进程
+    extractor = _extractor(tmp_path, monkeypatch, "model-a", calls)
+    second = asyncio.run(extractor.extract_batch(jobs, max_workers=2))
+    assert len(calls) == 3
+    assert [result["岗位链接"] for result in second] == [job["url"] for job in jobs]
+    assert extractor.result_cache.stats()["hits"] == 3
@@ -0,0 +1,132 @@
+"""HTTP后端的浏览器回退：搜索页经过熔断guard、节奏控制和反爬虫页面检测"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("playwright")
+
+from src import http_boss
+from src.crawl_circuit_breaker import CrawlCircuitBreaker
+from src.crawl_pacing import AdaptivePacer
+
+class _FakePage:
+    def __init__(self):
+        self.visits = []
+
+    async def goto(self, url, **kwargs):
+        self.visits.append(url)
+
+class _FakeBrowserSession:
+    def __init__(self):
+        self.search_page = _FakePage()
+        self.pacer = AdaptivePacer(initial_interval=0.01, min_interval=0.01, jitter=0)
+        self.circuit_breaker = CrawlCircuitBreaker(failure_threshold=5)
+        self.guard_calls = 0
+
+    async def start(self):
+        return self
+
+    async def guard(self):
+        self.guard_calls += 1
+        self.circuit_breaker.check()
+
+def _session(monkeypatch, blocked):
+    async def no_wait(*args, **kwargs):
+        pass
+
+    async def is_blocked(page):
+        return blocked.pop(0)
+
+    async def extract(page):
+        return [{"job_name": "算法工程师", "url": "https://www.zhipin.com/job_detail/a.html"}]
+
+    monkeypatch.setattr(http_boss, "human_like_delay", no_wait)
+    monkeypatch.setattr(http_boss, "scroll_page", no_wait)
+    monkeypatch.setattr(http_boss, "is_search_page_blocked", is_blocked)
+    monkeypatch.setattr(http_boss, "extract_job_info_from_page", extract)
+
+    session = http_boss.BossHttpSession()
+    assert session.circuit_breaker is None
+    session.challenged = True
+    session.browser_session = _FakeBrowserSession()
+    return session
+
+def test_blocked_fallback_page_is_reported_to_breaker_and_pacer(monkeypatch):
+    session = _session(monkeypatch, [True, True])
+    interval = session.browser_session.pacer.interval
+
+    jobs, has_more = asyncio.run(session.fetch_job_list("算法", "101010100", 1))
+
+    assert (jobs, has_more) == ([], True)
+    assert session.circuit_breaker is session.browser_session.circuit_breaker
+    assert session.circuit_breaker.total_challenges == 2
+    assert session.browser_session.guard_calls == 2
+    assert session.browser_session.pacer.interval > interval
+
+def test_fallback_retries_once_after_block(monkeypatch):
+    session = _session(monkeypatch, [True, False])
+
+    jobs, has_more = asyncio.run(session.fetch_job_list("算法", "101010100", 2))
+
+    assert len(jobs) == 1 and has_more
+    assert session.circuit_breaker.consecutive_challenges == 0
+    assert len(session.browser_session.search_page.visits) == 2
+    assert session.browser_session.search_page.visits[0].endswith("&page=2")
+
+def _http_session(handler, **kwargs):
+    session = http_boss.BossHttpSession(detail_min_interval=0.01, fallback_to_browser=False,
+                                        pacing={"min_interval": 0.01, "jitter": 0}, **kwargs)
+    session.client = http_boss.httpx.AsyncClient(transport=http_boss.httpx.MockTransport(handler))
+    return session
+
+DETAIL_HTML = '<div class="job-detail"><div class="job-sec-text">负责大模型训练</div></div>'
+JOB_URL = "https://www.zhipin.com/job_detail/a.html"
+
+def test_missing_or_failed_detail_page_is_an_error_not_a_challenge():
+    responses = [(404, "页面不存在"), (502, "Bad Gateway"), (200, DETAIL_HTML)]
+
+    def handler(request):
+        status, text = responses.pop(0)
+        return http_boss.httpx.Response(status, text=text)
+
+    async def run():
+        session = _http_session(handler)
+        results = [await session.fetch_detail(JOB_URL) for _ in range(3)]
+        await session.close()
+        return session, results
+
+    session, results = asyncio.run(run())
+
+    assert results == [None, None, DETAIL_HTML]
+    assert not session.challenged
+    assert session.pacer.stats()["errors"] == 2
+    assert session.pacer.stats()["challenges"] == 0
+
+def test_session_returns_to_http_after_cooldown_and_clean_response():
+    responses = [
+        http_boss.httpx.Response(200, text="<p>安全验证</p>"),
+        http_boss.httpx.Response(200, text=DETAIL_HTML),
+    ]
+
+    def handler(request):
+        return responses.pop(0)
+
+    async def run():
+        session = _http_session(handler, http_retry_after=0.05)
+        first = await session.fetch_detail(JOB_URL)
+        challenged = session.challenged
+        # 冷却期内不发HTTP请求
+        cooling = await session.fetch_detail(JOB_URL)
+        await asyncio.sleep(0.06)
+        probe = await session.fetch_detail(JOB_URL)
+        await session.close()
+        return session, challenged, (first, cooling, probe)
+
+    session, challenged, results = asyncio.run(run())
+
+    assert challenged
+    assert results == (None, None, DETAIL_HTML)
+    assert not responses
+    assert not session.challenged
+    assert session.http_fetches == 1
@@ -0,0 +1,50 @@
+"""已知岗位ID索引：从原始JSONL、紧凑存储和Notion缓存收集岗位ID"""
+import json
+import os
+import time
+
+from src.known_job_index import KnownJobIndex
+from src.raw_crawl_store import compact_raw_jsonl
+from src.raw_jsonl_writer import RawJsonlWriter
+
+def _raw_file(path, ids, compress=False):
+    with RawJsonlWriter(str(path), compress=compress) as writer:
+        for job_id in ids:
+            writer.write({"url": f"https://www.zhipin.com/job_detail/{job_id}.html?ka=search",
+                          "html": '<p>"引号"与\\反斜杠</p>'})
+    return writer.path
+
+def test_lookup_by_job_id():
+    index = KnownJobIndex()
+    assert index.add("https://www.zhipin.com/job_detail/abc.html")
+    assert not index.add("https://www.zhipin.com/job_detail/abc.html?securityId=x")
+    assert not index.add("")
+    assert "https://www.zhipin.com/job_detail/abc.html?from=notion" in index
+    assert not index.contains("https://www.zhipin.com/job_detail/other.html")
+    assert len(index) == 1
+
+def test_loads_raw_jsonl_gzip_and_compact_store(tmp_path):
+    index = KnownJobIndex()
+    assert index.add_raw_file(_raw_file(tmp_path / "plain.jsonl", ["a1", "a2"])) == 2
+    assert index.add_raw_file(_raw_file(tmp_path / "packed.jsonl", ["b1"], compress=True)) == 1
+    meta_path = compact_raw_jsonl(_raw_file(tmp_path / "store.jsonl", ["c1", "a1"]), codec="zlib")["meta_path"]
+    assert index.add_raw_file(meta_path) == 1
+    assert {"a1", "a2", "b1", "c1"} == index.job_ids
+
+def test_build_uses_latest_notion_cache_and_recent_raw_files(tmp_path):
+    old_cache = tmp_path / "notion_cache_old.json"
+    old_cache.write_text(json.dumps({"existing_urls": ["https://www.zhipin.com/job_detail/old.html"]}))
+    new_cache = tmp_path / "notion_cache_new.json"
+    new_cache.write_text(json.dumps({"jobs": [{"岗位链接": "https://www.zhipin.com/job_detail/n1.html"}]},
+                                    ensure_ascii=False))
+    os.utime(old_cache, (time.time() - 100, time.time() - 100))
+
+    recent = _raw_file(tmp_path / "raw_boss_http_recent.jsonl", ["r1"])
+    stale = _raw_file(tmp_path / "raw_boss_http_stale.jsonl", ["s1"])
+    os.utime(stale, (time.time() - 30 * 86400, time.time() - 30 * 86400))
+
+    index = KnownJobIndex.build(max_age_days=14,
+                                notion_cache_patterns=[str(tmp_path / "notion_cache_*.json")],
+                                raw_patterns=[str(tmp_path / "raw_boss_*.jsonl")])
+    assert index.job_ids == {"n1", "r1"}
+    assert index.source_counts[recent] == 1
@@ -0,0 +1,71 @@
+"""延迟加载HTML的岗位记录：按偏移读取HTML、序列化只含元数据、跨进程传递位置"""
+import json
+import pickle
+
+import pytest
+
+from src.lazy_job_record import HtmlRef, LazyJobRecord, close_lazy_sources, has_html, load_lazy_records
+from src.raw_crawl_store import compact_raw_jsonl
+from src.raw_jsonl_writer import RawJsonlWriter
+
+class _CountingRef(HtmlRef):
+    __slots__ = ("loads",)
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return "<p>html</p>"
+
+def test_has_html_does_not_load_lazy_html():
+    ref = _CountingRef("unused.jsonl")
+    job = LazyJobRecord({"岗位名称": "算法工程师"}, ref)
+
+    assert has_html(job)
+    assert ref.loads == 0
+    assert has_html({"html": "<p>x</p>"})
+    assert not has_html({"html": ""})
+    assert not has_html({"岗位名称": "算法工程师"})
+
+def _write_raw(path, records, compress=False):
+    with RawJsonlWriter(str(path), compress=compress) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.path
+
+RECORDS = [
+    {"url": "https://www.zhipin.com/job_detail/a.html", "html": '<p>"引号"与\\反斜杠</p>'},
+    {"url": "https://www.zhipin.com/job_detail/b.html", "html": ""},
+    {"url": "https://www.zhipin.com/job_detail/c.html", "html": "<p>第三个岗位</p>" * 50},
+]
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_lazy_records_load_html_by_offset(tmp_path, compress):
+    path = _write_raw(tmp_path / "raw.jsonl", RECORDS, compress=compress)
+
+    records = load_lazy_records(path)
+    try:
+        assert [record["url"] for record in records] == [record["url"] for record in RECORDS]
+        assert isinstance(records[0], LazyJobRecord) and not isinstance(records[1], LazyJobRecord)
+        # 字典中只有元数据，HTML按偏移从源文件读取，顺序无关
+        assert json.loads(json.dumps(records[0])) == {"url": RECORDS[0]["url"]}
+        assert records[2]["html"] == RECORDS[2]["html"]
+        assert records[0].get("html") == RECORDS[0]["html"]
+        assert records[0].materialize() == RECORDS[0]
+    finally:
+        close_lazy_sources()
+
+def test_lazy_records_from_compact_store_and_pickle(tmp_path):
+    meta_path = compact_raw_jsonl(_write_raw(tmp_path / "raw.jsonl", RECORDS), codec="zlib")["meta_path"]
+
+    records = load_lazy_records(meta_path)
+    try:
+        restored = pickle.loads(pickle.dumps(records[2]))
+        assert isinstance(restored, LazyJobRecord)
+        assert restored["html"] == RECORDS[2]["html"]
+        derived = records[0].derive({"岗位名称": "算法工程师"})
+        assert derived["html"] == RECORDS[0]["html"] and "url" not in derived
+    finally:
+        close_lazy_sources()
@@ -0,0 +1,48 @@
+"""送给LLM的页面内容压缩：不超过token预算，优先保留岗位描述区域和相关文本块，保持页面顺序"""
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+from src.enhanced_extractor import JobPageParser
+from src.llm_rate_limiter import estimate_tokens
+
+FILLER = "".join(f"<p>热门城市推荐第{i}条：看看附近的好去处和周末活动安排</p>" for i in range(60))
+HTML = f"""<html><head><title>「算法工程师」</title><script>var a = "岗位职责";</script></head><body>
+<nav>首页 职位 公司 APP下载</nav>
+<div class="company-info"><p>北京某某科技有限公司</p></div>
+{FILLER}
+<div class="job-detail">
+<p>岗位职责：负责大模型预训练与微调，参与数据处理流程开发。</p>
+<p>任职要求：硕士及以上学历，熟悉PyTorch，有分布式训练经验者优先。</p>
+<p>岗位职责：负责大模型预训练与微调，参与数据处理流程开发。</p>
+</div>
+<p>扫码下载APP，微信登录</p>
+</body></html>"""
+
+def _condense(budget):
+    return JobPageParser(input_token_budget=budget)._prepare_html_for_llm(HTML)
+
+def test_output_fits_budget_and_keeps_job_description():
+    content = _condense(80)
+    lines = content.split("\n")
+    assert sum(estimate_tokens(line) for line in lines) <= 80
+    assert "岗位职责：负责大模型预训练与微调，参与数据处理流程开发。" in lines
+    assert "任职要求：硕士及以上学历，熟悉PyTorch，有分布式训练经验者优先。" in lines
+    # 重复块只保留一次，噪声（脚本、导航、扫码/微信行）被丢弃，无关的填充块不占预算
+    assert lines.count("岗位职责：负责大模型预训练与微调，参与数据处理流程开发。") == 1
+    assert "var a" not in content and "APP下载" not in content and "扫码" not in content
+    assert "热门城市推荐" not in content
+
+def test_blocks_keep_page_order():
+    lines = _condense(200).split("\n")
+    assert lines.index("北京某某科技有限公司") < lines.index("岗位职责：负责大模型预训练与微调，参与数据处理流程开发。")
+    assert lines.index("岗位职责：负责大模型预训练与微调，参与数据处理流程开发。") < lines.index(
+        "任职要求：硕士及以上学历，熟悉PyTorch，有分布式训练经验者优先。")
+
+def test_budget_limits_output_size():
+    small, large = _condense(40), _condense(100000)
+    assert sum(estimate_tokens(line) for line in small.split("\n")) <= 40
+    assert len(small) < len(large)
+    assert "热门城市推荐第59条" not in large  # 零分块在有相关块时不会被选入
@@ -0,0 +1,66 @@
+"""LLM限流：RPM/TPM滑动窗口、超大请求、429暂停和按提供商的配置覆盖"""
+import asyncio
+import time
+
+from src.llm_rate_limiter import LLMRateLimiter, estimate_tokens
+
+WINDOW = 0.2
+
+def _timed(limiter, *token_counts):
+    """依次acquire，返回每次acquire完成时距开始的秒数"""
+    async def run():
+        started = time.monotonic()
+        finished = []
+        for tokens in token_counts:
+            await limiter.acquire(tokens)
+            finished.append(time.monotonic() - started)
+        return finished
+    return asyncio.run(run())
+
+def test_requests_per_minute_window():
+    limiter = LLMRateLimiter(requests_per_minute=2, window=WINDOW)
+
+    finished = _timed(limiter, 0, 0, 0)
+
+    assert finished[1] < WINDOW / 2
+    assert finished[2] >= WINDOW * 0.9
+    assert limiter.stats()["requests"] == 3
+    assert limiter.stats()["waited_seconds"] >= 0
+
+def test_tokens_per_minute_window():
+    limiter = LLMRateLimiter(tokens_per_minute=100, window=WINDOW)
+
+    finished = _timed(limiter, 40, 50, 30)
+
+    # 第三个请求超出TPM，等第一个请求移出窗口后放行
+    assert finished[1] < WINDOW / 2
+    assert finished[2] >= WINDOW * 0.9
+    assert limiter.stats()["estimated_tokens"] == 120
+
+def test_oversized_request_waits_for_empty_window_only():
+    limiter = LLMRateLimiter(tokens_per_minute=100, window=WINDOW)
+
+    assert _timed(limiter, 500)[0] < WINDOW / 2
+
+    limiter = LLMRateLimiter(tokens_per_minute=100, window=WINDOW)
+    finished = _timed(limiter, 10, 500)
+    assert finished[1] >= WINDOW * 0.9
+
+def test_pause_delays_all_requests():
+    limiter = LLMRateLimiter(window=WINDOW)
+    limiter.pause(WINDOW)
+
+    assert _timed(limiter, 0)[0] >= WINDOW * 0.9
+    assert limiter.stats()["rate_limited"] == 1
+
+def test_from_config_overrides_provider_defaults():
+    limiter = LLMRateLimiter.from_config("deepseek", {"rate_limits": {"deepseek": {"tokens_per_minute": 0}}})
+    assert limiter.requests_per_minute == 120
+    assert limiter.tokens_per_minute == 0
+
+    unknown = LLMRateLimiter.from_config("local")
+    assert (unknown.requests_per_minute, unknown.tokens_per_minute) == (0, 0)
+
+def test_estimate_tokens_counts_chinese_more_densely():
+    assert estimate_tokens("岗位职责" * 10) > estimate_tokens("duty" * 10)
+    assert estimate_tokens("") == 1
@@ -0,0 +1,108 @@
+"""LLM响应缓存：TTL、按大小淘汰、跳过读取、命中统计，以及只缓存能解析的返回"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from src.llm_response_cache import LLMResponseCache
+
+MESSAGES = [{"role": "user", "content": "提取岗位信息"}]
+
+def test_key_depends_on_every_request_field():
+    base = LLMResponseCache.make_key("deepseek", "deepseek-chat", 0, 1000, MESSAGES)
+    assert base == LLMResponseCache.make_key("deepseek", "deepseek-chat", 0, 1000, list(MESSAGES))
+    assert base != LLMResponseCache.make_key("openai", "deepseek-chat", 0, 1000, MESSAGES)
+    assert base != LLMResponseCache.make_key("deepseek", "deepseek-chat", 0, 2000, MESSAGES)
+    assert base != LLMResponseCache.make_key("deepseek", "deepseek-chat", 0, 1000, [{"role": "user", "content": "x"}])
+
+def test_hit_miss_and_bypass(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = LLMResponseCache(path=path)
+    assert cache.get("k") is None
+    cache.put("k", "reply")
+    assert cache.get("k") == "reply"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    bypassed = LLMResponseCache(path=path, bypass=True)
+    assert bypassed.get("k") is None
+    bypassed.put("k", "fresh")
+    assert LLMResponseCache(path=path).get("k") == "fresh"
+
+def test_expired_entries_are_misses(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    LLMResponseCache(path=path).put("k", "reply")
+    time.sleep(0.01)
+    assert LLMResponseCache(path=path, ttl_days=1e-9).get("k") is None
+
+def test_size_eviction_keeps_recent_entries(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite"), max_size_mb=0.001, evict_check_interval=1)
+    for i in range(20):
+        cache.put(str(i), "x" * 200)
+    assert cache.get("0") is None
+    assert cache.get("19") == "x" * 200
+    assert cache.evicted > 0
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite"), enabled=False)
+    cache.put("k", "reply")
+    assert cache.get("k") is None
+
+class _Replies:
+    """按顺序返回预设的 chat/completions 响应并计数"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def __call__(self, request):
+        import httpx
+        content, finish_reason = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        return httpx.Response(200, json={"choices": [{"message": {"content": content},
+                                                      "finish_reason": finish_reason}]})
+
+def _extractor(tmp_path, monkeypatch, replies):
+    pytest.importorskip("bs4")
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("dotenv")
+    from src import enhanced_extractor as ee
+
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test-key")
+    extractor = ee.EnhancedNotionExtractor(provider="deepseek", config={"llm": {
+        "cache": {"path": str(tmp_path / "llm.sqlite")},
+        "result_cache": {"enabled": False}
+    }})
+    transport = httpx.MockTransport(replies)
+    monkeypatch.setitem(ee._llm_clients, (extractor.provider, extractor.base_url),
+                        httpx.AsyncClient(transport=transport))
+    return extractor
+
+STRUCTURED = {"岗位名称": "算法工程师"}
+
+@pytest.mark.parametrize("bad_reply", [("这不是JSON", "stop"), ('{"岗位描述": "被截断', "length"),
+                                       ('{"岗位描述": "完整", "公司名称": "C"}', "length")])
+def test_unparseable_or_truncated_replies_are_not_cached(tmp_path, monkeypatch, bad_reply):
+    good = (json.dumps({"岗位描述": "负责训练", "公司名称": "C"}, ensure_ascii=False), "stop")
+    replies = _Replies(bad_reply, good)
+    extractor = _extractor(tmp_path, monkeypatch, replies)
+
+    async def run():
+        await extractor.complete_extraction("https://www.zhipin.com/job_detail/a.html", STRUCTURED, "页面")
+        return await extractor.complete_extraction("https://www.zhipin.com/job_detail/a.html", STRUCTURED, "页面")
+
+    second = asyncio.run(run())
+    assert replies.calls == 2
+    assert second["岗位描述"] == "负责训练"
+
+def test_parsed_reply_is_cached(tmp_path, monkeypatch):
+    replies = _Replies((json.dumps({"岗位描述": "负责训练", "公司名称": "C"}, ensure_ascii=False), "stop"))
+    extractor = _extractor(tmp_path, monkeypatch, replies)
+
+    async def run():
+        for _ in range(2):
+            result = await extractor.complete_extraction("https://www.zhipin.com/job_detail/a.html", STRUCTURED, "页面")
+        return result
+
+    assert asyncio.run(run())["岗位描述"] == "负责训练"
+    assert replies.calls == 1
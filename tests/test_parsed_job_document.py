@@ -0,0 +1,49 @@
+"""单次解析的 ParsedJobDocument 与原先两次独立解析（html.parser）得到的文本一致"""
+import pytest
+
+bs4 = pytest.importorskip("bs4")
+
+from src.enhanced_extractor import DEFAULT_HTML_PARSER, JOB_CONTENT_SELECTORS, NOISE_TAGS, ParsedJobDocument
+
+SAMPLES = [
+    """<html><head><title>「算法工程师招聘」- BOSS直聘</title><style>.a{}</style></head>
+<body><header>导航</header><div class="job-detail"><p>岗位职责：</p><p>负责大模型训练<br>熟悉PyTorch</p>
+<script>var x = "验证";</script></div><div class="company-info">某某科技有限公司</div>
+<footer>举报</footer></body></html>""",
+    # 不规范的HTML：未闭合标签、错误嵌套
+    """<title>实习生</title><div class="desc"><p>2025届毕业<li>方向：多模态<b>优先</div>
+<p>薪资 20-30K·15薪<table><tr><td>北京·海淀区</td></table>""",
+    # 没有岗位描述区域
+    "<html><body><p>工作地点：上海</p><nav>首页</nav><p>3-5年经验</p></body></html>",
+]
+
+def _two_pass_reference(html):
+    """user-017 之前的实现：结构化提取和LLM预处理各解析一次"""
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    text = soup.get_text()
+    title = soup.find("title")
+    title_text = title.get_text() if title else ""
+
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    for elem in soup(["script", "style", "nav", "footer", "header"]):
+        elem.decompose()
+    region = ""
+    for selector in ['[class*="job-detail"]', '[class*="job-description"]', '[class*="position-detail"]',
+                     '[class*="job-content"]', '[class*="desc"]']:
+        elements = soup.select(selector)
+        if elements:
+            region = "\n".join([elem.get_text(separator="\n") for elem in elements])
+            break
+    return text, title_text, region, soup.get_text(separator="\n")
+
+def test_default_parser_is_unchanged():
+    assert DEFAULT_HTML_PARSER == "html.parser"
+    assert NOISE_TAGS == ["script", "style", "nav", "footer", "header"]
+    assert len(JOB_CONTENT_SELECTORS) == 5
+
+@pytest.mark.parametrize("html", SAMPLES)
+def test_single_parse_matches_two_pass_text(html):
+    doc = ParsedJobDocument(html)
+    # 先访问去噪后的结果，确认全文和标题不受移除噪声标签的影响
+    page_text, region = doc.page_text, doc.job_region
+    assert (doc.text, doc.title, region, page_text) == _two_pass_reference(html)
@@ -0,0 +1,35 @@
+"""结构化提取正则族：结果与逐个模式 re.findall 取第一条一致"""
+import random
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+from src import enhanced_extractor as ee
+
+FAMILIES = [ee.ACTIVITY_PATTERNS, ee.SALARY_PATTERNS, ee.LOCATION_PATTERNS, ee.EXPERIENCE_PATTERNS,
+            ee.GRADUATION_PATTERNS, ee.DEADLINE_PATTERNS, ee.DIRECTION_PATTERNS]
+
+FRAGMENTS = ['北京', '上海市', '深圳·南山区', '3-5年', '15-25K·14薪', '20k-30k', '面议', '10万', '5k+', '应届生',
+             '不限', '面向2025届', '2024届毕业生', '毕业时间：2024年-2025年', '2024年6月-2025年6月',
+             '截止日期：2025.1.31', '招募方向：大模型预训练方向、多模态方向', '方向：NLP方向与CV', '3日内活跃',
+             'Remote', '远程办公', '\n', '。', ' ', '1年以上经验', '200-300元/天', '杭州 3-5年']
+
+def _naive(family, text):
+    return [(i, pattern.findall(text)) for i, pattern in enumerate(family.patterns) if pattern.findall(text)]
+
+def test_families_match_naive_findall_loop():
+    rng = random.Random(1)
+    for _ in range(3000):
+        text = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 12)))
+        for family in FAMILIES:
+            naive = _naive(family, text)
+            assert [(i, first) for i, first in family.iter_matches(text)] == [(i, m[0]) for i, m in naive]
+            assert family.first(text) == ((naive[0][0], naive[0][1][0]) if naive else (None, None))
+            assert family.first_all(text) == (naive[0] if naive else (None, []))
+
+def test_city_priority_follows_list_order():
+    # 上海在文本中先出现，但北京优先级更高
+    assert ee.LOCATION_PATTERNS.first("上海 北京")[1] == "北京"
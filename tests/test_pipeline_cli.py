@@ -0,0 +1,39 @@
+"""两个流水线入口共用的命令行参数、参数组合检查和配置覆盖"""
+import argparse
+
+import pytest
+
+from src.enhanced_pipeline_fixed import add_common_args, apply_cli_config, check_arg_conflicts
+
+def _parse(argv):
+    parser = argparse.ArgumentParser()
+    add_common_args(parser)
+    return parser.parse_args(argv)
+
+@pytest.mark.parametrize("argv", [
+    ["--replay", "data/*.jsonl"],
+    ["--skip-crawl", "--replay", "data/*.jsonl", "--data-file", "data/a.jsonl"],
+    ["--data-file", "data/a.jsonl"],
+    ["--notion-cache-file", "cache.json"],
+])
+def test_conflicting_args_are_rejected(argv):
+    assert check_arg_conflicts(_parse(argv))
+
+def test_cli_flags_are_applied_to_config():
+    args = _parse(["--skip-crawl", "--replay", "data/a*.jsonl", "data/b*.jsonl", "--since", "2025-01-01",
+                   "--replay-workers", "2", "--resume-crawl", "--no-llm-cache"])
+    config = {"llm": {"cache": {"path": "data/llm.sqlite"}}}
+
+    assert check_arg_conflicts(args) is None
+    apply_cli_config(config, args)
+
+    assert config["crawler"]["resume"] is True
+    assert config["replay"] == {"patterns": ["data/a*.jsonl", "data/b*.jsonl"], "since": "2025-01-01",
+                                "until": None, "max_workers": 2}
+    assert config["llm"]["cache"] == {"path": "data/llm.sqlite", "bypass": True}
+    assert config["llm"]["result_cache"] == {"bypass": True}
+
+def test_defaults_leave_config_untouched():
+    config = {}
+    apply_cli_config(config, _parse([]))
+    assert config == {}
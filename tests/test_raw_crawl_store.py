@@ -0,0 +1,56 @@
+"""紧凑存储：原始JSONL转换后按记录读回的内容与原始记录完全一致"""
+import pytest
+
+from src.raw_crawl_store import ZSTD_AVAILABLE, RawCrawlStore, compact_raw_jsonl
+from src.raw_jsonl_writer import RawJsonlWriter
+
+FRAME = "<html><head><title>BOSS直聘</title></head><body><div class='nav'>导航 首页 职位</div>{}</body></html>"
+
+def _records():
+    records = []
+    for i in range(10):
+        records.append({
+            "url": f"https://www.zhipin.com/job_detail/{i}.html",
+            "html": FRAME.format(f"<div class='job-detail'>岗位{i}：负责模型训练，熟悉PyTorch</div>"),
+            "api_data": {"job_name": f"算法工程师{i}", "salary": "20-30K"},
+            "timestamp": "2025-01-01 12:00:00",
+            "source": "Boss直聘"
+        })
+    # 重复的HTML只存一份；没有HTML的记录原样保留
+    records.append({**records[0], "url": "https://www.zhipin.com/job_detail/dup.html"})
+    records.append({"url": "https://www.zhipin.com/job_detail/empty.html", "html": "", "source": "Boss直聘"})
+    return records
+
+@pytest.mark.parametrize("codec", ["zlib", pytest.param("zstd", marks=pytest.mark.skipif(
+    not ZSTD_AVAILABLE, reason="zstandard 未安装"))])
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(tmp_path, codec, compress):
+    records = _records()
+    with RawJsonlWriter(str(tmp_path / "raw_boss_http_20250101_120000.jsonl"), compress=compress) as writer:
+        for record in records:
+            writer.write(record)
+
+    result = compact_raw_jsonl(writer.path, codec=codec, chunk_records=4, dict_size=4096)
+    assert result["records"] == len(records)
+    assert result["duplicate_html"] == 1
+    assert result["meta_path"] == str(tmp_path / "raw_boss_http_20250101_120000.meta.jsonl")
+
+    with RawCrawlStore(result["meta_path"]) as store:
+        assert len(store) == len(records)
+        assert [meta["url"] for meta in store.iter_metadata()] == [record["url"] for record in records]
+        assert list(store.iter_records()) == records
+        # 随机访问：跨块读取
+        assert store.get_html(store.records[9]["html_ref"]) == records[9]["html"]
+        assert store.get_html(store.records[1]["html_ref"]) == records[1]["html"]
+
+def test_truncated_metadata_keeps_complete_records(tmp_path):
+    records = _records()
+    with RawJsonlWriter(str(tmp_path / "raw.jsonl")) as writer:
+        for record in records:
+            writer.write(record)
+    result = compact_raw_jsonl(writer.path, codec="zlib", chunk_records=4)
+
+    with open(result["meta_path"], "a", encoding="utf-8") as f:
+        f.write('{"url": "https://www.zhipin.com/job_detail/half')
+    with RawCrawlStore(result["meta_path"]) as store:
+        assert list(store.iter_records()) == records
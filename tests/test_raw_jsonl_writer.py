@@ -0,0 +1,75 @@
+"""原始JSONL写入器：文件命名，以及续写时的恢复（半写入尾部、索引缺失、索引落后）"""
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from src.raw_jsonl_writer import RawJsonlWriter, new_raw_file_path, open_raw_jsonl, read_record_index
+from src.replay_loader import file_timestamp
+
+def test_concurrent_tasks_get_distinct_files(tmp_path):
+    paths = {new_raw_file_path("http", "算法工程师", "101010100", str(tmp_path)) for _ in range(50)}
+    assert len(paths) == 50
+    assert all(os.path.basename(p).startswith("raw_boss_http_") and p.endswith(".jsonl") for p in paths)
+
+def test_name_keeps_sortable_timestamp(tmp_path):
+    path = new_raw_file_path("playwright", "大模型 / LLM", "101020100", str(tmp_path))
+    open(path, "w").close()
+    assert os.path.dirname(path) == str(tmp_path)
+    assert "大模型-LLM_101020100" in os.path.basename(path)
+    assert abs((file_timestamp(path) - datetime.now()).total_seconds()) < 5
+
+def _write(path, count, compress, start=0):
+    writer = RawJsonlWriter(path, flush_every=2, compress=compress).open()
+    for i in range(start, start + count):
+        writer.write({"url": f"https://www.zhipin.com/job_detail/{i}.html", "html": "<p>岗位</p>" * 5})
+    writer.close()
+    return writer.path
+
+def _records(path):
+    with open_raw_jsonl(path) as f:
+        stream = f.read().encode("utf-8")
+    urls = [json.loads(line)["url"] for line in stream.splitlines()]
+    # 索引中的偏移必须与（解压后的）数据流一致
+    indexed = [json.loads(stream[offset:offset + length])["url"] for offset, length in read_record_index(path)]
+    assert indexed == urls
+    return urls
+
+def _resume(path, compress, more=0):
+    writer = RawJsonlWriter(path, flush_every=2, compress=compress, resume=True).open()
+    for i in range(more):
+        writer.write({"url": f"https://www.zhipin.com/job_detail/new{i}.html"})
+    writer.close()
+    return writer
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_resume_drops_half_written_tail(tmp_path, compress):
+    path = _write(str(tmp_path / "raw.jsonl"), 6, compress)
+    with open(path, "ab") as f:
+        f.write(b'{"url": "https://www.zhipin.com/job_detail/half' if not compress else b"\x1f\x8b\x08\x00garbage")
+    writer = _resume(path, compress, more=1)
+    assert writer.records_written == 7
+    assert len(_records(path)) == 7
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_resume_without_index_rebuilds_it(tmp_path, compress):
+    path = _write(str(tmp_path / "raw.jsonl"), 5, compress)
+    os.remove(path + ".idx")
+    writer = _resume(path, compress, more=2)
+    assert writer.records_written == 7
+    urls = _records(path)
+    assert urls[0].endswith("/0.html") and urls[-1].endswith("/new1.html")
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_resume_recovers_records_written_after_last_commit(tmp_path, compress):
+    path = _write(str(tmp_path / "raw.jsonl"), 4, compress)
+    with open(path + ".idx", "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    # 模拟最后一次落盘的数据已写入、索引还没来得及写
+    last_commit = max(i for i, line in enumerate(lines) if "commit" in line and i < len(lines) - 1)
+    with open(path + ".idx", "w", encoding="utf-8") as f:
+        f.writelines(lines[:last_commit + 1])
+    writer = _resume(path, compress)
+    assert writer.records_written == 4
+    assert len(_records(path)) == 4
@@ -0,0 +1,72 @@
+"""多文件回放：按文件名时间和日期范围选取文件，合并时按岗位ID去重并保留最新记录"""
+import json
+
+import pytest
+
+from src.lazy_job_record import LazyJobRecord, close_lazy_sources
+from src.raw_crawl_store import compact_raw_jsonl
+from src.raw_jsonl_writer import RawJsonlWriter
+from src.replay_loader import load_replay_files, resolve_replay_files
+
+def _raw_file(path, jobs):
+    with RawJsonlWriter(str(path)) as writer:
+        for job_id, label in jobs:
+            writer.write({"url": f"https://www.zhipin.com/job_detail/{job_id}.html?ka=search",
+                          "html": f"<p>{label}</p>", "label": label})
+    return writer.path
+
+def _labels(records):
+    return [record.get("label") or record.get("岗位名称") for record in records]
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_merge_keeps_newest_record_per_job_id(tmp_path, max_workers):
+    old = _raw_file(tmp_path / "raw_boss_http_20250101_080000_a.jsonl", [("a", "a旧"), ("b", "b")])
+    new = _raw_file(tmp_path / "raw_boss_playwright_20250108_080000_b.jsonl", [("a", "a新"), ("c", "c")])
+    processed = tmp_path / "deduplicated_jobs_20250105_080000.json"
+    processed.write_text(json.dumps([
+        {"岗位名称": "b已处理", "岗位链接": "https://www.zhipin.com/job_detail/b.html"},
+        {"岗位名称": "无链接"}
+    ], ensure_ascii=False), encoding="utf-8")
+
+    paths = resolve_replay_files([str(tmp_path / "*")])
+    assert paths == [old, str(processed), new]
+
+    records, stats = load_replay_files(paths, max_workers=max_workers)
+    try:
+        # 输出按文件从旧到新，重复ID只保留最新文件中的记录；没有ID的记录不参与去重
+        assert _labels(records) == ["b已处理", "无链接", "a新", "c"]
+        assert records[2]["html"] == "<p>a新</p>"
+        assert isinstance(records[2], LazyJobRecord)
+        assert stats["records_read"] == 6 and stats["records_kept"] == 4
+        assert stats["id_duplicates"] == 2
+        assert not stats["failed_files"]
+    finally:
+        close_lazy_sources()
+
+def test_without_dedup_every_record_is_kept(tmp_path):
+    first = _raw_file(tmp_path / "raw_boss_http_20250101_080000.jsonl", [("a", "a1")])
+    second = _raw_file(tmp_path / "raw_boss_http_20250102_080000.jsonl", [("a", "a2")])
+
+    records, stats = load_replay_files([first, second], dedup=False)
+
+    assert _labels(records) == ["a1", "a2"]
+    assert stats["id_duplicates"] == 0
+
+def test_date_range_compact_store_and_failed_files(tmp_path):
+    _raw_file(tmp_path / "raw_boss_http_20241231_080000.jsonl", [("x", "x")])
+    compacted = _raw_file(tmp_path / "raw_boss_http_20250103_080000.jsonl", [("a", "a")])
+    meta_path = compact_raw_jsonl(compacted, codec="zlib")["meta_path"]
+    broken = tmp_path / "deduplicated_jobs_20250104_080000.json"
+    broken.write_text('{"not": "a list"}', encoding="utf-8")
+
+    paths = resolve_replay_files([str(tmp_path / "*")], since="2025-01-01", until="2025-01-04")
+    # 已转换为紧凑存储的原始JSONL只保留紧凑存储，范围外的文件不选取
+    assert paths == [meta_path, str(broken)]
+
+    records, stats = load_replay_files(paths, max_workers=1)
+    try:
+        assert _labels(records) == ["a"]
+        assert records[0]["html"] == "<p>a</p>"
+        assert list(stats["failed_files"]) == [str(broken)]
+    finally:
+        close_lazy_sources()
@@ -0,0 +1,40 @@
+"""多查询扫描调度：未跑过的组合优先、按历史产出排序、合并多平台结果并平滑更新历史"""
+from src.sweep_scheduler import SweepScheduler
+
+def _result(keyword, city, jobs, seconds=60.0, status="success"):
+    return {"keyword": keyword, "city": city, "jobs": jobs, "seconds": seconds, "status": status}
+
+def test_plan_explores_new_combinations_first_then_by_yield(tmp_path):
+    scheduler = SweepScheduler(["算法", "LLM", "算法"], ["北京", "上海"],
+                               history_path=str(tmp_path / "history.json"))
+    scheduler.record([_result("算法", "北京", 2), _result("LLM", "北京", 10), _result("算法", "上海", 5)])
+
+    assert scheduler.plan() == [("LLM", "上海"), ("LLM", "北京"), ("算法", "上海"), ("算法", "北京")]
+
+def test_record_merges_platforms_and_smooths_history(tmp_path):
+    history_path = str(tmp_path / "history.json")
+    scheduler = SweepScheduler(["算法"], ["北京"], history_path=history_path, smoothing=0.5)
+
+    report = scheduler.record([_result("算法", "北京", 6, 60.0),
+                               _result("算法", "北京", 4, 60.0, status="timeout")])
+
+    assert report == [{"keyword": "算法", "city": "北京", "jobs": 10, "seconds": 120.0,
+                       "statuses": ["success", "timeout"], "jobs_per_minute": 5.0, "expected_jobs": 10.0}]
+
+    scheduler.record([_result("算法", "北京", 2)])
+    assert scheduler.expected_yield("算法", "北京") == 6.0
+    scheduler.save()
+
+    reloaded = SweepScheduler(["算法"], ["北京"], history_path=history_path)
+    assert reloaded.expected_yield("算法", "北京") == 6.0
+    assert reloaded.history["算法|北京"]["runs"] == 2
+    assert reloaded.history["算法|北京"]["last_jobs"] == 2
+
+def test_unreadable_history_starts_empty(tmp_path):
+    history_path = tmp_path / "history.json"
+    history_path.write_text("not json", encoding="utf-8")
+
+    scheduler = SweepScheduler(["算法"], ["北京"], history_path=str(history_path))
+
+    assert scheduler.history == {}
+    assert scheduler.plan() == [("算法", "北京")]